@@ -1,49 +1,52 @@
-import json
-import os
 import sys
-import xml.etree.ElementTree
 
 from PyQt5 import QtCore, QtWidgets
 
 from PyQt5.QtCore import QThread
-from PyQt5.QtGui import QPixmap, QStandardItemModel, QStandardItem
+from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog
 
 from svgToolMainWindow import Ui_MainWindow
+from svgToolConversion import Conversion
+from svgToolFileModel import SvgFileListModel, SvgFileScanner, parseGlobs
+from svgToolPresets import modes
+from svgToolRenderer import renderers, createRenderer
+from svgToolScheduler import defaultWorkerCount
+from svgToolSink import DirectorySink, ZipSink
+from svgToolThumbnails import ThumbnailProvider
+from svgToolTrace import Tracer
+from svgToolWatcher import DirectoryWatcher
 
 
 class SvgTool(QMainWindow):
 
-    class PresetMode(object):
-        def __init__(self, id, name, baseWidth, baseHeight, isMaintainRatio, iosSizeList, androidSizeList, isMultiplier):
-            self.id = id
-            self.name = name
-            self.baseWidth = baseWidth
-            self.baseHeight = baseHeight
-            self.isMaintainRatio = isMaintainRatio
-            self.iosSizeList = iosSizeList
-            self.androidSizeList = androidSizeList
-            self.isMultiplier = isMultiplier
+    sigWatchChanged = QtCore.pyqtSignal(list)
 
     iosSizeList = []
     androidSizeList = []
     isMultiplier = True
     inputFiles = []
-    modes = [
-        PresetMode(0, "Custom", "", "", True, [1, 2, 3], [1, 1.5, 2, 3], True),
-        PresetMode(1, "iOS Launcher Icon", 0, 0, True, [29, 40, 50, 57, 58, 72, 76, 80, 87, 100, 114, 120, 144, 152, 167, 180], [], False),
-        PresetMode(2, "Android Launcher Icon", 48, 48, True, [], [1, 1.5, 2, 3], True),
-        PresetMode(3, "Store Icon", 0, 0, True, [1024], [512], False),
-        PresetMode(4, "Button Icon", 16, 16, True, [1, 2, 3], [1, 1.5, 2, 3], True),
-        PresetMode(5, "Big Button Icon", 24, 24, True, [1, 2, 3], [1, 1.5, 2, 3], True)
-    ]
+    modes = modes
+    atlasModes = [("Off", "off"), ("Alongside", "alongside"), ("Atlas only", "only")]
+    convertProgress = None
+    watcher = None
+    scanner = None
+    tracer = None
+    archivePath = None
 
     def __init__(self, parent=None):
         super(SvgTool, self).__init__(parent)
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
-        self.listViewFilesModel = QStandardItemModel(self.ui.listViewFiles)
+        self.listViewFilesModel = SvgFileListModel(self.ui.listViewFiles)
+        self.ui.listViewFiles.setModel(self.listViewFilesModel)
+        # every row has the same height, so the view does not measure all of them
+        self.ui.listViewFiles.setUniformItemSizes(True)
+        self.ui.listViewFiles.setIconSize(QtCore.QSize(16, 16))
+        self.thumbnails = ThumbnailProvider(16, parent=self)
+        self.listViewFilesModel.setThumbnailProvider(self.thumbnails)
+        self.checkedFiles = set()
 
         self.ui.btnCancel.setEnabled(False)
         self.ui.btnConvert.setEnabled(False)
@@ -61,11 +64,24 @@ class SvgTool(QMainWindow):
         self.ui.btnRefresh.clicked.connect(self.refreshInputDirectory)
         self.ui.btnSelectAll.clicked.connect(self.selectAll)
         self.ui.btnSelectNone.clicked.connect(self.selectNone)
-        self.listViewFilesModel.itemChanged.connect(self.listViewChanged)
+        self.ui.checkBoxWatch.stateChanged.connect(self.onCheckBoxWatchChanged)
+        self.ui.checkBoxRecursive.stateChanged.connect(self.onCheckBoxRecursiveChanged)
+        self.ui.lineGlobs.editingFinished.connect(self.refreshInputDirectory)
+        self.ui.listViewFiles.verticalScrollBar().valueChanged.connect(self.thumbnails.cancelPending)
+        self.listViewFilesModel.sigCheckedChanged.connect(self.updateSelectedLabel)
+        self.sigWatchChanged.connect(self.onWatchChanged)
+        self.watchQueue = set()
         self.populateModes()
+        self.populateRenderers()
+        self.populateAtlasModes()
+        self.ui.spinBoxWorkers.setValue(defaultWorkerCount())
 
     def onLineFilterTextChanged(self):
-        self.refreshInputDirectory()
+        self.thumbnails.cancelPending()
+        self.listViewFilesModel.setFilterText(self.ui.lineFilter.text())
+        self.updateFileLabels()
+        if self.watcher is not None:
+            self.watcher.filterText = self.ui.lineFilter.text()
 
     def onBtnInputDir(self):
         file = str(QFileDialog.getExistingDirectory(self.ui.centralwidget, "Select input directory"))
@@ -74,13 +90,52 @@ class SvgTool(QMainWindow):
             self.refreshInputDirectory()
             if not self.ui.lineOutputDir.text():
                 self.ui.lineOutputDir.setText(file)
+            if self.watcher is not None:
+                self.stopWatching()
+                self.startWatching()
 
     def onBtnOutputDir(self):
         file = str(QFileDialog.getExistingDirectory(self.ui.centralwidget, "Select output directory"))
         if file:
             self.ui.lineOutputDir.setText(file)
 
+    def archiveConflict(self):
+        if not self.ui.checkBoxArchive.isChecked():
+            return None
+        if self.ui.comboBoxAtlas.currentData() == "only":
+            return "\"I can't pack atlases only into a zip archive, put the images alongside!\""
+        if self.ui.checkBoxOptimize.isChecked():
+            return "\"I can't optimize the images of a zip archive, uncheck Optimize PNG!\""
+        if self.ui.checkBoxVS.isChecked():
+            return "\"The solution can't use images that are only in a zip archive, uncheck Update Solution!\""
+        return None
+
     def onBtnConvert(self):
+        if not self.validateSize():
+            return
+
+        archiveConflict = self.archiveConflict()
+        if archiveConflict is not None:
+            errormsg = QtWidgets.QMessageBox(self.ui.centralwidget)
+            errormsg.setIcon(QtWidgets.QMessageBox.Critical)
+            errormsg.setWindowTitle("Error")
+            errormsg.setText("Flandre says:")
+            errormsg.setInformativeText(archiveConflict)
+            errormsg.show()
+            return
+
+        if self.ui.checkBoxArchive.isChecked():
+            archivePath, _ = QFileDialog.getSaveFileName(self.ui.centralwidget, "Select archive",
+                                                         "{0}/assets.zip".format(self.ui.lineOutputDir.text()),
+                                                         "Zip archives (*.zip)")
+            if not archivePath:
+                return
+            self.archivePath = archivePath
+
+        self.inputFiles = self.selectedFiles()
+        self.startConversion(self.inputFiles)
+
+    def validateSize(self):
         try:
             if self.isMultiplier:
                 w = int(self.ui.lineWidth.text())
@@ -93,7 +148,7 @@ class SvgTool(QMainWindow):
                     errormsg.setText("Flandre says:")
                     errormsg.setInformativeText("\"Width and Height must be greater than 0, you moron!\"")
                     errormsg.show()
-                    return
+                    return False
 
         except ValueError:
             errormsg = QtWidgets.QMessageBox(self.ui.centralwidget)
@@ -102,11 +157,21 @@ class SvgTool(QMainWindow):
             errormsg.setText("Flandre says:")
             errormsg.setInformativeText("\"Width and Height must be numbers, you moron!\"")
             errormsg.show()
-            return
+            return False
+
+        return True
 
+    def startConversion(self, inputFiles):
         self.setUiInProgress(True)
-        self.convertProgress = SvgConversion(
-            self.inputFiles,
+
+        hooks = []
+        self.tracer = None
+        if self.ui.checkBoxTrace.isChecked():
+            self.tracer = Tracer("{0}/.flandre-trace.jsonl".format(self.ui.lineOutputDir.text()))
+            hooks.append(self.tracer)
+
+        conversion = Conversion(
+            inputFiles,
             self.ui.checkBoxAndroid.isChecked(),
             self.ui.checkBoxIos.isChecked(),
             self.androidSizeList,
@@ -117,14 +182,133 @@ class SvgTool(QMainWindow):
             float(self.ui.lineHeight.text()),
             self.isMultiplier,
             self.ui.checkBoxXcassets.isChecked(),
-            self.ui.checkBoxVS.isChecked()
+            self.ui.checkBoxVS.isChecked(),
+            createRenderer(self.ui.comboBoxRenderer.currentData()),
+            self.ui.spinBoxWorkers.value(),
+            self.ui.comboBoxMode.currentText(),
+            self.ui.checkBoxForceRebuild.isChecked(),
+            hooks=hooks,
+            isDownscale=self.ui.checkBoxDownscale.isChecked(),
+            isOptimize=self.ui.checkBoxOptimize.isChecked(),
+            optimizeBudget=self.ui.spinBoxOptimizeBudget.value(),
+            sink=self.createSink(),
+            isMinify=self.ui.checkBoxMinify.isChecked(),
+            renderTimeout=self.ui.spinBoxTimeout.value(),
+            naming="flatten" if self.ui.checkBoxPrefix.isChecked() else "name",
+            atlas=self.ui.comboBoxAtlas.currentData()
         )
+
+        # watch mode converts only the changed files, there is nothing to resume there
+        if not self.ui.checkBoxWatch.isChecked():
+            conversion.isResume = self.askResume(conversion.checkpointCount())
+
+        self.convertProgress = SvgConversion(conversion)
         self.convertProgress.sigSetProgress.connect(self.setProgress)
         self.convertProgress.sigSetProgressTotal.connect(self.setProgressTotal)
         self.convertProgress.sigSetStatusMessage.connect(self.setStatusMessage)
         self.convertProgress.sigSetUiInProgress.connect(self.setUiInProgress)
+        self.convertProgress.finished.connect(self.onConversionFinished)
         self.convertProgress.start()
 
+    def askResume(self, completed):
+        if not completed:
+            return False
+
+        resumemsg = QtWidgets.QMessageBox(self.ui.centralwidget)
+        resumemsg.setIcon(QtWidgets.QMessageBox.Question)
+        resumemsg.setWindowTitle("Resume")
+        resumemsg.setText("Flandre says:")
+        resumemsg.setInformativeText("\"I already finished {0} images of this job before you stopped me. "
+                                     "Should I keep them and only do the rest?\"".format(completed))
+        resumemsg.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+        resumemsg.setDefaultButton(QtWidgets.QMessageBox.Yes)
+        return resumemsg.exec_() == QtWidgets.QMessageBox.Yes
+
+    def createSink(self):
+        if not self.ui.checkBoxArchive.isChecked():
+            return DirectorySink()
+        if self.archivePath is None:
+            self.archivePath = "{0}/assets.zip".format(self.ui.lineOutputDir.text())
+        return ZipSink(self.ui.lineOutputDir.text(), self.archivePath)
+
+    def onConversionFinished(self):
+        if self.tracer is not None:
+            self.showTraceSummary()
+
+        if self.watchQueue:
+            self.startWatchConversion()
+
+    def showTraceSummary(self):
+        summary = self.tracer.summary()
+
+        # watch mode converts on every change, a dialog each time would get in the way
+        if self.ui.checkBoxWatch.isChecked():
+            self.setStatusMessage(summary.split("\n")[0])
+            return
+
+        tracemsg = QtWidgets.QMessageBox(self.ui.centralwidget)
+        tracemsg.setIcon(QtWidgets.QMessageBox.Information)
+        tracemsg.setWindowTitle("Trace")
+        tracemsg.setText(summary.split("\n")[0])
+        tracemsg.setInformativeText('Trace written to "{0}"'.format(self.tracer.path))
+        tracemsg.setDetailedText(summary)
+        tracemsg.show()
+
+    def onCheckBoxWatchChanged(self):
+        if self.ui.checkBoxWatch.isChecked():
+            if not self.ui.lineInputDir.text() or not self.ui.lineOutputDir.text() or not self.validateSize():
+                self.ui.checkBoxWatch.setChecked(False)
+                return
+            self.startWatching()
+        else:
+            self.stopWatching()
+
+    def onCheckBoxRecursiveChanged(self):
+        # only the input directory itself is watched, subfolders and watching are exclusive like on the command line
+        if self.ui.checkBoxRecursive.isChecked():
+            self.ui.checkBoxWatch.setChecked(False)
+        self.ui.checkBoxWatch.setEnabled(not self.ui.checkBoxRecursive.isChecked())
+        self.refreshInputDirectory()
+
+    def startWatching(self):
+        include, exclude = parseGlobs(self.ui.lineGlobs.text())
+        self.watcher = DirectoryWatcher(self.ui.lineInputDir.text(), self.sigWatchChanged.emit, self.ui.lineFilter.text(),
+                                        include, exclude)
+        self.watcher.start()
+        self.setStatusMessage('Flandre is watching "{0}"'.format(self.ui.lineInputDir.text()))
+
+    def stopWatching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.watchQueue = set()
+
+    def onWatchChanged(self, files):
+        if self.watcher is None:
+            return
+
+        self.thumbnails.invalidate(files)
+        if not self.listViewFilesModel.hasFiles(files):
+            self.refreshInputDirectory()
+
+        self.watchQueue.update(files)
+        if self.convertProgress is None or not self.convertProgress.isRunning():
+            self.startWatchConversion()
+
+    def startWatchConversion(self):
+        files = self.watchQueue
+        self.watchQueue = set()
+
+        # an archive holds every asset, so it is rebuilt from all the selected files
+        if self.ui.checkBoxArchive.isChecked():
+            files = files | set(self.selectedFiles())
+        self.startConversion(sorted(files))
+
+    def closeEvent(self, event):
+        self.stopWatching()
+        self.stopScanner()
+        super(SvgTool, self).closeEvent(event)
+
     def onBtnCancel(self):
         self.ui.btnCancel.setEnabled(False)
         self.convertProgress.cancel()
@@ -140,6 +324,7 @@ class SvgTool(QMainWindow):
                 self.isMultiplier = mode.isMultiplier
                 self.iosSizeList = mode.iosSizeList
                 self.androidSizeList = mode.androidSizeList
+                self.ui.checkBoxDownscale.setChecked(mode.isDownscale)
 
                 self.ui.checkBoxAndroid.setEnabled(len(mode.androidSizeList) != 0)
                 self.ui.checkBoxAndroid.setChecked(len(mode.androidSizeList) != 0)
@@ -150,6 +335,11 @@ class SvgTool(QMainWindow):
                 self.ui.checkBoxRatio.setEnabled(self.isMultiplier)
                 self.ui.lineWidth.setEnabled(self.isMultiplier)
                 self.ui.lineHeight.setEnabled(self.isMultiplier)
+
+                # atlases are packed per density, presets with fixed sizes have none
+                if not self.isMultiplier:
+                    self.ui.comboBoxAtlas.setCurrentIndex(0)
+                self.ui.comboBoxAtlas.setEnabled(self.isMultiplier)
                 break
 
     def onLineWidthChanged(self):
@@ -174,23 +364,16 @@ class SvgTool(QMainWindow):
         self.ui.statusbar.showMessage(statusMessage)
 
     def selectAll(self):
-        for index in range(self.listViewFilesModel.rowCount()):
-            item = self.listViewFilesModel.item(index)
-            item.setCheckState(QtCore.Qt.Checked)
+        self.listViewFilesModel.setAllChecked(True)
 
     def selectNone(self):
-        for index in range(self.listViewFilesModel.rowCount()):
-            item = self.listViewFilesModel.item(index)
-            item.setCheckState(QtCore.Qt.Unchecked)
-
-    def listViewChanged(self, item_changed):
-        selected = 0
-        self.inputFiles = []
-        for index in range(self.listViewFilesModel.rowCount()):
-            item = self.listViewFilesModel.item(index)
-            if item.checkState() == QtCore.Qt.Checked:
-                self.inputFiles.append(item.text())
-                selected += 1
+        self.listViewFilesModel.setAllChecked(False)
+
+    def selectedFiles(self):
+        return self.listViewFilesModel.checkedFiles()
+
+    def updateSelectedLabel(self):
+        selected = self.listViewFilesModel.checkedCount
         self.ui.btnConvert.setEnabled(selected != 0)
 
         if selected == 1:
@@ -198,30 +381,65 @@ class SvgTool(QMainWindow):
         else:
             self.ui.labelSelected.setText("{0} svg files selected".format(selected))
 
+    def updateFileLabels(self):
+        found = self.listViewFilesModel.rowCount()
+        if found == 1:
+            self.ui.labelFilter.setText("{0} svg file found".format(found))
+        else:
+            self.ui.labelFilter.setText("{0} svg files found".format(found))
+
+        self.updateSelectedLabel()
+
     def refreshInputDirectory(self):
         if not str(self.ui.lineInputDir.text()):
             return
 
-        self.listViewFilesModel = QStandardItemModel(self.ui.listViewFiles)
-        self.listViewFilesModel.itemChanged.connect(self.listViewChanged)
+        checkedFiles = self.listViewFilesModel.allCheckedFiles()
+        # files the previous scan had not listed yet keep their check state
+        if self.stopScanner():
+            checkedFiles |= self.checkedFiles
+        self.checkedFiles = checkedFiles
+
+        self.thumbnails.reset()
+        self.listViewFilesModel.setFiles([], self.ui.lineFilter.text(), self.ui.lineInputDir.text())
+        self.updateFileLabels()
+
+        include, exclude = parseGlobs(self.ui.lineGlobs.text())
+        if self.watcher is not None:
+            self.watcher.include = include
+            self.watcher.exclude = exclude
+        self.scanner = SvgFileScanner(self.ui.lineInputDir.text(), include, exclude,
+                                      self.ui.checkBoxRecursive.isChecked(), self)
+        self.scanner.sigFilesFound.connect(self.onFilesFound)
+        self.scanner.finished.connect(self.onScanFinished)
+        self.setStatusMessage('Flandre is looking for svg files in "{0}"'.format(self.ui.lineInputDir.text()))
+        self.scanner.start()
+
+    def stopScanner(self):
+        if self.scanner is None:
+            return False
+
+        isRunning = self.scanner.isRunning()
+        self.scanner.cancel()
+        self.scanner.wait()
+        self.scanner = None
+        return isRunning
+
+    def onFilesFound(self, files):
+        # batches of a scanner that was replaced may still be queued
+        if self.sender() is not self.scanner:
+            return
 
-        self.inputFiles = []
-        for file in os.listdir(self.ui.lineInputDir.text()):
-            if self.ui.lineFilter.text().upper() in file.upper():
-                if file.endswith(".svg"):
-                    item = QStandardItem(file)
-                    item.setCheckable(True)
-                    item.setCheckState(QtCore.Qt.Unchecked)
-                    self.listViewFilesModel.appendRow(item)
+        self.listViewFilesModel.addFiles(files, self.checkedFiles)
+        self.updateFileLabels()
 
-        self.ui.listViewFiles.setModel(self.listViewFilesModel)
+    def onScanFinished(self):
+        if self.sender() is not self.scanner:
+            return
 
-        if self.listViewFilesModel.rowCount() == 1:
-            self.ui.labelFilter.setText("{0} svg file found".format(self.listViewFilesModel.rowCount()))
-        else:
-            self.ui.labelFilter.setText("{0} svg files found".format(self.listViewFilesModel.rowCount()))
-        self.ui.labelSelected.setText("0 svg files selected")
-        self.ui.btnConvert.setEnabled(False)
+        self.checkedFiles = set()
+        if self.watcher is None:
+            self.setStatusMessage("")
 
     def setUiInProgress(self, state):
         self.ui.btnCancel.setEnabled(state)
@@ -245,6 +463,20 @@ class SvgTool(QMainWindow):
         self.ui.checkBoxXcassets.setEnabled(not state)
         self.ui.checkBoxVS.setEnabled(not state)
         self.ui.comboBoxMode.setEnabled(not state)
+        self.ui.comboBoxRenderer.setEnabled(not state)
+        self.ui.spinBoxWorkers.setEnabled(not state)
+        self.ui.checkBoxForceRebuild.setEnabled(not state)
+        self.ui.checkBoxTrace.setEnabled(not state)
+        self.ui.checkBoxDownscale.setEnabled(not state)
+        self.ui.checkBoxOptimize.setEnabled(not state)
+        self.ui.spinBoxOptimizeBudget.setEnabled(not state)
+        self.ui.checkBoxArchive.setEnabled(not state)
+        self.ui.checkBoxMinify.setEnabled(not state)
+        self.ui.spinBoxTimeout.setEnabled(not state)
+        self.ui.checkBoxRecursive.setEnabled(not state)
+        self.ui.lineGlobs.setEnabled(not state)
+        self.ui.checkBoxPrefix.setEnabled(not state)
+        self.ui.comboBoxAtlas.setEnabled(not state and self.isMultiplier)
 
         if len(self.iosSizeList) == 0:
             self.ui.checkBoxIos.setEnabled(False)
@@ -255,6 +487,14 @@ class SvgTool(QMainWindow):
         for mode in self.modes:
             self.ui.comboBoxMode.addItem(mode.name, mode.id)
 
+    def populateRenderers(self):
+        for renderer in renderers:
+            self.ui.comboBoxRenderer.addItem(renderer.name, renderer.id)
+
+    def populateAtlasModes(self):
+        for name, atlas in self.atlasModes:
+            self.ui.comboBoxAtlas.addItem(name, atlas)
+
 
 class SvgConversion(QThread):
 
@@ -263,425 +503,29 @@ class SvgConversion(QThread):
     sigSetStatusMessage = QtCore.pyqtSignal(str)
     sigSetUiInProgress = QtCore.pyqtSignal(bool)
 
-    cancelToken = False
-
-    def __init__(self, inputFiles, convertAndroid, convertIos, androidSizeList, iosSizeList, inputDir, outputDir, baseWidth, baseHeight, isMultiplier, isXCAssets, isUpdateSolution):
+    def __init__(self, conversion):
         super().__init__()
-        self.inputFiles = inputFiles
-        self.convertAndroid = convertAndroid
-        self.convertIos = convertIos
-        self.androidSizeList = androidSizeList
-        self.iosSizeList = iosSizeList
-        self.inputDir = inputDir
-        self.outputDir = outputDir
-        self.baseWidth = baseWidth
-        self.baseHeight = baseHeight
-        self.isMultiplier = isMultiplier
-        self.isXCAssets = isXCAssets
-        self.isUpdateSolution = isUpdateSolution
+        self.conversion = conversion
+        self.conversion.listener = self
 
     def cancel(self):
-        self.cancelToken = True
+        self.conversion.cancel()
 
     def run(self):
-        fileCurrent = 0
-        fileCount = len(self.inputFiles)
+        self.conversion.run()
 
-        androidfolder = self.findAndroidSolutionFolder()
-        iosfolder = self.findIosSolutionFolder()
+    def setProgress(self, progress):
+        self.sigSetProgress.emit(progress)
 
-        self.createDirectories(androidfolder, iosfolder)
+    def setProgressTotal(self, progressTotal):
+        self.sigSetProgressTotal.emit(progressTotal)
 
-        for file in self.inputFiles:
-            if self.cancelToken:
-                break
+    def setStatusMessage(self, statusMessage):
+        self.sigSetStatusMessage.emit(statusMessage)
 
-            fileWithoutExt = str(file).replace(".svg", "")
-            convertCurrent = 0
-            convertCount = 0
-
-            if self.convertAndroid:
-                convertCount += len(self.androidSizeList)
-            if self.convertIos:
-                convertCount += len(self.iosSizeList)
-
-            fileCurrent += 1
-
-            infile = "{0}/{1}".format(self.inputDir, file)
-            self.sigSetProgressTotal.emit((fileCurrent / fileCount) * 100)
-            if self.convertIos:
-                if self.isXCAssets:
-                    if self.isMultiplier:
-                        contentjson = {
-                            'images': [{'idiom': "universal"}],
-                            'properties': {'template-rendering-intent': ""},
-                            'info': {'version': 1, 'author': "xcode"}
-                        }
-                    else:
-                        contentjson = {
-                            'images': [],
-                            'info': {'version': 1, 'author': "xcode"}
-                        }
-
-                if self.isUpdateSolution:
-                    xml.etree.ElementTree.register_namespace("", "http://schemas.microsoft.com/developer/msbuild/2003")
-                    iOSSolution = self.findIosSolutionFile(iosfolder)
-                    iOSSolutionXml = xml.etree.ElementTree.parse(iOSSolution)
-                    root = iOSSolutionXml.getroot()
-
-                    if self.isXCAssets:
-                        try:
-                            iositemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[1]
-                        except IndexError:
-                            iositemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[0]
-                    else:
-                        try:
-                            iositemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[6]
-                        except IndexError:
-                            iositemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[0]
-
-                self.sigSetStatusMessage.emit('Exporting iOS({0}/{1}): "{2}"'.format(fileCurrent, fileCount, infile))
-                for size in self.iosSizeList:
-                    if self.cancelToken:
-                        break
-
-                    convertCurrent += 1
-
-                    if self.isMultiplier:
-                        width = size * int(self.baseWidth)
-                        height = size * int(self.baseHeight)
-
-                        if size == 3:
-                            outfilename = str.replace(file, ".svg", "@3x.png")
-                        elif size == 2:
-                            outfilename = str.replace(file, ".svg", "@2x.png")
-                        else:
-                            outfilename = str.replace(file, ".svg", ".png")
-                    else:
-                        width = size
-                        height = size
-                        outfilename = "{0}_{1}.png".format(str.replace(file, ".svg", ""), size)
-
-                    if self.isXCAssets:
-                        if self.isMultiplier:
-                            iosXCAssets = "/Assets.xcassets/{0}.imageset".format(fileWithoutExt)
-                            contentjson['images'].append(
-                                {'scale': "{0}x".format(size), 'idiom': "universal", "filename": outfilename})
-                        else:
-                            iosXCAssets = "/Assets.xcassets/{0}.appiconset".format(fileWithoutExt)
-                            elems = self.getiosappiconjson(outfilename, size)
-                            for elem in elems:
-                                contentjson['images'].append(elem)
-
-                        outfile = "{0}/{1}{2}/{3}".format(self.outputDir, iosfolder, iosXCAssets, outfilename)
-                        outcontentjson = "{0}/{1}{2}/{3}".format(self.outputDir, iosfolder, iosXCAssets, "Contents.json")
-
-                        if not os.path.exists("{0}/{1}{2}".format(self.outputDir, iosfolder, iosXCAssets)):
-                            os.makedirs("{0}/{1}{2}".format(self.outputDir, iosfolder, iosXCAssets))
-
-                        if os.path.exists(outcontentjson):
-                            os.remove(outcontentjson)
-
-                        with open(outcontentjson, 'w') as outjson:
-                            json.dump(contentjson, outjson)
-                    else:
-                        outfile = "{0}/{1}/Resources/{2}".format(self.outputDir, iosfolder, outfilename)
-
-                    if self.isUpdateSolution:
-                        doInclude = True
-                        iosinclude = outfile.split("/{0}/".format(iosfolder))[1].replace("/", "\\")
-
-                        for item in iositemgroup:
-                            if item.attrib["Include"] == iosinclude:
-                                doInclude = False
-                                break
-
-                        if doInclude:
-                            if self.isXCAssets:
-                                newitem = xml.etree.ElementTree.Element("ImageAsset")
-                            else:
-                                newitem = xml.etree.ElementTree.Element("BundleResource")
-
-                            newitem.set("Include", outfile.split("/{0}/".format(iosfolder))[1].replace("/", "\\"))
-                            iositemgroup.append(newitem)
-                            iOSSolutionXml.write(iOSSolution)
-
-                    if os.path.isfile(outfile):
-                        os.remove(outfile)
-
-                    self.sigSetProgress.emit((convertCurrent / convertCount) * 100)
-                    os.system('svg2png "{0}" -o "{1}" -w {2} -h {3}'.format(infile, outfile, width, height))
-
-                if self.isXCAssets and self.isUpdateSolution:
-                    doInclude = True
-                    ioscontentinclude = outcontentjson.split("/{0}/".format(iosfolder))[1].replace("/", "\\")
-
-                    for item in iositemgroup:
-                        if item.attrib["Include"] == ioscontentinclude:
-                            doInclude = False
-                            break
-
-                    if doInclude:
-                        newitem = xml.etree.ElementTree.Element("ImageAsset")
-                        newitem.set("Include", ioscontentinclude.replace("/", "\\"))
-                        iositemgroup.append(newitem)
-                        iOSSolutionXml.write(iOSSolution)
-
-            if self.convertAndroid:
-                if self.isUpdateSolution:
-                    xml.etree.ElementTree.register_namespace("", "http://schemas.microsoft.com/developer/msbuild/2003")
-                    androidSolution = self.findAndroidSolutionFile(androidfolder)
-                    androidSolutionXml = xml.etree.ElementTree.parse(androidSolution)
-                    root = androidSolutionXml.getroot()
-
-                    try:
-                        androiditemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[3]
-                    except IndexError:
-                        androiditemgroup = root.findall("{http://schemas.microsoft.com/developer/msbuild/2003}ItemGroup")[0]
-
-                self.sigSetStatusMessage.emit('Exporting Droid({0}/{1}): "{2}"'.format(fileCurrent, fileCount, infile))
-                for size in self.androidSizeList:
-                    if self.cancelToken:
-                        break
-
-                    convertCurrent += 1
-
-                    if self.isMultiplier:
-                        if size == 3:
-                            outfile = "{0}/{1}/Resources/drawable-xxhdpi/{2}".format(self.outputDir, androidfolder,
-                                                                                       str.replace(file, ".svg", ".png"))
-                        elif size == 2:
-                            outfile = "{0}/{1}/Resources/drawable-xhdpi/{2}".format(self.outputDir, androidfolder,
-                                                                                      str.replace(file, ".svg", ".png"))
-                        elif size == 1.5:
-                            outfile = "{0}/{1}/Resources/drawable-hdpi/{2}".format(self.outputDir, androidfolder,
-                                                                                     str.replace(file, ".svg", ".png"))
-                        else:
-                            outfile = "{0}/{1}/Resources/drawable/{2}".format(self.outputDir, androidfolder,
-                                                                                str.replace(file, ".svg", ".png"))
-
-                        width = size * self.baseWidth
-                        height = size * self.baseHeight
-                    else:
-                        outfile = "{0}/{1}/Resources/{2}".format(self.outputDir, androidfolder, str.replace(file, ".svg", "_{0}".format(str(size))))
-
-                        width = size
-                        height = size
-
-                    if os.path.isfile(outfile):
-                        os.remove(outfile)
-
-                    if self.isUpdateSolution:
-                        doInclude = True
-                        androidinclude = outfile.split("/{0}/".format(androidfolder))[1].replace("/", "\\")
-
-                        for item in androiditemgroup:
-                            if item.attrib["Include"] == androidinclude:
-                                doInclude = False
-                                break
-
-                        if doInclude:
-                            newitem = xml.etree.ElementTree.Element("AndroidResource")
-                            newitem.set("Include", outfile.split("/{0}/".format(androidfolder))[1].replace("/", "\\"))
-                            androiditemgroup.append(newitem)
-                            androidSolutionXml.write(androidSolution)
-
-                    self.sigSetProgress.emit((convertCurrent / convertCount) * 100)
-                    os.system('svg2png "{0}" -o "{1}" -w {2} -h {3}'.format(infile, outfile, width, height))
-
-        if self.cancelToken:
-            self.sigSetProgress.emit(0)
-            self.sigSetProgressTotal.emit(0)
-            self.sigSetStatusMessage.emit("Flandre cancelled her job!")
-            self.sigSetUiInProgress.emit(False)
-            return
+    def setUiInProgress(self, state):
+        self.sigSetUiInProgress.emit(state)
 
-        self.sigSetStatusMessage.emit("Flandre finished her job!")
-        self.sigSetUiInProgress.emit(False)
-
-    def findAndroidSolutionFolder(self):
-        for file in os.listdir(self.outputDir):
-            if file.endswith("Droid") or file.endswith("Android"):
-                return file
-        return "Droid"
-
-    def findIosSolutionFolder(self):
-        for file in os.listdir(self.outputDir):
-            if file.endswith("iOS"):
-                return file
-        return "iOS"
-
-    def findAndroidSolutionFile(self, androidfolder):
-        for file in os.listdir("{0}/{1}".format(self.outputDir, androidfolder)):
-            if file.endswith(".csproj"):
-                return "{0}/{1}/{2}".format(self.outputDir, androidfolder, file)
-
-    def findIosSolutionFile(self, iosfolder):
-        for file in os.listdir("{0}/{1}".format(self.outputDir, iosfolder)):
-            if file.endswith(".csproj"):
-                return "{0}/{1}/{2}".format(self.outputDir, iosfolder, file)
-
-    def createDirectories(self, androidfolder, iosfolder):
-        directories = [
-            "/{0}".format(androidfolder),
-            "/{0}/Resources".format(androidfolder),
-            "/{0}/Resources/drawable".format(androidfolder),
-            "/{0}/Resources/drawable-hdpi".format(androidfolder),
-            "/{0}/Resources/drawable-xhdpi".format(androidfolder),
-            "/{0}/Resources/drawable-xxhdpi".format(androidfolder),
-            "/{0}".format(iosfolder)
-        ]
-
-        if self.isXCAssets:
-            directories.append("/{0}/Assets.xcassets".format(iosfolder))
-        else:
-            directories.append("/{0}/Resources".format(iosfolder))
-
-        for directory in directories:
-            if not os.path.exists(self.outputDir + directory):
-                os.makedirs(self.outputDir + directory)
-
-    def getiosappiconjson(self, filename, size):
-        elems = []
-        baseelem = {"filename": filename}
-
-        if size == 29:
-            newelem = baseelem.copy()
-            newelem["size"] = "29x29"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-            newelem = baseelem.copy()
-            newelem["size"] = "29x29"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 40:
-            newelem = baseelem.copy()
-            newelem["size"] = "40x40"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 50:
-            newelem = baseelem.copy()
-            newelem["size"] = "50x50"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 57:
-            newelem = baseelem.copy()
-            newelem["size"] = "57x57"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-        elif size == 58:
-            newelem = baseelem.copy()
-            newelem["size"] = "29x29"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-            newelem = baseelem.copy()
-            newelem["size"] = "29x29"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 72:
-            newelem = baseelem.copy()
-            newelem["size"] = "72x72"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 76:
-            newelem = baseelem.copy()
-            newelem["size"] = "76x76"
-            newelem["scale"] = "1x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 80:
-            newelem = baseelem.copy()
-            newelem["size"] = "40x40"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-            newelem = baseelem.copy()
-            newelem["size"] = "40x40"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 87:
-            newelem = baseelem.copy()
-            newelem["size"] = "29x29"
-            newelem["scale"] = "3x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-        elif size == 100:
-            newelem = baseelem.copy()
-            newelem["size"] = "50x50"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 114:
-            newelem = baseelem.copy()
-            newelem["size"] = "57x57"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-        elif size == 120:
-            newelem = baseelem.copy()
-            newelem["size"] = "40x40"
-            newelem["scale"] = "3x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-            newelem = baseelem.copy()
-            newelem["size"] = "60x60"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-        elif size == 144:
-            newelem = baseelem.copy()
-            newelem["size"] = "72x72"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 152:
-            newelem = baseelem.copy()
-            newelem["size"] = "76x76"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 167:
-            newelem = baseelem.copy()
-            newelem["size"] = "83.5x83.5"
-            newelem["scale"] = "2x"
-            newelem["idiom"] = "ipad"
-            elems.append(newelem)
-
-        elif size == 180:
-            newelem = baseelem.copy()
-            newelem["size"] = "60x60"
-            newelem["scale"] = "3x"
-            newelem["idiom"] = "iphone"
-            elems.append(newelem)
-
-        return elems
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
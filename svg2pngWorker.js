@@ -0,0 +1,102 @@
+"use strict";
+/* global phantom: false, window: false, document: false, btoa: false */
+
+// Long-lived PhantomJS renderer used by the "svg2png (worker pool)" renderer.
+// It rasterizes the same way svg2png does, but reads one JSON job per line from stdin
+// and answers one JSON line per job on stdout, so PhantomJS starts only once per worker.
+
+var system = require("system");
+var webpage = require("webpage");
+var fs = require("fs");
+
+var page = webpage.create();
+var pending = null;
+
+function reply(message) {
+    system.stdout.writeLine(JSON.stringify(message));
+    system.stdout.flush();
+}
+
+function next() {
+    if (system.stdin.atEnd()) {
+        phantom.exit(0);
+        return;
+    }
+
+    var line = system.stdin.readLine();
+    if (!line) {
+        setTimeout(next, 0);
+        return;
+    }
+
+    var job;
+    try {
+        job = JSON.parse(line);
+    } catch (error) {
+        reply({ ok: false, error: "Malformed job: " + line });
+        setTimeout(next, 0);
+        return;
+    }
+
+    if (job.command === "ping") {
+        reply({ id: job.id, ok: true });
+        setTimeout(next, 0);
+    } else if (job.command === "render") {
+        render(job);
+    } else {
+        reply({ id: job.id, ok: false, error: "Unknown command: " + job.command });
+        setTimeout(next, 0);
+    }
+}
+
+function render(job) {
+    var source;
+    try {
+        source = fs.read(job.input);
+    } catch (error) {
+        reply({ id: job.id, ok: false, error: "Could not read " + job.input });
+        setTimeout(next, 0);
+        return;
+    }
+
+    pending = job;
+    page.viewportSize = { width: job.width, height: job.height };
+    page.clipRect = { top: 0, left: 0, width: job.width, height: job.height };
+    page.evaluate(function (uri, width, height) {
+        document.body.innerHTML = "";
+        var img = new window.Image();
+        img.onload = function () {
+            window.callPhantom({ ok: true });
+        };
+        img.onerror = function () {
+            window.callPhantom({ ok: false, error: "Image failed to load" });
+        };
+        img.width = width;
+        img.height = height;
+        document.body.appendChild(img);
+        img.src = uri;
+    }, "data:image/svg+xml;base64," + btoa(unescape(encodeURIComponent(source))), job.width, job.height);
+}
+
+page.onCallback = function (result) {
+    setTimeout(function () {
+        var job = pending;
+        pending = null;
+
+        if (!result.ok) {
+            reply({ id: job.id, ok: false, error: result.error });
+        } else if (!page.render(job.output, { format: "png" })) {
+            reply({ id: job.id, ok: false, error: "Could not write " + job.output });
+        } else {
+            reply({ id: job.id, ok: true });
+        }
+        next();
+    }, 0);
+};
+
+page.onError = function () {};
+
+page.open("data:text/html,<!DOCTYPE html><style>html, body { margin: 0; padding: 0; background: transparent; } " +
+          "img { display: block; }</style><body></body>", function () {
+    next();
+});
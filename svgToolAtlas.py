@@ -0,0 +1,171 @@
+import json
+import plistlib
+
+from svgToolPng import decodePng, encodePng
+
+
+def intersects(first, second):
+    return first[0] < second[0] + second[2] and second[0] < first[0] + first[2] and \
+        first[1] < second[1] + second[3] and second[1] < first[1] + first[3]
+
+
+def contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and \
+        inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3]
+
+
+def splitFree(free, used):
+    # the parts of a free rectangle left around a used one, they overlap each other on purpose
+    x, y, width, height = free
+    parts = []
+    if used[0] > x:
+        parts.append((x, y, used[0] - x, height))
+    if used[0] + used[2] < x + width:
+        parts.append((used[0] + used[2], y, x + width - used[0] - used[2], height))
+    if used[1] > y:
+        parts.append((x, y, width, used[1] - y))
+    if used[1] + used[3] < y + height:
+        parts.append((x, used[1] + used[3], width, y + height - used[1] - used[3]))
+    return parts
+
+
+class MaxRectsPacker(object):
+    # maximal rectangles bin packing: the free space is kept as every largest empty rectangle,
+    # a sprite goes where it leaves the shortest side of free space (best short side fit)
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.freeRects = [(0, 0, width, height)]
+
+    def insert(self, width, height):
+        best = None
+        for x, y, freeWidth, freeHeight in self.freeRects:
+            if width <= freeWidth and height <= freeHeight:
+                leftover = sorted((freeWidth - width, freeHeight - height))
+                if best is None or (leftover, y, x) < best:
+                    best = (leftover, y, x)
+        if best is None:
+            return None
+
+        _, y, x = best
+        self.place((x, y, width, height))
+        return x, y
+
+    def place(self, used):
+        freeRects = []
+        for free in self.freeRects:
+            if intersects(free, used):
+                freeRects.extend(splitFree(free, used))
+            else:
+                freeRects.append(free)
+
+        # a free rectangle inside another one is never the better choice
+        self.freeRects = [rect for index, rect in enumerate(freeRects)
+                          if not any(other != rect and contains(other, rect) or other == rect and otherIndex < index
+                                     for otherIndex, other in enumerate(freeRects))]
+
+
+class AtlasPage(object):
+
+    def __init__(self, width, height, placements):
+        # placements are (name, x, y, width, height)
+        self.width = width
+        self.height = height
+        self.placements = placements
+
+
+def pageSizes(maxSize, area):
+    # power of two pages, smallest first, never more than twice as wide as high
+    sizes = []
+    width = 16
+    while width <= maxSize:
+        for height in (width // 2, width):
+            if height >= 16 and width * height >= area:
+                sizes.append((width, height))
+        width *= 2
+    return sizes or [(maxSize, maxSize)]
+
+
+def fillPage(sprites, width, height, padding):
+    # every sprite takes its padding on the right and bottom, the page gets the same margin so the last ones fit
+    packer = MaxRectsPacker(width + padding, height + padding)
+    placements = []
+    left = []
+    for name, spriteWidth, spriteHeight in sprites:
+        position = packer.insert(spriteWidth + padding, spriteHeight + padding)
+        if position is None:
+            left.append((name, spriteWidth, spriteHeight))
+        else:
+            placements.append((name, position[0], position[1], spriteWidth, spriteHeight))
+    return placements, left
+
+
+def packSprites(sprites, maxSize=2048, padding=2):
+    # sprites are (name, width, height), as many pages as needed are returned
+    remaining = sorted(sprites, key=lambda sprite: (-max(sprite[1], sprite[2]), -sprite[1] * sprite[2], sprite[0]))
+    pages = []
+
+    while remaining:
+        area = sum((width + padding) * (height + padding) for _, width, height in remaining)
+        for width, height in pageSizes(maxSize, area):
+            placements, left = fillPage(remaining, width, height, padding)
+            if not left:
+                break
+
+        if not placements:
+            # larger than any page, it gets one of its own
+            name, width, height = remaining[0]
+            placements, left = [(name, 0, 0, width, height)], remaining[1:]
+
+        # the page is cut down to what it holds, atlases do not need power of two sizes
+        pages.append(AtlasPage(max(x + width for _, x, _, width, _ in placements),
+                               max(y + height for _, _, y, _, height in placements), placements))
+        remaining = left
+
+    return pages
+
+
+def composePage(page, images):
+    # images are PngImage by sprite name
+    stride = page.width * 4
+    pixels = bytearray(stride * page.height)
+    for name, x, y, width, height in page.placements:
+        image = images[name]
+        for row in range(height):
+            target = (y + row) * stride + x * 4
+            pixels[target:target + width * 4] = image.pixels[row * width * 4:(row + 1) * width * 4]
+    return encodePng(page.width, page.height, bytes(pixels), 9)
+
+
+def atlasMap(pages, pageNames, scale):
+    frames = {}
+    for index, page in enumerate(pages):
+        for name, x, y, width, height in page.placements:
+            frames[name] = {'page': index, 'x': x, 'y': y, 'width': width, 'height': height}
+
+    return {
+        'frames': frames,
+        'pages': [{'image': pageName, 'width': page.width, 'height': page.height}
+                  for page, pageName in zip(pages, pageNames)],
+        'scale': scale
+    }
+
+
+def formatMap(atlas, isPlist):
+    if isPlist:
+        return plistlib.dumps(atlas).decode("utf-8")
+    return json.dumps(atlas, indent=1, sort_keys=True)
+
+
+def parseMap(text, isPlist):
+    if isPlist:
+        return plistlib.loads(text.encode("utf-8"))
+    return json.loads(text)
+
+
+def buildAtlas(sprites, maxSize=2048, padding=2):
+    # sprites are (name, png data), returns the pages and the encoded PNG of each one
+    images = {name: decodePng(data) for name, data in sprites}
+    pages = packSprites([(name, image.width, image.height) for name, image in images.items()], maxSize, padding)
+    return pages, [composePage(page, images) for page in pages]
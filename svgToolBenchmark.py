@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from svgToolConversion import Conversion, findSvgFiles
+from svgToolPng import readPng, imageDifference
+from svgToolPresets import modes, findMode
+from svgToolRenderer import createRenderer
+from svgToolScheduler import defaultWorkerCount
+
+
+corpusKinds = ["glyphs", "paths", "effects"]
+
+csprojTemplate = '''<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="4.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+{0}
+</Project>
+'''.format("\n".join("  <ItemGroup>\n    <None Include=\"Placeholder{0}.txt\" />\n  </ItemGroup>".format(index)
+                     for index in range(7)))
+
+
+def randomColor(rng):
+    return "#{0:06x}".format(rng.randrange(0x1000000))
+
+
+def glyphSvg(rng):
+    shapes = []
+    for _ in range(rng.randint(1, 3)):
+        shape = rng.choice(["circle", "rect", "polygon"])
+        if shape == "circle":
+            shapes.append('<circle cx="{0}" cy="{1}" r="{2}" fill="{3}"/>'.format(
+                rng.randint(6, 18), rng.randint(6, 18), rng.randint(2, 6), randomColor(rng)))
+        elif shape == "rect":
+            shapes.append('<rect x="{0}" y="{1}" width="{2}" height="{3}" rx="1" fill="{4}"/>'.format(
+                rng.randint(2, 10), rng.randint(2, 10), rng.randint(4, 12), rng.randint(4, 12), randomColor(rng)))
+        else:
+            points = " ".join("{0},{1}".format(rng.randint(0, 24), rng.randint(0, 24)) for _ in range(rng.randint(3, 6)))
+            shapes.append('<polygon points="{0}" fill="{1}"/>'.format(points, randomColor(rng)))
+
+    return '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24">{0}</svg>'.format(
+        "".join(shapes))
+
+
+def pathSvg(rng):
+    paths = []
+    for _ in range(rng.randint(3, 8)):
+        segments = ["M{0:.3f} {1:.3f}".format(rng.uniform(0, 240), rng.uniform(0, 240))]
+        for _ in range(rng.randint(100, 400)):
+            segments.append("C{0:.3f} {1:.3f} {2:.3f} {3:.3f} {4:.3f} {5:.3f}".format(
+                *[rng.uniform(0, 240) for _ in range(6)]))
+        segments.append("Z")
+        paths.append('<path d="{0}" fill="{1}" stroke="{2}" stroke-width="{3:.2f}" fill-rule="evenodd"/>'.format(
+            " ".join(segments), randomColor(rng), randomColor(rng), rng.uniform(0.5, 3)))
+
+    return '<svg xmlns="http://www.w3.org/2000/svg" width="240" height="240" viewBox="0 0 240 240">{0}</svg>'.format(
+        "".join(paths))
+
+
+def effectsSvg(rng):
+    defs = '''<defs>
+<linearGradient id="linear" x1="0" y1="0" x2="1" y2="1"><stop offset="0" stop-color="{0}"/><stop offset="1" stop-color="{1}"/></linearGradient>
+<radialGradient id="radial" cx="0.5" cy="0.5" r="0.5"><stop offset="0" stop-color="{2}"/><stop offset="1" stop-color="{3}" stop-opacity="0"/></radialGradient>
+<filter id="shadow" x="-20%" y="-20%" width="140%" height="140%"><feGaussianBlur in="SourceAlpha" stdDeviation="{4:.2f}"/><feOffset dx="2" dy="2" result="blur"/><feMerge><feMergeNode in="blur"/><feMergeNode in="SourceGraphic"/></feMerge></filter>
+</defs>'''.format(randomColor(rng), randomColor(rng), randomColor(rng), randomColor(rng), rng.uniform(1, 6))
+
+    shapes = []
+    for _ in range(rng.randint(4, 12)):
+        shapes.append('<ellipse cx="{0}" cy="{1}" rx="{2}" ry="{3}" fill="url(#{4})" filter="url(#shadow)" opacity="{5:.2f}"/>'.format(
+            rng.randint(20, 100), rng.randint(20, 100), rng.randint(5, 40), rng.randint(5, 40),
+            rng.choice(["linear", "radial"]), rng.uniform(0.4, 1)))
+
+    return '<svg xmlns="http://www.w3.org/2000/svg" width="120" height="120" viewBox="0 0 120 120">{0}{1}</svg>'.format(
+        defs, "".join(shapes))
+
+
+corpusGenerators = {
+    "glyphs": glyphSvg,
+    "paths": pathSvg,
+    "effects": effectsSvg
+}
+
+
+def generateCorpus(directory, kind, count, seed):
+    rng = random.Random("{0}-{1}".format(seed, kind))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    for index in range(count):
+        with open("{0}/{1}_{2:05d}.svg".format(directory, kind, index), 'w') as svg:
+            svg.write(corpusGenerators[kind](rng))
+
+
+def createSolution(outputDir):
+    for folder in ["App.Droid", "App.iOS"]:
+        os.makedirs("{0}/{1}".format(outputDir, folder))
+        with open("{0}/{1}/{1}.csproj".format(outputDir, folder), 'w') as csproj:
+            csproj.write(csprojTemplate)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def checkDownscaleQuality(corpusDir, rendererId, sizes, fileCount, workDir):
+    # compares every size scaled down from the largest one against the same size rendered from the SVG
+    renderer = createRenderer(rendererId)
+    largest = max(sizes)
+    differences = []
+
+    renderer.start(1)
+    try:
+        for file in sorted(findSvgFiles(corpusDir))[:fileCount]:
+            document = renderer.load("{0}/{1}".format(corpusDir, file))
+            try:
+                image = document.renderSource("{0}/source.png".format(workDir), largest, largest)
+                for size in sizes:
+                    if size == largest:
+                        continue
+                    document.render("{0}/rendered.png".format(workDir), size, size)
+                    document.renderScaled(image, "{0}/scaled.png".format(workDir), size, size)
+                    differences.append(imageDifference(readPng("{0}/rendered.png".format(workDir)),
+                                                       readPng("{0}/scaled.png".format(workDir))))
+            finally:
+                document.close()
+    finally:
+        renderer.stop()
+
+    return {
+        'comparisons': len(differences),
+        'minPsnr': min([difference['psnr'] for difference in differences] or [float("inf")]),
+        'maxError': max([difference['maxError'] for difference in differences] or [0])
+    }
+
+
+def runBenchmark(corpusDir, mode, rendererId, workerCount, workDir, isDownscale):
+    outputDir = tempfile.mkdtemp(prefix="output-", dir=workDir)
+    createSolution(outputDir)
+
+    baseWidth = float(mode.baseWidth) if mode.baseWidth != "" else 16.0
+    baseHeight = float(mode.baseHeight) if mode.baseHeight != "" else 16.0
+
+    conversion = Conversion(
+        findSvgFiles(corpusDir),
+        len(mode.androidSizeList) != 0,
+        len(mode.iosSizeList) != 0,
+        mode.androidSizeList,
+        mode.iosSizeList,
+        corpusDir,
+        outputDir,
+        baseWidth,
+        baseHeight,
+        mode.isMultiplier,
+        True,
+        True,
+        createRenderer(rendererId),
+        workerCount,
+        mode.name,
+        True,
+        isDownscale=isDownscale
+    )
+
+    started = time.perf_counter()
+    conversion.run()
+    seconds = time.perf_counter() - started
+
+    shutil.rmtree(outputDir, ignore_errors=True)
+
+    rendered = [output for output in conversion.outputs if output['status'] in ("rendered", "copied")]
+    latencies = [output['seconds'] for output in conversion.outputs if output['status'] == "rendered"]
+    return {
+        'preset': mode.name,
+        'renderer': rendererId,
+        'workers': workerCount,
+        'downscale': isDownscale,
+        'status': conversion.status,
+        'files': len(conversion.inputFiles),
+        'outputs': len(rendered),
+        'failures': len([output for output in conversion.outputs if output['status'] == "failed"]),
+        'seconds': seconds,
+        'filesPerSecond': len(conversion.inputFiles) / seconds if seconds else 0,
+        'outputsPerSecond': len(rendered) / seconds if seconds else 0,
+        'latencyP50': percentile(latencies, 0.5),
+        'latencyP95': percentile(latencies, 0.95),
+        'stages': conversion.stageTimes
+    }
+
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(
+        prog="svgToolBenchmark",
+        description="Measure conversion throughput on reproducible synthetic SVG corpora.")
+    parser.add_argument("--kinds", nargs="+", choices=corpusKinds, default=corpusKinds)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000],
+                        help="number of files per corpus (10 to 10000)")
+    parser.add_argument("--presets", nargs="+", default=[str(mode.id) for mode in modes], help="preset names or ids")
+    parser.add_argument("--renderer", default="stub",
+                        help="renderer id, the stub renderer needs neither svg2png nor Qt")
+    parser.add_argument("-j", "--workers", dest="workerCount", type=int, default=defaultWorkerCount())
+    parser.add_argument("--downscale", dest="isDownscale", action="store_true",
+                        help="render the largest size of every file and scale it down to the others")
+    parser.add_argument("--quality", type=int, default=0, metavar="FILES",
+                        help="compare downscaled and rendered launcher icons for this many files of every corpus")
+    parser.add_argument("--seed", default="flandre", help="seed of the corpus generator")
+    parser.add_argument("--workdir", help="directory for corpora and outputs (defaults to a temporary one)")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON file the results are written to")
+    arguments = parser.parse_args(argv)
+
+    if any(size < 10 or size > 10000 for size in arguments.sizes):
+        parser.error("--sizes must be between 10 and 10000 files")
+    # the stub renderer draws the same image at every size, there would be nothing to compare
+    if arguments.quality and arguments.renderer == "stub":
+        parser.error("--quality needs a real renderer, use --renderer qtsvg or svg2png")
+    return arguments
+
+
+def main(argv=None):
+    arguments = parseArguments(sys.argv[1:] if argv is None else argv)
+    presets = [findMode(preset) for preset in arguments.presets]
+
+    workDir = arguments.workdir or tempfile.mkdtemp(prefix="flandre-benchmark-")
+    results = []
+    qualities = []
+
+    try:
+        for kind in arguments.kinds:
+            for size in arguments.sizes:
+                corpusDir = "{0}/corpus-{1}-{2}".format(workDir, kind, size)
+                if not os.path.exists(corpusDir):
+                    generateCorpus(corpusDir, kind, size, arguments.seed)
+
+                if arguments.quality:
+                    quality = checkDownscaleQuality(corpusDir, arguments.renderer, findMode(1).iosSizeList,
+                                                    arguments.quality, workDir)
+                    quality['corpus'] = kind
+                    qualities.append(quality)
+                    print("{0:8} {1:6} downscale quality: {2} comparisons, min PSNR {3:.1f} dB, max error {4:.0f}".format(
+                        kind, size, quality['comparisons'], quality['minPsnr'], quality['maxError']))
+
+                for mode in presets:
+                    result = runBenchmark(corpusDir, mode, arguments.renderer, arguments.workerCount, workDir,
+                                          arguments.isDownscale)
+                    result['corpus'] = kind
+                    results.append(result)
+                    print("{0:8} {1:6} {2:22} {3:8.2f} files/s {4:9.2f} outputs/s  p50 {5:7.4f}s  p95 {6:7.4f}s".format(
+                        kind, size, mode.name, result['filesPerSecond'], result['outputsPerSecond'],
+                        result['latencyP50'], result['latencyP95']))
+    finally:
+        if not arguments.workdir:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    with open(arguments.output, 'w') as outjson:
+        json.dump({
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count()
+            },
+            'seed': arguments.seed,
+            'results': results,
+            'downscaleQuality': qualities
+        }, outjson, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
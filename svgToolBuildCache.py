@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+
+class BuildCache(object):
+
+    manifestName = ".flandre-cache.json"
+    manifestVersion = 1
+
+    def __init__(self, outputDir, isForceRebuild=False):
+        self.outputDir = outputDir
+        self.manifest = "{0}/{1}".format(outputDir, self.manifestName)
+        self.isForceRebuild = isForceRebuild
+        self.entries = {}
+        self.fileHashes = {}
+        self.restored = set()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.manifest, 'r') as injson:
+                manifest = json.load(injson)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(manifest, dict) and manifest.get('version') == self.manifestVersion:
+            self.entries = manifest.get('outputs', {})
+
+    def save(self):
+        temp = "{0}.tmp".format(self.manifest)
+        with open(temp, 'w') as outjson:
+            json.dump({'version': self.manifestVersion, 'outputs': self.entries}, outjson, indent=1, sort_keys=True)
+        os.replace(temp, self.manifest)
+
+    def fileHash(self, infile):
+        if infile not in self.fileHashes:
+            digest = hashlib.sha256()
+            with open(infile, 'rb') as svg:
+                for chunk in iter(lambda: svg.read(65536), b""):
+                    digest.update(chunk)
+            self.fileHashes[infile] = digest.hexdigest()
+        return self.fileHashes[infile]
+
+    def key(self, infile, width, height, preset, renderer, options=()):
+        try:
+            fileHash = self.fileHash(infile)
+        except OSError:
+            return None
+
+        # options (downscaled, optimized) are appended so outputs rendered without them keep their keys
+        key = json.dumps([fileHash, float(width), float(height), preset, renderer.id, renderer.version] + list(options))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def relativePath(self, outfile):
+        return os.path.relpath(outfile, self.outputDir).replace("\\", "/")
+
+    def restore(self, entries):
+        # outputs finished by an interrupted run count as built, even when rebuilding everything
+        self.entries.update(entries)
+        self.restored.update(entries)
+
+    def isUpToDate(self, outfile, key):
+        path = self.relativePath(outfile)
+        if (not self.isForceRebuild or path in self.restored) and key is not None \
+                and self.entries.get(path) == key and os.path.isfile(outfile):
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def update(self, outfile, key):
+        if key is None:
+            self.invalidate(outfile)
+        else:
+            self.entries[self.relativePath(outfile)] = key
+
+    def invalidate(self, outfile):
+        self.entries.pop(self.relativePath(outfile), None)
+
+    def summary(self):
+        return "{0} cache hits, {1} misses".format(self.hits, self.misses)
+
+
+class RasterCache(object):
+    # rasters produced by the conversions of a batch, any output with the same SVG content, size and
+    # rendering options is copied from the first one instead of rendered again
+
+    def __init__(self):
+        self.paths = {}
+        self.hits = 0
+
+    def key(self, fileHash, width, height, renderer, options=()):
+        key = json.dumps([fileHash, float(width), float(height), renderer.id, renderer.version] + list(options))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def lookup(self, key):
+        path = self.paths.get(key)
+        if path is not None and os.path.isfile(path):
+            return path
+        return None
+
+    def store(self, key, path):
+        if self.lookup(key) is None:
+            self.paths[key] = path
+
+    def summary(self):
+        return "{0} rasters shared, {1} copies".format(len(self.paths), self.hits)
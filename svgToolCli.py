@@ -0,0 +1,405 @@
+import argparse
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from svgToolBuildCache import RasterCache
+from svgToolConversion import Conversion, ConversionListener, walkSvgFiles
+from svgToolPresets import modes, findMode
+from svgToolRenderer import renderers, createRenderer
+from svgToolScheduler import defaultWorkerCount
+from svgToolSink import DirectorySink, ZipSink
+from svgToolTrace import Tracer, ProfilerHook
+from svgToolWatcher import DirectoryWatcher
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+# batch file keys and the command line options they override
+batchKeys = {
+    'input': "inputDir",
+    'output': "outputDir",
+    'filter': "filter",
+    'recursive': "isRecursive",
+    'include': "include",
+    'exclude': "exclude",
+    'naming': "naming",
+    'atlas': "atlas",
+    'preset': "preset",
+    'width': "width",
+    'height': "height",
+    'platforms': "platforms",
+    'xcassets': "isXCAssets",
+    'updateSolution': "isUpdateSolution"
+}
+
+# keys holding lists, a single value may be written without the list
+batchListKeys = ("include", "exclude", "platforms")
+
+
+class ConsoleListener(ConversionListener):
+
+    def __init__(self, isQuiet):
+        self.isQuiet = isQuiet
+
+    def setStatusMessage(self, statusMessage):
+        if not self.isQuiet:
+            print(statusMessage, file=sys.stderr)
+
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(
+        prog="svgToolCli",
+        description="Convert SVG files to iOS and Android PNG assets without a display.")
+    parser.add_argument("inputDir", nargs="?", help="directory containing the SVG files")
+    parser.add_argument("-o", "--output-dir", dest="outputDir",
+                        help="solution directory to export to (defaults to the input directory)")
+    parser.add_argument("-f", "--filter", default="", help="only convert files whose name contains this text")
+    parser.add_argument("-r", "--recursive", dest="isRecursive", action="store_true",
+                        help="also convert the SVG files of the subdirectories")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="only convert files matching this pattern (default *.svg), may be repeated; "
+                             "patterns with a / match the path relative to the input directory")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="skip files and directories matching this pattern, may be repeated")
+    parser.add_argument("--naming", choices=["flatten", "name"], default="flatten",
+                        help="output names of files in subdirectories: prefixed with their directories "
+                             "(icons/arrow.svg -> icons_arrow.png, the default) or their own name only")
+    parser.add_argument("-p", "--preset", default="Button Icon",
+                        help="preset name or id: {0}".format(", ".join('{0} "{1}"'.format(mode.id, mode.name) for mode in modes)))
+    parser.add_argument("-W", "--width", type=float, help="base width for multiplier presets")
+    parser.add_argument("-H", "--height", type=float, help="base height for multiplier presets")
+    parser.add_argument("--platforms", nargs="+", choices=["ios", "android"], default=["ios", "android"])
+    parser.add_argument("--no-xcassets", dest="isXCAssets", action="store_false",
+                        help="export iOS images to Resources instead of Assets.xcassets")
+    parser.add_argument("--update-solution", dest="isUpdateSolution", action="store_true",
+                        help="add the generated files to the iOS and Android .csproj")
+    parser.add_argument("--renderer", default="svg2png",
+                        choices=[renderer.id for renderer in renderers if not renderer.requiresQt])
+    parser.add_argument("-j", "--workers", dest="workerCount", type=int, default=defaultWorkerCount())
+    parser.add_argument("--timeout", dest="renderTimeout", type=float, default=120, metavar="SECONDS",
+                        help="kill a render that takes longer than this and count it as failed, 0 waits forever (default 120)")
+    parser.add_argument("--downscale", dest="isDownscale", action="store_true", default=None,
+                        help="render the largest size once and scale it down to the others (default of the preset)")
+    parser.add_argument("--no-downscale", dest="isDownscale", action="store_false",
+                        help="render every size from the SVG")
+    parser.add_argument("--optimize", dest="isOptimize", action="store_true",
+                        help="losslessly recompress the PNG files after rendering")
+    parser.add_argument("--optimize-budget", dest="optimizeBudget", type=float, default=2.0, metavar="SECONDS",
+                        help="time spent searching for a smaller encoding of each PNG (default 2)")
+    parser.add_argument("--minify", dest="isMinify", action="store_true",
+                        help="render from minified copies of the SVG files, cached in the output directory")
+    parser.add_argument("--atlas", choices=["off", "alongside", "only"], default="off",
+                        help="pack the images of each density into a sprite atlas with a JSON (Android) or plist (iOS) "
+                             "map, next to the images or instead of them (multiplier presets only)")
+    parser.add_argument("--archive", metavar="ZIP",
+                        help="write every PNG and Contents.json into this zip archive instead of the output directory")
+    parser.add_argument("--force", dest="isForceRebuild", action="store_true", help="ignore the build cache")
+    parser.add_argument("--resume", dest="isResume", action="store_true",
+                        help="keep the outputs an interrupted run with the same settings finished and only render the rest")
+    parser.add_argument("--report", help="write a JSON report of the outputs produced to this file")
+    parser.add_argument("--trace", help="write a JSONL trace of every output to this file and print a summary")
+    parser.add_argument("--profile", help="profile the conversion with cProfile and write the stats to this file")
+    parser.add_argument("-w", "--watch", dest="isWatch", action="store_true",
+                        help="keep running and convert SVG files as they are added or modified")
+    parser.add_argument("--batch", metavar="JSON",
+                        help="convert every (input, output, preset) target listed in this file, rendering each raster "
+                             "the targets have in common once")
+    parser.add_argument("-q", "--quiet", dest="isQuiet", action="store_true")
+    arguments = parser.parse_args(argv)
+    if arguments.batch and arguments.isWatch:
+        parser.error("--batch can not be combined with --watch")
+    if arguments.isRecursive and arguments.isWatch:
+        parser.error("--recursive can not be combined with --watch, only the input directory itself is watched")
+    if not arguments.batch and arguments.inputDir is None:
+        parser.error("the following arguments are required: inputDir")
+    return parser, arguments
+
+
+def createHooks(arguments):
+    hooks = []
+    if arguments.trace:
+        hooks.append(Tracer(arguments.trace))
+    if arguments.profile:
+        hooks.append(ProfilerHook(arguments.profile))
+    return hooks
+
+
+def createConversion(parser, arguments, listener, inputFiles=None, rasterCache=None):
+    try:
+        mode = findMode(arguments.preset)
+    except ValueError as error:
+        parser.error(str(error))
+
+    width = arguments.width
+    height = arguments.height
+    if mode.isMultiplier:
+        width = width if width is not None else (float(mode.baseWidth) if mode.baseWidth != "" else height)
+        height = height if height is not None else (float(mode.baseHeight) if mode.baseHeight != "" else width)
+        if width is None or height is None:
+            parser.error('preset "{0}" needs --width and --height'.format(mode.name))
+        if width <= 0 or height <= 0:
+            parser.error("width and height must be greater than 0")
+    else:
+        width = float(mode.baseWidth)
+        height = float(mode.baseHeight)
+
+    if arguments.atlas != "off" and not mode.isMultiplier:
+        parser.error('preset "{0}" has no density multipliers to pack atlases for'.format(mode.name))
+    if arguments.atlas == "only" and arguments.archive:
+        parser.error("--atlas only can not be combined with --archive")
+    # the archive is written as rendered and its files are not in the output directory for the projects to list
+    if arguments.isOptimize and arguments.archive:
+        parser.error("--optimize can not be combined with --archive")
+    if arguments.isUpdateSolution and arguments.archive:
+        parser.error("--update-solution can not be combined with --archive")
+
+    if not os.path.isdir(arguments.inputDir):
+        parser.error('input directory "{0}" does not exist'.format(arguments.inputDir))
+
+    outputDir = arguments.outputDir or arguments.inputDir
+    if not os.path.isdir(outputDir):
+        parser.error('output directory "{0}" does not exist'.format(outputDir))
+
+    return Conversion(
+        findInputFiles(arguments) if inputFiles is None else inputFiles,
+        "android" in arguments.platforms and len(mode.androidSizeList) != 0,
+        "ios" in arguments.platforms and len(mode.iosSizeList) != 0,
+        mode.androidSizeList,
+        mode.iosSizeList,
+        arguments.inputDir,
+        outputDir,
+        width,
+        height,
+        mode.isMultiplier,
+        arguments.isXCAssets,
+        arguments.isUpdateSolution,
+        createRenderer(arguments.renderer),
+        max(1, arguments.workerCount),
+        mode.name,
+        arguments.isForceRebuild,
+        listener,
+        createHooks(arguments),
+        mode.isDownscale if arguments.isDownscale is None else arguments.isDownscale,
+        arguments.isOptimize,
+        arguments.optimizeBudget,
+        ZipSink(outputDir, arguments.archive) if arguments.archive else DirectorySink(),
+        arguments.isMinify,
+        arguments.renderTimeout,
+        arguments.isResume,
+        rasterCache,
+        arguments.naming,
+        arguments.atlas
+    )
+
+
+def findInputFiles(arguments):
+    return list(walkSvgFiles(arguments.inputDir, arguments.filter, arguments.include or ["*.svg"],
+                             arguments.exclude, arguments.isRecursive))
+
+
+def runConversion(conversion):
+    # the conversion runs on its own thread, Ctrl+C only asks it to cancel so the thread is always
+    # joined to its end and leaves the journal, build cache and projects finalized
+    thread = threading.Thread(target=conversion.run)
+    previousHandler = signal.signal(signal.SIGINT, lambda signum, frame: conversion.cancel())
+    try:
+        thread.start()
+        thread.join()
+    finally:
+        signal.signal(signal.SIGINT, previousHandler)
+
+
+def watch(parser, arguments, listener):
+    changes = queue.Queue()
+    watcher = DirectoryWatcher(arguments.inputDir, changes.put, arguments.filter, arguments.include or ["*.svg"],
+                               arguments.exclude)
+    watcher.start()
+    print('Watching "{0}", press Ctrl+C to stop'.format(arguments.inputDir), file=sys.stderr)
+
+    try:
+        while True:
+            try:
+                files = set(changes.get(timeout=0.5))
+            except queue.Empty:
+                continue
+
+            while not changes.empty():
+                files.update(changes.get())
+
+            # an archive holds every asset, so it is rebuilt from all the files
+            conversion = createConversion(parser, arguments, listener, None if arguments.archive else sorted(files))
+            runConversion(conversion)
+            if conversion.status == "cancelled":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+
+def conversionReport(conversion, seconds):
+    return {
+        'status': conversion.status,
+        'seconds': seconds,
+        'optimization': conversion.optimizedFolders,
+        'sources': conversion.sourceCache.stats if conversion.sourceCache is not None else None,
+        'atlases': conversion.atlases,
+        'outputs': conversion.outputs
+    }
+
+
+def writeReport(path, report):
+    with open(path, 'w') as outjson:
+        json.dump(report, outjson, indent=2)
+
+
+def printSummaries(conversion):
+    for line in conversion.optimizationSummary():
+        print(line, file=sys.stderr)
+    for line in conversion.atlasSummary():
+        print(line, file=sys.stderr)
+    if conversion.sourceCache is not None and conversion.sourceCache.summary():
+        print(conversion.sourceCache.summary(), file=sys.stderr)
+    for hook in conversion.hooks:
+        if isinstance(hook, Tracer):
+            print(hook.summary(), file=sys.stderr)
+
+
+def loadBatch(parser, arguments):
+    # every entry is a copy of the command line options with its own overrides,
+    # relative directories are relative to the batch file
+    try:
+        with open(arguments.batch, 'r') as injson:
+            batch = json.load(injson)
+    except (OSError, ValueError) as error:
+        parser.error('could not read batch file "{0}": {1}'.format(arguments.batch, error))
+
+    if not isinstance(batch, list):
+        parser.error("the batch file must hold a list of targets")
+
+    batchDir = os.path.dirname(os.path.abspath(arguments.batch))
+    targets = []
+    for entry in batch:
+        if not isinstance(entry, dict) or 'input' not in entry:
+            parser.error('every batch target needs an "input" directory')
+        unknownKeys = sorted(set(entry) - set(batchKeys))
+        if unknownKeys:
+            parser.error('unknown batch target keys: {0}'.format(", ".join(unknownKeys)))
+
+        target = argparse.Namespace(**vars(arguments))
+        for key, dest in batchKeys.items():
+            if key in entry:
+                setattr(target, dest, batchValue(parser, key, entry[key]))
+        target.inputDir = os.path.join(batchDir, target.inputDir)
+        if target.outputDir:
+            target.outputDir = os.path.join(batchDir, target.outputDir)
+        targets.append(target)
+
+    return targets
+
+
+def batchValue(parser, key, value):
+    if key not in batchListKeys:
+        return value
+
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        parser.error('batch target key "{0}" must be a string or a list of strings'.format(key))
+    if key == "platforms" and not set(value) <= {"ios", "android"}:
+        parser.error('batch target platforms must be "ios" and/or "android"')
+    return value
+
+
+def runBatch(parser, arguments, listener):
+    # the targets run one after the other, every raster is rendered by the first target that needs it
+    # and copied by the others
+    targets = loadBatch(parser, arguments)
+    rasterCache = RasterCache()
+    reports = []
+    exitCodes = [EXIT_OK]
+    started = time.perf_counter()
+
+    for target in targets:
+        conversion = createConversion(parser, target, listener, rasterCache=rasterCache)
+        if not arguments.isQuiet:
+            print('Flandre is converting "{0}" to "{1}" ({2})'.format(
+                target.inputDir, target.outputDir or target.inputDir, target.preset), file=sys.stderr)
+        if not conversion.inputFiles:
+            print('No svg files found in "{0}"'.format(target.inputDir), file=sys.stderr)
+            exitCodes.append(EXIT_FAILED)
+            continue
+
+        targetStarted = time.perf_counter()
+        runConversion(conversion)
+        reports.append(conversionReport(conversion, time.perf_counter() - targetStarted))
+        exitCodes.append(exitCode(conversion))
+
+        if not arguments.isQuiet:
+            printSummaries(conversion)
+        if conversion.status == "cancelled":
+            break
+
+    if arguments.report:
+        writeReport(arguments.report, {'seconds': time.perf_counter() - started, 'rasters': len(rasterCache.paths),
+                                       'sharedCopies': rasterCache.hits, 'targets': reports})
+    if not arguments.isQuiet:
+        print("Batch of {0} targets: {1}".format(len(targets), rasterCache.summary()), file=sys.stderr)
+
+    return max(exitCodes)
+
+
+def exitCode(conversion):
+    if conversion.status == "cancelled":
+        return EXIT_CANCELLED
+    if conversion.status != "finished":
+        return EXIT_FAILED
+    for output in conversion.outputs + conversion.atlases:
+        if output['status'] == "failed":
+            return EXIT_FAILED
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser, arguments = parseArguments(sys.argv[1:] if argv is None else argv)
+    if arguments.batch:
+        return runBatch(parser, arguments, ConsoleListener(arguments.isQuiet))
+
+    conversion = createConversion(parser, arguments, ConsoleListener(arguments.isQuiet))
+
+    if not conversion.inputFiles and not arguments.isWatch:
+        print("No svg files found", file=sys.stderr)
+        return EXIT_FAILED
+
+    if not arguments.isResume and not arguments.isQuiet:
+        completed = conversion.checkpointCount()
+        if completed:
+            print("An interrupted run with the same settings finished {0} outputs, "
+                  "pass --resume to keep them".format(completed), file=sys.stderr)
+
+    started = time.perf_counter()
+    runConversion(conversion)
+
+    if arguments.report:
+        writeReport(arguments.report, conversionReport(conversion, time.perf_counter() - started))
+
+    if not arguments.isQuiet:
+        printSummaries(conversion)
+
+    if arguments.isWatch and conversion.status != "cancelled":
+        watch(parser, arguments, conversion.listener)
+        return EXIT_OK
+
+    return exitCode(conversion)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1103 @@
+import collections
+import contextlib
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import time
+
+from svgToolAtlas import atlasMap, buildAtlas, formatMap, parseMap
+from svgToolBuildCache import BuildCache
+from svgToolJournal import CheckpointJournal, settingsFingerprint
+from svgToolMinify import SourceCache
+from svgToolOptimizer import PngOptimizer
+from svgToolSolution import SolutionProject
+from svgToolScheduler import RenderCancelled, RenderJob, RenderTarget, RenderScheduler
+from svgToolSink import DirectorySink, copyOutput
+
+
+def findSvgFiles(inputDir, filterText=""):
+    return list(walkSvgFiles(inputDir, filterText, isRecursive=False))
+
+
+def matchesPattern(path, pattern):
+    # patterns with a slash match the path relative to the input directory, the others only the name
+    if "/" in pattern:
+        return fnmatch.fnmatchcase(path.lower(), pattern.lower())
+    return fnmatch.fnmatchcase(path.rsplit("/", 1)[-1].lower(), pattern.lower())
+
+
+def walkSvgFiles(inputDir, filterText="", include=("*.svg",), exclude=(), isRecursive=True):
+    # yields paths relative to inputDir ("icons/arrow.svg") as soon as their directory has been read,
+    # a directory comes before its subdirectories and hidden ones (.git, .flandre-sources) are skipped
+    pending = [""]
+    while pending:
+        folder = pending.pop()
+        try:
+            with os.scandir("{0}/{1}".format(inputDir, folder) if folder else inputDir) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subfolders = []
+        for entry in entries:
+            path = "{0}/{1}".format(folder, entry.name) if folder else entry.name
+            if any(matchesPattern(path, pattern) for pattern in exclude):
+                continue
+
+            try:
+                isDirectory = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if isDirectory:
+                if isRecursive and not entry.name.startswith("."):
+                    subfolders.append(path)
+            elif filterText.upper() in path.upper() and any(matchesPattern(path, pattern) for pattern in include):
+                yield path
+
+        pending.extend(reversed(subfolders))
+
+
+class ConversionListener(object):
+
+    def setProgress(self, progress):
+        pass
+
+    def setProgressTotal(self, progressTotal):
+        pass
+
+    def setStatusMessage(self, statusMessage):
+        pass
+
+    def setUiInProgress(self, state):
+        pass
+
+
+class ProgressReporter(object):
+    # coalesces the progress of a stage so a listener gets at most maxRate updates a second,
+    # throughput and ETA come from the outputs finished in the last few seconds
+
+    def __init__(self, listener, maxRate=10, window=5.0):
+        self.listener = listener
+        self.interval = 1.0 / maxRate
+        self.window = window
+        self.start(0)
+
+    def start(self, total, fileTotal=0):
+        self.total = total
+        self.fileTotal = fileTotal
+        self.current = 0
+        self.fileCurrent = 0
+        self.status = None
+        self.samples = collections.deque([(time.perf_counter(), 0)])
+        self.lastEmitted = None
+        self.isPending = False
+
+    def update(self, current, fileCurrent=None, status=None, *arguments):
+        now = time.perf_counter()
+        self.current = current
+        if fileCurrent is not None:
+            self.fileCurrent = fileCurrent
+        if status is not None:
+            self.status = (status, arguments)
+
+        self.samples.append((now, current))
+        while len(self.samples) > 2 and now - self.samples[1][0] > self.window:
+            self.samples.popleft()
+
+        self.isPending = True
+        if self.lastEmitted is None or now - self.lastEmitted >= self.interval:
+            self.emit(now)
+
+    def finish(self):
+        # the last update is never dropped, listeners end on the exact counts
+        if self.isPending:
+            self.emit(time.perf_counter())
+
+    def emit(self, now):
+        self.lastEmitted = now
+        self.isPending = False
+
+        if self.total:
+            self.listener.setProgress((self.current / self.total) * 100)
+        if self.fileTotal:
+            self.listener.setProgressTotal((self.fileCurrent / self.fileTotal) * 100)
+        if self.status is not None:
+            status, arguments = self.status
+            self.listener.setStatusMessage(status.format(self.describe(), *arguments))
+
+    def throughput(self):
+        started, startCount = self.samples[0]
+        finished, finishCount = self.samples[-1]
+        if finished - started <= 0:
+            return 0
+        return (finishCount - startCount) / (finished - started)
+
+    def eta(self):
+        throughput = self.throughput()
+        if throughput <= 0:
+            return None
+        return (self.total - self.current) / throughput
+
+    def describe(self):
+        text = "{0}/{1}".format(self.current, self.total)
+        eta = self.eta()
+        if eta is not None:
+            minutes, seconds = divmod(int(round(eta)), 60)
+            hours, minutes = divmod(minutes, 60)
+            text += ", {0:.1f}/s, ETA {1}".format(self.throughput(), "{0}:{1:02}:{2:02}".format(hours, minutes, seconds)
+                                                     if hours else "{0}:{1:02}".format(minutes, seconds))
+        return text
+
+
+class Conversion(object):
+
+    cancelToken = False
+    progressRate = 10
+    atlasName = "atlas"
+    atlasDirectory = ".flandre-atlas"
+    atlasMaxSize = 2048
+    atlasPadding = 2
+    scheduler = None
+    optimizer = None
+    journal = None
+    iosProject = None
+    androidProject = None
+
+    def __init__(self, inputFiles, convertAndroid, convertIos, androidSizeList, iosSizeList, inputDir, outputDir, baseWidth, baseHeight, isMultiplier, isXCAssets, isUpdateSolution, renderer, workerCount, preset, isForceRebuild, listener=None, hooks=None, isDownscale=False, isOptimize=False, optimizeBudget=2.0, sink=None, isMinify=False, renderTimeout=None, isResume=False, rasterCache=None, naming="flatten", atlas="off"):
+        self.inputFiles = inputFiles
+        self.convertAndroid = convertAndroid
+        self.convertIos = convertIos
+        self.androidSizeList = androidSizeList
+        self.iosSizeList = iosSizeList
+        self.inputDir = inputDir
+        self.outputDir = outputDir
+        self.baseWidth = baseWidth
+        self.baseHeight = baseHeight
+        self.isMultiplier = isMultiplier
+        self.isXCAssets = isXCAssets
+        self.isUpdateSolution = isUpdateSolution
+        self.renderer = renderer
+        self.workerCount = workerCount
+        self.preset = preset
+        self.isForceRebuild = isForceRebuild
+        self.listener = listener or ConversionListener()
+        self.progress = None
+        self.hooks = hooks or []
+        self.isDownscale = isDownscale
+        self.isOptimize = isOptimize
+        self.optimizeBudget = optimizeBudget
+        self.sink = sink or DirectorySink()
+        self.isMinify = isMinify
+        self.renderTimeout = renderTimeout
+        self.isResume = isResume
+        self.rasterCache = rasterCache
+        self.naming = naming
+        self.atlas = atlas
+        self.sourceCache = None
+        self.status = None
+        self.outputs = []
+        self.stageTimes = {}
+        self.optimizedFolders = {}
+        self.completedOutputs = set()
+        self.rasterKeys = {}
+        self.importedOutputs = set()
+        self.optimizeKeys = {}
+        self.pendingIncludes = []
+        self.pendingContents = []
+        self.atlasSprites = {}
+        self.atlases = []
+
+    def cancel(self):
+        self.cancelToken = True
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+        if self.optimizer is not None:
+            self.optimizer.cancel()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stageTimes[name] = self.stageTimes.get(name, 0) + time.perf_counter() - started
+
+    def run(self):
+        # created here, the GUI swaps the listener for its thread after construction
+        self.progress = ProgressReporter(self.listener, self.progressRate)
+
+        for hook in self.hooks:
+            hook.conversionStarted(self)
+
+        # anything escaping the thread would leave the GUI in progress forever
+        try:
+            self.convert()
+        except Exception as error:
+            self.status = "failed"
+            self.listener.setStatusMessage("Flandre failed her job: {0}".format(error))
+        finally:
+            for hook in self.hooks:
+                hook.conversionFinished(self)
+            self.listener.setUiInProgress(False)
+
+    def convert(self):
+        androidfolder = self.findAndroidSolutionFolder()
+        iosfolder = self.findIosSolutionFolder()
+
+        self.sink.open()
+        try:
+            self.buildOutputs(androidfolder, iosfolder)
+        except BaseException:
+            # only a cancelled run is offered to resume, the outputs a failed one finished are in the build cache
+            self.sink.abort()
+            if self.journal is not None:
+                self.journal.discard()
+            raise
+
+        if self.cancelToken:
+            self.sink.abort()
+            if self.journal is not None:
+                self.journal.close()
+            self.status = "cancelled"
+            self.listener.setProgress(0)
+            self.listener.setProgressTotal(0)
+            self.listener.setStatusMessage("Flandre cancelled her job!")
+            return
+
+        with self.stage("filesystem"):
+            self.sink.close()
+            if self.journal is not None:
+                self.journal.discard()
+
+        self.status = "finished"
+        summary = self.buildCache.summary()
+        if self.optimizedFolders:
+            summary += ", {0} bytes saved".format(sum(folder['before'] - folder['after'] for folder in self.optimizedFolders.values()))
+        if self.sourceCache is not None and self.sourceCache.stats['files']:
+            summary += ", sources {0:.1f}% smaller".format(self.sourceCache.reduction())
+        if self.atlases:
+            summary += ", {0} atlases".format(len(self.atlases))
+        if self.sink.describe():
+            summary += ", {0}".format(self.sink.describe())
+        self.listener.setStatusMessage("Flandre finished her job! ({0})".format(summary))
+
+    def buildOutputs(self, androidfolder, iosfolder):
+        with self.stage("filesystem"):
+            self.createDirectories(androidfolder, iosfolder)
+
+        # an archive is always written complete, there are no loose files to reuse
+        with self.stage("cache"):
+            self.buildCache = BuildCache(self.outputDir, self.isForceRebuild or self.sink.isArchive)
+        if not self.sink.isArchive:
+            with self.stage("cache"):
+                self.openJournal()
+        if self.isMinify:
+            with self.stage("normalizing"):
+                self.sourceCache = SourceCache(self.outputDir)
+
+        if self.isUpdateSolution:
+            with self.stage("solution"):
+                if self.convertIos:
+                    self.iosProject = SolutionProject(self.findIosSolutionFile(iosfolder))
+                if self.convertAndroid:
+                    self.androidProject = SolutionProject(self.findAndroidSolutionFile(androidfolder))
+
+        self.listener.setStatusMessage("Flandre is planning her job...")
+        jobs = self.planJobs(androidfolder, iosfolder)
+
+        if not self.cancelToken:
+            try:
+                with self.stage("rendering"):
+                    self.renderJobs(jobs)
+                if self.isOptimize and not self.sink.isArchive and not self.cancelToken:
+                    with self.stage("optimizing"):
+                        self.optimizeOutputs()
+                if self.isAtlas() and not self.cancelToken:
+                    with self.stage("atlas"):
+                        self.buildAtlases(androidfolder, iosfolder)
+            finally:
+                if not self.sink.isArchive:
+                    with self.stage("cache"):
+                        self.buildCache.save()
+                if self.sourceCache is not None:
+                    with self.stage("normalizing"):
+                        self.sourceCache.save()
+
+        # Contents.json and the .csproj only list the outputs that exist, a resumed run adds the rest
+        with self.stage("contentsJson"):
+            self.writePendingContents()
+        with self.stage("solution"):
+            self.applyPendingIncludes()
+            self.saveSolutionProjects()
+
+    def settings(self):
+        # everything that decides which outputs a run produces and how they are rendered
+        return {
+            'inputDir': os.path.abspath(self.inputDir),
+            'inputFiles': sorted(self.inputFiles),
+            'android': [self.convertAndroid, list(self.androidSizeList)],
+            'ios': [self.convertIos, list(self.iosSizeList), self.isXCAssets],
+            'base': [self.baseWidth, self.baseHeight, self.isMultiplier],
+            'solution': self.isUpdateSolution,
+            'renderer': [self.renderer.id, self.renderer.version],
+            'preset': self.preset,
+            'naming': self.naming,
+            'atlas': self.atlas if self.isAtlas() else "off",
+            'options': self.cacheOptions()
+        }
+
+    def checkpointCount(self):
+        # outputs finished by an interrupted run with the same settings, that a resumed run would skip
+        if self.sink.isArchive:
+            return 0
+        return len(CheckpointJournal(self.outputDir).load(settingsFingerprint(self.settings())))
+
+    def openJournal(self):
+        self.journal = CheckpointJournal(self.outputDir)
+        fingerprint = settingsFingerprint(self.settings())
+        entries = self.journal.load(fingerprint) if self.isResume else {}
+        self.buildCache.restore(entries)
+        self.journal.open(fingerprint, entries)
+
+    def recordCheckpoint(self, outfile):
+        if self.journal is not None:
+            self.journal.record(outfile, self.buildCache.entries.get(self.buildCache.relativePath(outfile)))
+
+    def planJobs(self, androidfolder, iosfolder):
+        jobs = []
+        names = self.outputNames()
+        # with atlases only, the sprites are not part of the solution and have no asset catalog
+        isXCAssets = self.isXCAssets and not self.isAtlasOnly()
+        isUpdateSolution = self.isUpdateSolution and not self.isAtlasOnly()
+
+        for file in self.inputFiles:
+            if self.cancelToken:
+                break
+
+            name = names[file]
+            fileWithoutExt = str(name).replace(".svg", "")
+            infile = "{0}/{1}".format(self.inputDir, file)
+            targets = []
+
+            if self.convertIos:
+                if isXCAssets:
+                    if self.isMultiplier:
+                        contentjson = {
+                            'images': [{'idiom': "universal"}],
+                            'properties': {'template-rendering-intent': ""},
+                            'info': {'version': 1, 'author': "xcode"}
+                        }
+                    else:
+                        contentjson = {
+                            'images': [],
+                            'info': {'version': 1, 'author': "xcode"}
+                        }
+
+                if isUpdateSolution:
+                    if isXCAssets:
+                        iositemgroup = self.iosProject.itemGroup(1)
+                    else:
+                        iositemgroup = self.iosProject.itemGroup(6)
+
+                for size in self.iosSizeList:
+                    if self.isMultiplier:
+                        width = size * int(self.baseWidth)
+                        height = size * int(self.baseHeight)
+
+                        if size == 3:
+                            outfilename = str.replace(name, ".svg", "@3x.png")
+                        elif size == 2:
+                            outfilename = str.replace(name, ".svg", "@2x.png")
+                        else:
+                            outfilename = str.replace(name, ".svg", ".png")
+                    else:
+                        width = size
+                        height = size
+                        outfilename = "{0}_{1}.png".format(str.replace(name, ".svg", ""), size)
+
+                    if isXCAssets:
+                        if self.isMultiplier:
+                            iosXCAssets = "/Assets.xcassets/{0}.imageset".format(fileWithoutExt)
+                            contentjson['images'].append(
+                                {'scale': "{0}x".format(size), 'idiom': "universal", "filename": outfilename})
+                        else:
+                            iosXCAssets = "/Assets.xcassets/{0}.appiconset".format(fileWithoutExt)
+                            elems = self.getiosappiconjson(outfilename, size)
+                            for elem in elems:
+                                contentjson['images'].append(elem)
+
+                        outfile = "{0}/{1}{2}/{3}".format(self.outputDir, iosfolder, iosXCAssets, outfilename)
+                        outcontentjson = "{0}/{1}{2}/{3}".format(self.outputDir, iosfolder, iosXCAssets, "Contents.json")
+
+                        with self.stage("filesystem"):
+                            self.sink.makeDirectory("{0}/{1}{2}".format(self.outputDir, iosfolder, iosXCAssets))
+                    else:
+                        outfile = "{0}/{1}/Resources/{2}".format(self.outputDir, iosfolder, outfilename)
+
+                    if self.isAtlas():
+                        outfile = self.planSprite("ios", size, fileWithoutExt, outfile)
+
+                    if isUpdateSolution:
+                        iosinclude = outfile.split("/{0}/".format(iosfolder))[1].replace("/", "\\")
+
+                        if isXCAssets:
+                            self.deferInclude(outfile, self.iosProject, iositemgroup, "ImageAsset", iosinclude)
+                        else:
+                            self.deferInclude(outfile, self.iosProject, iositemgroup, "BundleResource", iosinclude)
+
+                    self.planTarget(targets, infile, outfile, width, height)
+
+                if isXCAssets and self.iosSizeList:
+                    if isUpdateSolution:
+                        ioscontentinclude = outcontentjson.split("/{0}/".format(iosfolder))[1].replace("/", "\\")
+                        self.deferInclude(outcontentjson, self.iosProject, iositemgroup, "ImageAsset", ioscontentinclude)
+                    self.pendingContents.append((outcontentjson, contentjson))
+
+            if self.convertAndroid:
+                if isUpdateSolution:
+                    androiditemgroup = self.androidProject.itemGroup(3)
+
+                for size in self.androidSizeList:
+                    if self.isMultiplier:
+                        if size == 3:
+                            outfile = "{0}/{1}/Resources/drawable-xxhdpi/{2}".format(self.outputDir, androidfolder,
+                                                                                       str.replace(name, ".svg", ".png"))
+                        elif size == 2:
+                            outfile = "{0}/{1}/Resources/drawable-xhdpi/{2}".format(self.outputDir, androidfolder,
+                                                                                      str.replace(name, ".svg", ".png"))
+                        elif size == 1.5:
+                            outfile = "{0}/{1}/Resources/drawable-hdpi/{2}".format(self.outputDir, androidfolder,
+                                                                                     str.replace(name, ".svg", ".png"))
+                        else:
+                            outfile = "{0}/{1}/Resources/drawable/{2}".format(self.outputDir, androidfolder,
+                                                                                str.replace(name, ".svg", ".png"))
+
+                        width = size * self.baseWidth
+                        height = size * self.baseHeight
+                    else:
+                        outfile = "{0}/{1}/Resources/{2}".format(self.outputDir, androidfolder, str.replace(name, ".svg", "_{0}".format(str(size))))
+
+                        width = size
+                        height = size
+
+                    if self.isAtlas():
+                        outfile = self.planSprite("android", size, fileWithoutExt, outfile)
+
+                    if isUpdateSolution:
+                        androidinclude = outfile.split("/{0}/".format(androidfolder))[1].replace("/", "\\")
+                        self.deferInclude(outfile, self.androidProject, androiditemgroup, "AndroidResource", androidinclude)
+
+                    self.planTarget(targets, infile, outfile, width, height)
+
+            if targets:
+                targets = self.groupTargets(targets)
+                jobs.append(RenderJob(file, infile, targets, self.normalizeSource(infile, targets)))
+
+        return jobs
+
+    def outputName(self, file):
+        # files of subdirectories are exported flattened ("icons/arrow.svg" -> "icons_arrow.png")
+        # or under their own name
+        stem = os.path.splitext(file)[0]
+        if self.naming == "name":
+            stem = stem.rsplit("/", 1)[-1]
+        return "{0}.svg".format(stem.replace("/", "_"))
+
+    def outputNames(self):
+        names = {}
+        files = {}
+        for file in self.inputFiles:
+            name = self.outputName(file)
+            if name in files:
+                raise IOError('"{0}" and "{1}" would both be exported as "{2}"'.format(files[name], file, name[:-4]))
+            if self.isAtlas() and re.match(r"{0}(_\d+)?\.svg$".format(self.atlasName), name):
+                raise IOError('"{0}" would be exported with the name of an atlas'.format(file))
+            files[name] = file
+            names[file] = name
+        return names
+
+    def isAtlas(self):
+        # atlases hold the sprites of multiplier presets, one atlas per density
+        return self.atlas != "off" and self.isMultiplier
+
+    def isAtlasOnly(self):
+        return self.isAtlas() and self.atlas == "only"
+
+    def planSprite(self, platform, size, frame, outfile):
+        # with atlases only, the sprites are rendered out of the solution, into .flandre-atlas
+        if self.isAtlasOnly():
+            outfile = "{0}/{1}/{2}".format(self.outputDir, self.atlasDirectory,
+                                           os.path.relpath(outfile, self.outputDir).replace("\\", "/"))
+            with self.stage("filesystem"):
+                self.sink.makeDirectory(outfile.rsplit("/", 1)[0])
+
+        self.atlasSprites.setdefault((platform, size), []).append((frame, outfile))
+        return outfile
+
+    def planTarget(self, targets, infile, outfile, width, height):
+        with self.stage("cache"):
+            cacheKey = self.buildCache.key(infile, width, height, self.preset, self.renderer, self.cacheOptions())
+            isUpToDate = self.buildCache.isUpToDate(outfile, cacheKey)
+            if self.rasterCache is not None and cacheKey is not None:
+                self.rasterKeys[outfile] = self.rasterCache.key(self.buildCache.fileHash(infile), width, height,
+                                                                self.renderer, self.cacheOptions())
+
+        if isUpToDate:
+            self.addOutput({'input': infile, 'output': outfile, 'width': width, 'height': height,
+                            'renderer': self.renderer.id, 'status': "cached", 'seconds': 0})
+            self.shareRaster(outfile)
+            return
+
+        with self.stage("filesystem"):
+            self.sink.remove(outfile)
+            if self.importRaster(infile, outfile, width, height, cacheKey):
+                return
+
+        targets.append(RenderTarget(outfile, width, height, cacheKey))
+
+    def importRaster(self, infile, outfile, width, height, cacheKey):
+        # another conversion of the batch already produced these pixels
+        if outfile not in self.rasterKeys:
+            return False
+        path = self.rasterCache.lookup(self.rasterKeys[outfile])
+        if path is None or path == outfile:
+            return False
+
+        started = time.perf_counter()
+        startedAt = time.time()
+        try:
+            self.sink.importFile(path, outfile)
+        except OSError:
+            return False
+
+        self.rasterCache.hits += 1
+        self.importedOutputs.add(outfile)
+        self.buildCache.update(outfile, cacheKey)
+        self.addOutput({'input': infile, 'output': outfile, 'width': width, 'height': height,
+                        'renderer': self.renderer.id, 'started': startedAt, 'finished': time.time(),
+                        'seconds': time.perf_counter() - started, 'status': "copied", 'source': path,
+                        'bytes': self.sink.size(outfile)})
+        self.recordCheckpoint(outfile)
+        return True
+
+    def shareRaster(self, outfile):
+        # only loose files can be copied by the following conversions
+        if outfile in self.rasterKeys and not self.sink.isArchive:
+            self.rasterCache.store(self.rasterKeys[outfile], outfile)
+
+    def finishOutput(self, outfile):
+        # the output will not change any more: it can be resumed from and shared with the rest of the batch
+        self.recordCheckpoint(outfile)
+        self.shareRaster(outfile)
+
+    def deferInclude(self, outfile, project, itemgroup, tag, include):
+        self.pendingIncludes.append((outfile, project, itemgroup, tag, include))
+
+    def completeOutput(self, outfile):
+        self.completedOutputs.add(outfile)
+
+    def applyPendingIncludes(self):
+        # in plan order whatever order the outputs finished in, so parallel runs write the same projects as serial ones
+        for outfile, project, itemgroup, tag, include in self.pendingIncludes:
+            if outfile in self.completedOutputs:
+                project.include(itemgroup, tag, include)
+        self.pendingIncludes = []
+
+    def writePendingContents(self):
+        for outcontentjson, contentjson in self.pendingContents:
+            folder = outcontentjson.rsplit("/", 1)[0]
+            images = [image for image in contentjson['images']
+                      if 'filename' not in image or "{0}/{1}".format(folder, image['filename']) in self.completedOutputs]
+            if len(images) == len([image for image in images if 'filename' not in image]):
+                continue
+
+            self.writeContentsJson(outcontentjson, dict(contentjson, images=images))
+            self.completeOutput(outcontentjson)
+        self.pendingContents = []
+
+    def normalizeSource(self, infile, targets):
+        # files left to render are minified once, every load of the document then parses the smaller copy
+        if self.sourceCache is None:
+            return infile
+
+        loads = 1 if self.renderer.parsesOnce or self.isDownscale else len(targets)
+        with self.stage("normalizing"):
+            try:
+                return self.sourceCache.normalize(infile, self.buildCache.fileHash(infile), loads)
+            except OSError:
+                return infile
+
+    def groupTargets(self, targets):
+        # presets often ask for the same pixels on both platforms (iOS @2x and Android xhdpi for example),
+        # each size is rendered once and copied to the other destinations
+        groups = {}
+        for target in targets:
+            source = groups.get((target.width, target.height))
+            if source is None:
+                groups[(target.width, target.height)] = target
+            else:
+                target.source = source.outfile
+                source.duplicates.append(target)
+        return list(groups.values())
+
+    def renderJobs(self, jobs):
+        outputCurrent = 0
+        outputCount = sum(job.outputCount() for job in jobs)
+        fileCurrent = 0
+        fileCount = len(jobs)
+        pendingTargets = {job.file: job.outputCount() for job in jobs}
+        self.progress.start(outputCount, fileCount)
+
+        self.scheduler = RenderScheduler(self.renderer, self.workerCount, self.hooks, self.isDownscale, self.sink,
+                                         self.renderTimeout)
+        if self.cancelToken:
+            self.scheduler.cancel()
+
+        for job, target, error in self.scheduler.run(jobs):
+            outputCurrent += 1
+            pendingTargets[job.file] -= 1
+
+            output = {'input': job.infile, 'output': target.outfile, 'width': target.width, 'height': target.height,
+                      'renderer': self.renderer.id, 'started': target.started, 'finished': target.finished,
+                      'seconds': target.seconds}
+
+            status = None
+            if error is None and target.source is not None:
+                output['status'] = "copied"
+                output['source'] = target.source
+                output['bytes'] = self.sink.size(target.outfile)
+                self.cacheOutput(target.outfile, target.cacheKey)
+            elif error is None:
+                output['status'] = "rendered"
+                output['bytes'] = self.sink.size(target.outfile)
+                self.cacheOutput(target.outfile, target.cacheKey)
+                status = ('Exporting ({0}): "{1}"', job.infile)
+            elif isinstance(error, RenderCancelled):
+                output['status'] = "cancelled"
+            else:
+                output['status'] = "failed"
+                output['error'] = str(error)
+                self.buildCache.invalidate(target.outfile)
+                status = ('Failed to export "{1}" ({0}): {2}', target.outfile, error)
+            self.addOutput(output)
+            # optimized outputs are only final once the optimizer is done with them
+            if output['status'] in ("rendered", "copied") and not self.isOptimize:
+                self.finishOutput(target.outfile)
+
+            if pendingTargets[job.file] == 0:
+                fileCurrent += 1
+            self.progress.update(outputCurrent, fileCurrent, *(status or ()))
+
+        self.progress.finish()
+
+    def cacheOutput(self, outfile, key):
+        # the key of an optimized output says it was optimized, it is only cached once the optimizer is done with it
+        if self.isOptimize:
+            self.buildCache.invalidate(outfile)
+            self.optimizeKeys[outfile] = key
+        else:
+            self.buildCache.update(outfile, key)
+
+    def cacheOptions(self):
+        options = []
+        if self.isDownscale:
+            options.append("downscale")
+        if self.isOptimize:
+            options.append("optimize")
+        if self.isMinify:
+            options.append("minify")
+        return options
+
+    def optimizeOutputs(self):
+        # copies of the same size are hard links to one file, each file is optimized once and linked again
+        groups = {}
+        for output in self.outputs:
+            # rasters of the batch come from a conversion that already optimized them
+            if output['status'] not in ("rendered", "copied") or output['output'] in self.importedOutputs:
+                continue
+            try:
+                stat = os.stat(output['output'])
+            except OSError:
+                continue
+            groups.setdefault((stat.st_dev, stat.st_ino), []).append(output)
+
+        pending = {group[0]['output']: group for group in groups.values()}
+        if not pending:
+            return
+
+        fileCurrent = 0
+        fileCount = len(pending)
+
+        self.optimizer = PngOptimizer(self.workerCount, self.optimizeBudget)
+        self.listener.setStatusMessage("Flandre is optimizing {0} images...".format(fileCount))
+        self.listener.setProgress(0)
+        self.progress.start(fileCount)
+
+        for path, before, after, error in self.optimizer.run(list(pending)):
+            group = pending.pop(path)
+            fileCurrent += 1
+
+            if error is not None:
+                self.progress.update(fileCurrent, None, 'Failed to optimize "{1}" ({0}): {2}', path, error)
+                continue
+            self.progress.update(fileCurrent, None, 'Optimizing ({0}): "{1}"', path)
+
+            for output in group:
+                if after < before and output['output'] != path:
+                    temp = "{0}.tmp".format(output['output'])
+                    copyOutput(path, temp)
+                    os.replace(temp, output['output'])
+
+                output['bytes'] = min(before, after)
+                output['originalBytes'] = before
+                folder = self.optimizedFolders.setdefault(self.platformFolder(output['output']),
+                                                          {'files': 0, 'before': 0, 'after': 0})
+                folder['files'] += 1
+                folder['before'] += before
+                folder['after'] += min(before, after)
+                self.buildCache.update(output['output'], self.optimizeKeys.pop(output['output'], None))
+                self.finishOutput(output['output'])
+
+        self.progress.finish()
+
+    def buildAtlases(self, androidfolder, iosfolder):
+        # every density gets an atlas of the sprites that were produced and a map of where each one is
+        groups = sorted(self.atlasSprites.items())
+        self.listener.setStatusMessage("Flandre is packing {0} atlases...".format(len(groups)))
+        self.progress.start(len(groups))
+
+        for current, ((platform, size), sprites) in enumerate(groups, 1):
+            if self.cancelToken:
+                break
+
+            sprites = [(frame, outfile) for frame, outfile in sprites if outfile in self.completedOutputs]
+            if sprites:
+                if platform == "ios":
+                    self.buildIosAtlas(iosfolder, size, sprites)
+                else:
+                    self.buildAndroidAtlas(androidfolder, size, sprites)
+            self.progress.update(current, None, 'Packing atlases ({0})')
+
+        self.progress.finish()
+
+    def buildIosAtlas(self, iosfolder, size, sprites):
+        # bundle resources: atlas.png, atlas@2x.png and atlas@2x.plist, extra pages are atlas_1@2x.png
+        folder = "{0}/{1}/Resources".format(self.outputDir, iosfolder)
+        suffix = "@{0}x".format(size) if size != 1 else ""
+        includes = None
+        if self.isUpdateSolution:
+            includes = (self.iosProject, self.iosProject.itemGroup(6), "BundleResource", "BundleResource",
+                        "{0}/{1}".format(self.outputDir, iosfolder))
+
+        self.buildAtlas(size, sprites, folder, "{0}/{1}{2}.plist".format(folder, self.atlasName, suffix),
+                        lambda page: "{0}{1}{2}.png".format(self.atlasName, "_{0}".format(page) if page else "", suffix),
+                        True, includes)
+
+    def buildAndroidAtlas(self, androidfolder, size, sprites):
+        # the pages are drawables of their density, the maps are assets (Assets/atlas/drawable-xhdpi.json)
+        density = sprites[0][1].rsplit("/", 2)[1]
+        folder = "{0}/{1}/Resources/{2}".format(self.outputDir, androidfolder, density)
+        includes = None
+        if self.isUpdateSolution:
+            includes = (self.androidProject, self.androidProject.itemGroup(3), "AndroidResource", "AndroidAsset",
+                        "{0}/{1}".format(self.outputDir, androidfolder))
+
+        self.buildAtlas(size, sprites, folder,
+                        "{0}/{1}/Assets/{2}/{3}.json".format(self.outputDir, androidfolder, self.atlasName, density),
+                        lambda page: "{0}{1}.png".format(self.atlasName, "_{0}".format(page) if page else ""),
+                        False, includes)
+
+    def buildAtlas(self, size, sprites, folder, mapfile, pageName, isPlist, includes):
+        key = self.atlasKey(size, sprites)
+        previousPages = self.atlasPages(mapfile, isPlist)
+
+        if self.buildCache.isUpToDate(mapfile, key) and previousPages is not None and \
+                all(os.path.isfile("{0}/{1}".format(folder, page)) for page in previousPages):
+            self.finishAtlas(folder, mapfile, previousPages, len(sprites), "cached", includes)
+            return
+
+        try:
+            with self.stage("filesystem"):
+                data = [(frame, self.sink.read(outfile)) for frame, outfile in sprites]
+            pages, pngs = buildAtlas(data, self.atlasMaxSize, self.atlasPadding)
+            pageNames = [pageName(page) for page in range(len(pages))]
+
+            with self.stage("filesystem"):
+                self.sink.makeDirectory(folder)
+                self.sink.makeDirectory(mapfile.rsplit("/", 1)[0])
+                for page, png in zip(pageNames, pngs):
+                    self.sink.writeBytes("{0}/{1}".format(folder, page), png)
+                self.sink.writeText(mapfile, formatMap(atlasMap(pages, pageNames, size), isPlist))
+                # pages a larger atlas needed before
+                for page in set(previousPages or ()) - set(pageNames):
+                    self.sink.remove("{0}/{1}".format(folder, page))
+        except (OSError, ValueError) as error:
+            self.buildCache.invalidate(mapfile)
+            self.atlases.append({'output': mapfile, 'status': "failed", 'error': str(error)})
+            self.listener.setStatusMessage('Failed to pack "{0}": {1}'.format(mapfile, error))
+            return
+
+        self.buildCache.update(mapfile, key)
+        self.finishAtlas(folder, mapfile, pageNames, len(sprites), "packed", includes)
+
+    def atlasKey(self, size, sprites):
+        # an atlas changes with the pixels of its sprites, which their cache keys stand for
+        keys = [(frame, self.buildCache.entries.get(self.buildCache.relativePath(outfile))) for frame, outfile in sprites]
+        if any(spriteKey is None for _, spriteKey in keys):
+            return None
+        key = json.dumps([size, self.atlasMaxSize, self.atlasPadding, sorted(keys)])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def atlasPages(self, mapfile, isPlist):
+        if self.sink.isArchive:
+            return None
+        try:
+            with open(mapfile, 'r') as inmap:
+                return [page['image'] for page in parseMap(inmap.read(), isPlist)['pages']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def finishAtlas(self, folder, mapfile, pageNames, spriteCount, status, includes):
+        outfiles = ["{0}/{1}".format(folder, page) for page in pageNames]
+        if includes is not None:
+            project, itemgroup, pageTag, mapTag, projectFolder = includes
+            for outfile in outfiles:
+                self.deferInclude(outfile, project, itemgroup, pageTag,
+                                  os.path.relpath(outfile, projectFolder).replace("/", "\\"))
+            self.deferInclude(mapfile, project, itemgroup, mapTag,
+                              os.path.relpath(mapfile, projectFolder).replace("/", "\\"))
+
+        for outfile in outfiles + [mapfile]:
+            self.completeOutput(outfile)
+        self.atlases.append({'output': mapfile, 'pages': outfiles, 'sprites': spriteCount, 'status': status,
+                             'bytes': sum(self.sink.size(outfile) for outfile in outfiles)})
+
+    def platformFolder(self, outfile):
+        parts = os.path.relpath(outfile, self.outputDir).replace("\\", "/").split("/")
+        if len(parts) > 2 and parts[1] == "Assets.xcassets":
+            return "/".join(parts[:2])
+        return "/".join(parts[:-1])
+
+    def optimizationSummary(self):
+        lines = []
+        for name, folder in sorted(self.optimizedFolders.items()):
+            saved = folder['before'] - folder['after']
+            lines.append("{0}: {1} files, {2} -> {3} bytes ({4} saved, {5:.1f}%)".format(
+                name, folder['files'], folder['before'], folder['after'], saved,
+                100 * saved / folder['before'] if folder['before'] else 0))
+        return lines
+
+    def atlasSummary(self):
+        lines = []
+        for atlas in self.atlases:
+            name = os.path.relpath(atlas['output'], self.outputDir).replace("\\", "/")
+            if atlas['status'] == "failed":
+                lines.append("{0}: failed, {1}".format(name, atlas['error']))
+            else:
+                lines.append("{0}: {1} sprites, {2} page(s), {3} bytes ({4})".format(
+                    name, atlas['sprites'], len(atlas['pages']), atlas['bytes'], atlas['status']))
+        return lines
+
+    def addOutput(self, output):
+        self.outputs.append(output)
+        if output['status'] in ("rendered", "copied", "cached"):
+            self.completeOutput(output['output'])
+        for hook in self.hooks:
+            hook.outputFinished(output)
+
+    def writeContentsJson(self, outcontentjson, contentjson):
+        return self.sink.writeText(outcontentjson, json.dumps(contentjson))
+
+    def saveSolutionProjects(self):
+        if self.iosProject is not None:
+            self.iosProject.save()
+        if self.androidProject is not None:
+            self.androidProject.save()
+
+    def findAndroidSolutionFolder(self):
+        for file in os.listdir(self.outputDir):
+            if file.endswith("Droid") or file.endswith("Android"):
+                return file
+        return "Droid"
+
+    def findIosSolutionFolder(self):
+        for file in os.listdir(self.outputDir):
+            if file.endswith("iOS"):
+                return file
+        return "iOS"
+
+    def findAndroidSolutionFile(self, androidfolder):
+        for file in os.listdir("{0}/{1}".format(self.outputDir, androidfolder)):
+            if file.endswith(".csproj"):
+                return "{0}/{1}/{2}".format(self.outputDir, androidfolder, file)
+        raise IOError('No .csproj found in "{0}/{1}"'.format(self.outputDir, androidfolder))
+
+    def findIosSolutionFile(self, iosfolder):
+        for file in os.listdir("{0}/{1}".format(self.outputDir, iosfolder)):
+            if file.endswith(".csproj"):
+                return "{0}/{1}/{2}".format(self.outputDir, iosfolder, file)
+        raise IOError('No .csproj found in "{0}/{1}"'.format(self.outputDir, iosfolder))
+
+    def createDirectories(self, androidfolder, iosfolder):
+        directories = [
+            "/{0}".format(androidfolder),
+            "/{0}/Resources".format(androidfolder),
+            "/{0}/Resources/drawable".format(androidfolder),
+            "/{0}/Resources/drawable-hdpi".format(androidfolder),
+            "/{0}/Resources/drawable-xhdpi".format(androidfolder),
+            "/{0}/Resources/drawable-xxhdpi".format(androidfolder),
+            "/{0}".format(iosfolder)
+        ]
+
+        if self.isXCAssets:
+            directories.append("/{0}/Assets.xcassets".format(iosfolder))
+        else:
+            directories.append("/{0}/Resources".format(iosfolder))
+
+        for directory in directories:
+            self.sink.makeDirectory(self.outputDir + directory)
+
+    def getiosappiconjson(self, filename, size):
+        elems = []
+        baseelem = {"filename": filename}
+
+        if size == 29:
+            newelem = baseelem.copy()
+            newelem["size"] = "29x29"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+            newelem = baseelem.copy()
+            newelem["size"] = "29x29"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 40:
+            newelem = baseelem.copy()
+            newelem["size"] = "40x40"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 50:
+            newelem = baseelem.copy()
+            newelem["size"] = "50x50"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 57:
+            newelem = baseelem.copy()
+            newelem["size"] = "57x57"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+        elif size == 58:
+            newelem = baseelem.copy()
+            newelem["size"] = "29x29"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+            newelem = baseelem.copy()
+            newelem["size"] = "29x29"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 72:
+            newelem = baseelem.copy()
+            newelem["size"] = "72x72"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 76:
+            newelem = baseelem.copy()
+            newelem["size"] = "76x76"
+            newelem["scale"] = "1x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 80:
+            newelem = baseelem.copy()
+            newelem["size"] = "40x40"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+            newelem = baseelem.copy()
+            newelem["size"] = "40x40"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 87:
+            newelem = baseelem.copy()
+            newelem["size"] = "29x29"
+            newelem["scale"] = "3x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+        elif size == 100:
+            newelem = baseelem.copy()
+            newelem["size"] = "50x50"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 114:
+            newelem = baseelem.copy()
+            newelem["size"] = "57x57"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+        elif size == 120:
+            newelem = baseelem.copy()
+            newelem["size"] = "40x40"
+            newelem["scale"] = "3x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+            newelem = baseelem.copy()
+            newelem["size"] = "60x60"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+        elif size == 144:
+            newelem = baseelem.copy()
+            newelem["size"] = "72x72"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 152:
+            newelem = baseelem.copy()
+            newelem["size"] = "76x76"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 167:
+            newelem = baseelem.copy()
+            newelem["size"] = "83.5x83.5"
+            newelem["scale"] = "2x"
+            newelem["idiom"] = "ipad"
+            elems.append(newelem)
+
+        elif size == 180:
+            newelem = baseelem.copy()
+            newelem["size"] = "60x60"
+            newelem["scale"] = "3x"
+            newelem["idiom"] = "iphone"
+            elems.append(newelem)
+
+        return elems
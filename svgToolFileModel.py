@@ -0,0 +1,203 @@
+import array
+import bisect
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import QAbstractListModel, QThread
+
+from svgToolConversion import walkSvgFiles
+
+
+def parseGlobs(text):
+    # "*.svg icons/* !drafts": plain patterns include, patterns starting with ! exclude
+    include = [pattern for pattern in text.split() if not pattern.startswith("!")]
+    exclude = [pattern[1:] for pattern in text.split() if pattern.startswith("!") and len(pattern) > 1]
+    return include or ["*.svg"], exclude
+
+
+class SvgFileListModel(QAbstractListModel):
+    # the list view only asks for the rows it paints, so a file costs its name, one bit of check state
+    # and, while it matches the filter, one entry in the visible rows
+
+    sigCheckedChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super(SvgFileListModel, self).__init__(parent)
+        self.names = []
+        self.rows = {}
+        self.checked = bytearray()
+        self.visible = array.array('i')
+        self.checkedCount = 0
+        self.filterText = ""
+        self.inputDir = ""
+        self.thumbnails = None
+
+    def setThumbnailProvider(self, thumbnails):
+        self.thumbnails = thumbnails
+        self.thumbnails.sigThumbnailReady.connect(self.onThumbnailReady)
+
+    def isChecked(self, file):
+        return self.checked[file >> 3] & (1 << (file & 7)) != 0
+
+    def setChecked(self, file, isChecked):
+        if isChecked:
+            self.checked[file >> 3] |= 1 << (file & 7)
+        else:
+            self.checked[file >> 3] &= ~(1 << (file & 7))
+
+    def setFiles(self, files, filterText="", inputDir="", keepChecked=()):
+        self.beginResetModel()
+        self.names = []
+        self.rows = {}
+        self.checked = bytearray()
+        self.visible = array.array('i')
+        self.checkedCount = 0
+        self.filterText = filterText.upper()
+        self.inputDir = inputDir
+        self.appendFiles(files, keepChecked)
+        self.endResetModel()
+
+    def addFiles(self, files, keepChecked=()):
+        first = len(self.visible)
+        added = self.appendFiles(files, keepChecked)
+        if added:
+            # the rows are already in place, the view only needs to hear about them
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + added - 1)
+            self.endInsertRows()
+
+    def appendFiles(self, files, keepChecked):
+        start = len(self.names)
+        self.names.extend(files)
+        self.checked.extend(bytes((len(self.names) + 7) // 8 - len(self.checked)))
+
+        added = 0
+        for file, name in enumerate(files, start):
+            self.rows[name] = file
+            isVisible = self.filterText in name.upper()
+            if isVisible:
+                self.visible.append(file)
+                added += 1
+            if name in keepChecked:
+                self.setChecked(file, True)
+                if isVisible:
+                    self.checkedCount += 1
+        return added
+
+    def setFilterText(self, filterText):
+        filterText = filterText.upper()
+
+        # typing narrows the filter, so only the files that matched before need to be checked again
+        if self.filterText in filterText:
+            candidates = self.visible
+        else:
+            candidates = range(len(self.names))
+
+        self.beginResetModel()
+        self.visible = array.array('i', (file for file in candidates if filterText in self.names[file].upper()))
+        self.filterText = filterText
+        self.checkedCount = sum(1 for file in self.visible if self.isChecked(file))
+        self.endResetModel()
+
+    def setAllChecked(self, isChecked):
+        # only the files the filter shows are changed
+        for file in self.visible:
+            self.setChecked(file, isChecked)
+        self.checkedCount = len(self.visible) if isChecked else 0
+
+        if self.visible:
+            self.dataChanged.emit(self.index(0), self.index(len(self.visible) - 1), [QtCore.Qt.CheckStateRole])
+        self.sigCheckedChanged.emit()
+
+    def checkedFiles(self):
+        return [self.names[file] for file in self.visible if self.isChecked(file)]
+
+    def allCheckedFiles(self):
+        return set(name for file, name in enumerate(self.names) if self.isChecked(file))
+
+    def hasFiles(self, names):
+        return all(name in self.rows for name in names)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.visible)
+
+    def flags(self, index):
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsUserCheckable
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file = self.visible[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return self.names[file]
+        if role == QtCore.Qt.CheckStateRole:
+            return QtCore.Qt.Checked if self.isChecked(file) else QtCore.Qt.Unchecked
+        # thumbnails are requested lazily, for the rows being painted
+        if role == QtCore.Qt.DecorationRole and self.thumbnails is not None:
+            name = self.names[file]
+            return self.thumbnails.icon(name, "{0}/{1}".format(self.inputDir, name))
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.CheckStateRole or not index.isValid():
+            return False
+
+        file = self.visible[index.row()]
+        isChecked = value == QtCore.Qt.Checked
+        if isChecked != self.isChecked(file):
+            self.setChecked(file, isChecked)
+            self.checkedCount += 1 if isChecked else -1
+            self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+            self.sigCheckedChanged.emit()
+        return True
+
+    def onThumbnailReady(self, name):
+        file = self.rows.get(name)
+        if file is None:
+            return
+
+        # the visible rows are in file order
+        row = bisect.bisect_left(self.visible, file)
+        if row < len(self.visible) and self.visible[row] == file:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+
+class SvgFileScanner(QThread):
+    # walks the input directory on its own thread and hands the files over in batches,
+    # so the list fills up while the rest of the tree is still being read
+
+    sigFilesFound = QtCore.pyqtSignal(list)
+
+    batchSize = 256
+    batchInterval = 0.1
+
+    def __init__(self, inputDir, include, exclude, isRecursive, parent=None):
+        super(SvgFileScanner, self).__init__(parent)
+        self.inputDir = inputDir
+        self.include = include
+        self.exclude = exclude
+        self.isRecursive = isRecursive
+        self.cancelToken = False
+
+    def cancel(self):
+        self.cancelToken = True
+
+    def run(self):
+        batch = []
+        # the first file is handed over on its own, so it is listed right away
+        sent = time.perf_counter() - self.batchInterval
+        for file in walkSvgFiles(self.inputDir, "", self.include, self.exclude, self.isRecursive):
+            if self.cancelToken:
+                return
+
+            batch.append(file)
+            if len(batch) >= self.batchSize or time.perf_counter() - sent >= self.batchInterval:
+                self.sigFilesFound.emit(batch)
+                batch = []
+                sent = time.perf_counter()
+
+        if batch and not self.cancelToken:
+            self.sigFilesFound.emit(batch)
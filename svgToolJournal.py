@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+
+
+def settingsFingerprint(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CheckpointJournal(object):
+    # outputs are appended as they finish, a run that does not finish leaves the journal behind to resume from
+
+    journalName = ".flandre-journal.jsonl"
+    journalVersion = 1
+
+    def __init__(self, outputDir):
+        self.outputDir = outputDir
+        self.path = "{0}/{1}".format(outputDir, self.journalName)
+        self.stream = None
+
+    def load(self, fingerprint):
+        # the outputs completed by an interrupted run with the same settings, relative path -> cache key
+        try:
+            with open(self.path, 'r') as injournal:
+                lines = injournal.read().split("\n")
+        except OSError:
+            return {}
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return {}
+        if not isinstance(header, dict) or header.get('version') != self.journalVersion \
+                or header.get('fingerprint') != fingerprint:
+            return {}
+
+        entries = {}
+        for line in lines[1:]:
+            # a crash can cut the last line short
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and 'output' in entry:
+                entries[entry['output']] = entry['key']
+        return entries
+
+    def open(self, fingerprint, entries=None):
+        # the journal is rewritten with the entries carried over, then appended to
+        self.stream = open(self.path, 'w')
+        self.write({'version': self.journalVersion, 'fingerprint': fingerprint})
+        for output, key in sorted((entries or {}).items()):
+            self.write({'output': output, 'key': key})
+
+    def write(self, entry):
+        self.stream.write(json.dumps(entry) + "\n")
+        self.stream.flush()
+
+    def record(self, outfile, key):
+        if self.stream is not None and key is not None:
+            self.write({'output': os.path.relpath(outfile, self.outputDir).replace("\\", "/"), 'key': key})
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def discard(self):
+        self.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -11,14 +11,14 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
-        MainWindow.resize(550, 600)
+        MainWindow.resize(550, 760)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(MainWindow.sizePolicy().hasHeightForWidth())
         MainWindow.setSizePolicy(sizePolicy)
-        MainWindow.setMinimumSize(QtCore.QSize(550, 600))
-        MainWindow.setMaximumSize(QtCore.QSize(550, 550))
+        MainWindow.setMinimumSize(QtCore.QSize(550, 760))
+        MainWindow.setMaximumSize(QtCore.QSize(550, 760))
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
         sizePolicy.setHorizontalStretch(0)
@@ -86,6 +86,12 @@ class Ui_MainWindow(object):
         self.label_9.setLayoutDirection(QtCore.Qt.LeftToRight)
         self.label_9.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
         self.label_9.setObjectName("label_9")
+        self.checkBoxRecursive = QtWidgets.QCheckBox(self.groupBox)
+        self.checkBoxRecursive.setGeometry(QtCore.QRect(330, 120, 111, 23))
+        self.checkBoxRecursive.setObjectName("checkBoxRecursive")
+        self.lineGlobs = QtWidgets.QLineEdit(self.groupBox)
+        self.lineGlobs.setGeometry(QtCore.QRect(330, 145, 191, 23))
+        self.lineGlobs.setObjectName("lineGlobs")
         self.groupBox2 = QtWidgets.QGroupBox(self.centralwidget)
         self.groupBox2.setGeometry(QtCore.QRect(10, 240, 531, 221))
         self.groupBox2.setObjectName("groupBox2")
@@ -156,26 +162,98 @@ class Ui_MainWindow(object):
         self.checkBoxVS.setToolTipDuration(-1)
         self.checkBoxVS.setChecked(True)
         self.checkBoxVS.setObjectName("checkBoxVS")
+        self.groupBox_5 = QtWidgets.QGroupBox(self.centralwidget)
+        self.groupBox_5.setGeometry(QtCore.QRect(10, 470, 531, 151))
+        self.groupBox_5.setObjectName("groupBox_5")
+        self.label_10 = QtWidgets.QLabel(self.groupBox_5)
+        self.label_10.setGeometry(QtCore.QRect(10, 25, 61, 23))
+        self.label_10.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.label_10.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.label_10.setObjectName("label_10")
+        self.comboBoxRenderer = QtWidgets.QComboBox(self.groupBox_5)
+        self.comboBoxRenderer.setGeometry(QtCore.QRect(80, 25, 131, 23))
+        self.comboBoxRenderer.setObjectName("comboBoxRenderer")
+        self.label_11 = QtWidgets.QLabel(self.groupBox_5)
+        self.label_11.setGeometry(QtCore.QRect(220, 25, 61, 23))
+        self.label_11.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.label_11.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.label_11.setObjectName("label_11")
+        self.spinBoxWorkers = QtWidgets.QSpinBox(self.groupBox_5)
+        self.spinBoxWorkers.setGeometry(QtCore.QRect(290, 25, 51, 23))
+        self.spinBoxWorkers.setMinimum(1)
+        self.spinBoxWorkers.setMaximum(64)
+        self.spinBoxWorkers.setProperty("value", 1)
+        self.spinBoxWorkers.setObjectName("spinBoxWorkers")
+        self.checkBoxForceRebuild = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxForceRebuild.setGeometry(QtCore.QRect(20, 55, 151, 23))
+        self.checkBoxForceRebuild.setObjectName("checkBoxForceRebuild")
+        self.checkBoxWatch = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxWatch.setGeometry(QtCore.QRect(20, 85, 151, 23))
+        self.checkBoxWatch.setObjectName("checkBoxWatch")
+        self.checkBoxTrace = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxTrace.setGeometry(QtCore.QRect(180, 85, 151, 23))
+        self.checkBoxTrace.setObjectName("checkBoxTrace")
+        self.checkBoxDownscale = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxDownscale.setGeometry(QtCore.QRect(180, 55, 161, 23))
+        self.checkBoxDownscale.setObjectName("checkBoxDownscale")
+        self.checkBoxOptimize = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxOptimize.setGeometry(QtCore.QRect(350, 55, 91, 23))
+        self.checkBoxOptimize.setObjectName("checkBoxOptimize")
+        self.spinBoxOptimizeBudget = QtWidgets.QSpinBox(self.groupBox_5)
+        self.spinBoxOptimizeBudget.setGeometry(QtCore.QRect(440, 55, 71, 23))
+        self.spinBoxOptimizeBudget.setMinimum(1)
+        self.spinBoxOptimizeBudget.setMaximum(60)
+        self.spinBoxOptimizeBudget.setProperty("value", 2)
+        self.spinBoxOptimizeBudget.setObjectName("spinBoxOptimizeBudget")
+        self.checkBoxArchive = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxArchive.setGeometry(QtCore.QRect(350, 85, 161, 23))
+        self.checkBoxArchive.setObjectName("checkBoxArchive")
+        self.checkBoxMinify = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxMinify.setGeometry(QtCore.QRect(350, 115, 161, 23))
+        self.checkBoxMinify.setObjectName("checkBoxMinify")
+        self.label_12 = QtWidgets.QLabel(self.groupBox_5)
+        self.label_12.setGeometry(QtCore.QRect(350, 25, 61, 23))
+        self.label_12.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.label_12.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.label_12.setObjectName("label_12")
+        self.spinBoxTimeout = QtWidgets.QSpinBox(self.groupBox_5)
+        self.spinBoxTimeout.setGeometry(QtCore.QRect(420, 25, 91, 23))
+        self.spinBoxTimeout.setMinimum(0)
+        self.spinBoxTimeout.setMaximum(3600)
+        self.spinBoxTimeout.setProperty("value", 120)
+        self.spinBoxTimeout.setObjectName("spinBoxTimeout")
+        self.checkBoxPrefix = QtWidgets.QCheckBox(self.groupBox_5)
+        self.checkBoxPrefix.setGeometry(QtCore.QRect(180, 115, 161, 23))
+        self.checkBoxPrefix.setChecked(True)
+        self.checkBoxPrefix.setObjectName("checkBoxPrefix")
+        self.label_13 = QtWidgets.QLabel(self.groupBox_5)
+        self.label_13.setGeometry(QtCore.QRect(10, 115, 61, 23))
+        self.label_13.setLayoutDirection(QtCore.Qt.LeftToRight)
+        self.label_13.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.label_13.setObjectName("label_13")
+        self.comboBoxAtlas = QtWidgets.QComboBox(self.groupBox_5)
+        self.comboBoxAtlas.setGeometry(QtCore.QRect(80, 115, 91, 23))
+        self.comboBoxAtlas.setObjectName("comboBoxAtlas")
         self.btnConvert = QtWidgets.QPushButton(self.centralwidget)
-        self.btnConvert.setGeometry(QtCore.QRect(10, 530, 91, 23))
+        self.btnConvert.setGeometry(QtCore.QRect(10, 690, 91, 23))
         self.btnConvert.setObjectName("btnConvert")
         self.progressBarTotal = QtWidgets.QProgressBar(self.centralwidget)
-        self.progressBarTotal.setGeometry(QtCore.QRect(10, 470, 421, 23))
+        self.progressBarTotal.setGeometry(QtCore.QRect(10, 630, 421, 23))
         self.progressBarTotal.setProperty("value", 0)
         self.progressBarTotal.setObjectName("progressBarTotal")
         self.labelImage = QtWidgets.QLabel(self.centralwidget)
-        self.labelImage.setGeometry(QtCore.QRect(450, 470, 90, 90))
+        self.labelImage.setGeometry(QtCore.QRect(450, 630, 90, 90))
         self.labelImage.setText("")
         self.labelImage.setObjectName("labelImage")
         self.label_5 = QtWidgets.QLabel(self.centralwidget)
-        self.label_5.setGeometry(QtCore.QRect(400, 560, 141, 20))
+        self.label_5.setGeometry(QtCore.QRect(400, 720, 141, 20))
         font = QtGui.QFont()
         font.setPointSize(9)
         self.label_5.setFont(font)
         self.label_5.setAlignment(QtCore.Qt.AlignCenter)
         self.label_5.setObjectName("label_5")
         self.progressBar = QtWidgets.QProgressBar(self.centralwidget)
-        self.progressBar.setGeometry(QtCore.QRect(10, 500, 421, 23))
+        self.progressBar.setGeometry(QtCore.QRect(10, 660, 421, 23))
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -184,7 +262,7 @@ class Ui_MainWindow(object):
         self.progressBar.setProperty("value", 0)
         self.progressBar.setObjectName("progressBar")
         self.btnCancel = QtWidgets.QPushButton(self.centralwidget)
-        self.btnCancel.setGeometry(QtCore.QRect(110, 530, 91, 23))
+        self.btnCancel.setGeometry(QtCore.QRect(110, 690, 91, 23))
         self.btnCancel.setObjectName("btnCancel")
         MainWindow.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(MainWindow)
@@ -203,7 +281,9 @@ class Ui_MainWindow(object):
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
         MainWindow.setTabOrder(self.lineInputDir, self.btnInputDir)
         MainWindow.setTabOrder(self.btnInputDir, self.lineFilter)
-        MainWindow.setTabOrder(self.lineFilter, self.lineOutputDir)
+        MainWindow.setTabOrder(self.lineFilter, self.checkBoxRecursive)
+        MainWindow.setTabOrder(self.checkBoxRecursive, self.lineGlobs)
+        MainWindow.setTabOrder(self.lineGlobs, self.lineOutputDir)
         MainWindow.setTabOrder(self.lineOutputDir, self.btnOutputDir)
         MainWindow.setTabOrder(self.btnOutputDir, self.comboBoxMode)
         MainWindow.setTabOrder(self.comboBoxMode, self.checkBoxVS)
@@ -213,7 +293,20 @@ class Ui_MainWindow(object):
         MainWindow.setTabOrder(self.checkBoxRatio, self.checkBoxIos)
         MainWindow.setTabOrder(self.checkBoxIos, self.checkBoxXcassets)
         MainWindow.setTabOrder(self.checkBoxXcassets, self.checkBoxAndroid)
-        MainWindow.setTabOrder(self.checkBoxAndroid, self.btnConvert)
+        MainWindow.setTabOrder(self.checkBoxAndroid, self.comboBoxRenderer)
+        MainWindow.setTabOrder(self.comboBoxRenderer, self.spinBoxWorkers)
+        MainWindow.setTabOrder(self.spinBoxWorkers, self.checkBoxForceRebuild)
+        MainWindow.setTabOrder(self.checkBoxForceRebuild, self.checkBoxWatch)
+        MainWindow.setTabOrder(self.checkBoxWatch, self.checkBoxTrace)
+        MainWindow.setTabOrder(self.checkBoxTrace, self.checkBoxDownscale)
+        MainWindow.setTabOrder(self.checkBoxDownscale, self.checkBoxOptimize)
+        MainWindow.setTabOrder(self.checkBoxOptimize, self.spinBoxOptimizeBudget)
+        MainWindow.setTabOrder(self.spinBoxOptimizeBudget, self.checkBoxArchive)
+        MainWindow.setTabOrder(self.checkBoxArchive, self.checkBoxMinify)
+        MainWindow.setTabOrder(self.checkBoxMinify, self.spinBoxTimeout)
+        MainWindow.setTabOrder(self.spinBoxTimeout, self.checkBoxPrefix)
+        MainWindow.setTabOrder(self.checkBoxPrefix, self.comboBoxAtlas)
+        MainWindow.setTabOrder(self.comboBoxAtlas, self.btnConvert)
         MainWindow.setTabOrder(self.btnConvert, self.btnCancel)
 
     def retranslateUi(self, MainWindow):
@@ -228,6 +321,10 @@ class Ui_MainWindow(object):
         self.btnSelectAll.setText(_translate("MainWindow", "All"))
         self.btnSelectNone.setText(_translate("MainWindow", "None"))
         self.label_9.setText(_translate("MainWindow", "Select"))
+        self.checkBoxRecursive.setToolTip(_translate("MainWindow", "Also list the SVG files of the subfolders"))
+        self.checkBoxRecursive.setText(_translate("MainWindow", "Subfolders"))
+        self.lineGlobs.setToolTip(_translate("MainWindow", "Patterns of the files to list, !pattern skips files and folders"))
+        self.lineGlobs.setPlaceholderText(_translate("MainWindow", "*.svg !drafts"))
         self.groupBox2.setTitle(_translate("MainWindow", "Output"))
         self.btnOutputDir.setText(_translate("MainWindow", "Browse..."))
         self.label_2.setText(_translate("MainWindow", "Path"))
@@ -243,6 +340,32 @@ class Ui_MainWindow(object):
         self.checkBoxAndroid.setText(_translate("MainWindow", "Export"))
         self.checkBoxVS.setToolTip(_translate("MainWindow", "Warning: this may crash intelisense"))
         self.checkBoxVS.setText(_translate("MainWindow", "Update Solution"))
+        self.groupBox_5.setTitle(_translate("MainWindow", "Pipeline"))
+        self.label_10.setText(_translate("MainWindow", "Renderer"))
+        self.label_11.setText(_translate("MainWindow", "Workers"))
+        self.checkBoxForceRebuild.setToolTip(_translate("MainWindow", "Render every output even if its SVG and settings did not change"))
+        self.checkBoxForceRebuild.setText(_translate("MainWindow", "Force rebuild"))
+        self.checkBoxWatch.setToolTip(_translate("MainWindow", "Convert added or modified SVG files automatically"))
+        self.checkBoxWatch.setText(_translate("MainWindow", "Watch input folder"))
+        self.checkBoxTrace.setToolTip(_translate("MainWindow", "Record the timing of every output and show a summary after the export"))
+        self.checkBoxTrace.setText(_translate("MainWindow", "Trace conversion"))
+        self.checkBoxDownscale.setToolTip(_translate("MainWindow", "Render the largest size once and scale it down to the smaller sizes of the same aspect ratio"))
+        self.checkBoxDownscale.setText(_translate("MainWindow", "Downscale from largest"))
+        self.checkBoxOptimize.setToolTip(_translate("MainWindow", "Losslessly recompress every PNG after rendering"))
+        self.checkBoxOptimize.setText(_translate("MainWindow", "Optimize PNG"))
+        self.spinBoxOptimizeBudget.setToolTip(_translate("MainWindow", "Seconds spent searching for a smaller encoding of each PNG"))
+        self.spinBoxOptimizeBudget.setSuffix(_translate("MainWindow", " s"))
+        self.checkBoxArchive.setToolTip(_translate("MainWindow", "Stream every PNG and Contents.json into a single zip archive instead of loose files"))
+        self.checkBoxArchive.setText(_translate("MainWindow", "Write zip archive"))
+        self.checkBoxMinify.setToolTip(_translate("MainWindow", "Render from cached copies of the SVG files without editor metadata, unused definitions and excess precision"))
+        self.checkBoxMinify.setText(_translate("MainWindow", "Minify SVG sources"))
+        self.label_12.setText(_translate("MainWindow", "Timeout:"))
+        self.spinBoxTimeout.setToolTip(_translate("MainWindow", "Seconds a single render may take before it is killed and counted as failed, 0 waits forever (QtSvg renders can not be interrupted)"))
+        self.spinBoxTimeout.setSuffix(_translate("MainWindow", " s"))
+        self.checkBoxPrefix.setToolTip(_translate("MainWindow", "Export subfolders/icon.svg as subfolders_icon.png instead of icon.png"))
+        self.checkBoxPrefix.setText(_translate("MainWindow", "Prefix folder names"))
+        self.label_13.setText(_translate("MainWindow", "Atlas:"))
+        self.comboBoxAtlas.setToolTip(_translate("MainWindow", "Pack the images of each density into a sprite atlas with a JSON (Android) or plist (iOS) map"))
         self.btnConvert.setText(_translate("MainWindow", "Export"))
         self.label_5.setText(_translate("MainWindow", "Let me handle this human!"))
         self.btnCancel.setText(_translate("MainWindow", "Cancel"))
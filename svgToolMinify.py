@@ -0,0 +1,326 @@
+import json
+import math
+import os
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+
+
+svgNamespace = "http://www.w3.org/2000/svg"
+xlinkNamespace = "http://www.w3.org/1999/xlink"
+xmlNamespace = "http://www.w3.org/XML/1998/namespace"
+
+# namespaces only read by the editors that wrote the file, renderers ignore them
+editorNamespaces = (
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://inkscape.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://ns.adobe.com/AdobeIllustrator/10.0/",
+    "http://ns.adobe.com/AdobeSVGViewerExtensions/3.0/",
+    "http://ns.adobe.com/Extensibility/1.0/",
+    "http://ns.adobe.com/Flows/1.0/",
+    "http://ns.adobe.com/Graphs/1.0/",
+    "http://ns.adobe.com/ImageReplacement/1.0/",
+    "http://ns.adobe.com/SaveForWeb/1.0/",
+    "http://ns.adobe.com/Variables/1.0/",
+    "http://ns.adobe.com/xap/1.0/",
+    "http://www.bohemiancoding.com/sketch/ns",
+    "http://www.serif.com/",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://creativecommons.org/ns#",
+    "http://purl.org/dc/elements/1.1/",
+)
+
+# elements that never paint anything
+descriptiveTags = ("metadata", "title", "desc")
+
+# whitespace is content inside these
+textTags = ("text", "tspan", "textPath", "style", "script")
+
+# elements with a coordinate system of their own
+scaledTags = ("svg", "pattern", "symbol", "marker", "clipPath", "mask")
+
+numberPattern = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+referencePattern = re.compile(r"url\(\s*['\"]?#([^'\")\s]+)")
+externalPattern = re.compile(r"url\(\s*['\"]?(?!#|data:)[^'\")\s]|@import", re.IGNORECASE)
+
+
+def splitTag(tag):
+    if isinstance(tag, str) and tag.startswith("{"):
+        namespace, name = tag[1:].split("}", 1)
+        return namespace, name
+    return None, tag
+
+
+def isEditorName(name):
+    namespace, _ = splitTag(name)
+    return namespace in editorNamespaces
+
+
+def findReferences(root):
+    references = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if splitTag(name)[1] == "href" and value.startswith("#"):
+                references.add(value[1:])
+            references.update(referencePattern.findall(value))
+        if element.text and splitTag(element.tag)[1] == "style":
+            references.update(referencePattern.findall(element.text))
+    return references
+
+
+def hasExternalResources(root):
+    # a minified copy lives in another directory, relative links to images or fonts would break
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if splitTag(name)[1] == "href" and not value.startswith(("#", "data:")):
+                return True
+            if externalPattern.search(value):
+                return True
+        if element.text and splitTag(element.tag)[1] == "style" and externalPattern.search(element.text):
+            return True
+    return False
+
+
+def pruneElements(parent):
+    for child in list(parent):
+        if not isinstance(child.tag, str) or isEditorName(child.tag) or splitTag(child.tag)[1] in descriptiveTags:
+            parent.remove(child)
+            continue
+
+        for name in [name for name in child.attrib if isEditorName(name)]:
+            del child.attrib[name]
+        pruneElements(child)
+
+
+def pruneDefinitions(root):
+    # only direct children of <defs> are dropped: they are never painted unless something points at them
+    references = findReferences(root)
+    for defs in root.iter("{{{0}}}defs".format(svgNamespace)):
+        for child in list(defs):
+            if child.get("id") is not None and not any(element.get("id") in references for element in child.iter()):
+                defs.remove(child)
+
+
+def stripWhitespace(element):
+    if splitTag(element.tag)[1] in textTags:
+        return
+    if element.text is not None and not element.text.strip():
+        element.text = None
+    for child in element:
+        if child.tail is not None and not child.tail.strip():
+            child.tail = None
+        stripWhitespace(child)
+
+
+def coordinateDecimals(root):
+    # numbers keep enough decimals to stay within 1/64 of a pixel at 4096 pixels
+    values = numberPattern.findall(root.get("viewBox", ""))
+    if len(values) == 4:
+        extent = max(abs(float(values[2])), abs(float(values[3])))
+    else:
+        sizes = [numberPattern.match(root.get(name, "")) for name in ("width", "height")]
+        if not all(sizes):
+            return None
+        extent = max(abs(float(size.group(0))) for size in sizes)
+
+    if extent <= 0:
+        return None
+    return max(0, int(math.ceil(math.log10(4096 * 64 / extent))))
+
+
+def formatNumber(value, decimals):
+    text = "{0:.{1}f}".format(value, decimals)
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text in ("-0", ""):
+        text = "0"
+    if text.startswith("0.") and len(text) > 2:
+        text = text[1:]
+    elif text.startswith("-0.") and len(text) > 3:
+        text = "-" + text[2:]
+    return text
+
+
+def roundNumbers(text, decimals):
+    parts = []
+    position = 0
+    for match in numberPattern.finditer(text):
+        separator = text[position:match.start()]
+        number = formatNumber(float(match.group(0)), decimals)
+        # "1.5.5" is two numbers, once rounded "2" and ".5" they would run together
+        if not separator and parts and number[0] not in "-+" and (number[0] != "." or "." not in parts[-1]):
+            separator = " "
+        parts.append(separator)
+        parts.append(number)
+        position = match.end()
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def roundCoordinates(element, decimals):
+    # transformed content may be scaled up, its precision is left alone
+    if element.get("transform") is not None or splitTag(element.tag)[1] in scaledTags:
+        return
+
+    path = element.get("d")
+    # arc flags may be written without separators ("a1 1 0 01.5 2"), arcs are kept as written
+    if path is not None and not re.search(r"[aA]", path):
+        element.set("d", roundNumbers(path, decimals))
+    if element.get("points") is not None:
+        element.set("points", roundNumbers(element.get("points"), decimals))
+
+    for child in element:
+        roundCoordinates(child, decimals)
+
+
+def minifySvg(data):
+    # returns None when the document can not be minified safely
+    root = ElementTree.fromstring(data)
+    if hasExternalResources(root):
+        return None
+
+    pruneElements(root)
+    for name in [name for name in root.attrib if isEditorName(name)]:
+        del root.attrib[name]
+    pruneDefinitions(root)
+    stripWhitespace(root)
+
+    decimals = coordinateDecimals(root)
+    if decimals is not None and root.get("transform") is None:
+        for child in root:
+            roundCoordinates(child, decimals)
+
+    return serializeSvg(root)
+
+
+def prefixedName(name, prefixes, used):
+    namespace, localName = splitTag(name)
+    if namespace is None:
+        return localName
+    if namespace == xmlNamespace:
+        return "xml:{0}".format(localName)
+
+    used.add(namespace)
+    prefix = prefixes.setdefault(namespace, "ns{0}".format(len(prefixes)))
+    return "{0}:{1}".format(prefix, localName) if prefix else localName
+
+
+def serializeSvg(root):
+    # the prefixes are written here instead of through ElementTree.register_namespace, a global registry
+    # the .csproj writer sets its own default namespace in
+    prefixes = {svgNamespace: "" if splitTag(root.tag)[0] == svgNamespace else "svg", xlinkNamespace: "xlink"}
+    used = set()
+    for element in root.iter():
+        if isinstance(element.tag, str):
+            element.tag = prefixedName(element.tag, prefixes, used)
+            element.attrib = {prefixedName(name, prefixes, used): value for name, value in element.attrib.items()}
+
+    declarations = [("xmlns:{0}".format(prefixes[namespace]) if prefixes[namespace] else "xmlns", namespace)
+                    for namespace in sorted(used, key=lambda namespace: prefixes[namespace])]
+    root.attrib = dict(declarations + list(root.attrib.items()))
+    return ElementTree.tostring(root, encoding="unicode").encode("utf-8")
+
+
+def parseTime(data, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ElementTree.fromstring(data)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+class SourceCache(object):
+
+    directoryName = ".flandre-sources"
+    indexName = "index.json"
+    indexVersion = 1
+
+    def __init__(self, outputDir):
+        self.directory = "{0}/{1}".format(outputDir, self.directoryName)
+        self.index = "{0}/{1}".format(self.directory, self.indexName)
+        self.entries = {}
+        self.stats = {'files': 0, 'minified': 0, 'bytes': 0, 'minifiedBytes': 0, 'loads': 0,
+                      'parseSeconds': 0, 'minifiedParseSeconds': 0}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index, 'r') as injson:
+                index = json.load(injson)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(index, dict) and index.get('version') == self.indexVersion:
+            self.entries = index.get('sources', {})
+
+    def save(self):
+        if not os.path.isdir(self.directory):
+            return
+        temp = "{0}.tmp".format(self.index)
+        with open(temp, 'w') as outjson:
+            json.dump({'version': self.indexVersion, 'sources': self.entries}, outjson, indent=1, sort_keys=True)
+        os.replace(temp, self.index)
+
+    def normalize(self, infile, fileHash, loads):
+        # returns the file the renderer should load, the original one when minifying does not help
+        entry = self.entries.get(fileHash)
+        sourcefile = "{0}/{1}.svg".format(self.directory, fileHash)
+
+        if entry is None or (entry['minified'] and not os.path.isfile(sourcefile)):
+            entry = self.minify(infile, sourcefile)
+            self.entries[fileHash] = entry
+
+        self.stats['files'] += 1
+        self.stats['loads'] += loads
+        self.stats['bytes'] += entry['bytes']
+        self.stats['parseSeconds'] += entry['parseSeconds'] * loads
+        if not entry['minified']:
+            self.stats['minifiedBytes'] += entry['bytes']
+            self.stats['minifiedParseSeconds'] += entry['parseSeconds'] * loads
+            return infile
+
+        self.stats['minified'] += 1
+        self.stats['minifiedBytes'] += entry['minifiedBytes']
+        self.stats['minifiedParseSeconds'] += entry['minifiedParseSeconds'] * loads
+        return sourcefile
+
+    def minify(self, infile, sourcefile):
+        with open(infile, 'rb') as svg:
+            data = svg.read()
+
+        try:
+            minified = minifySvg(data)
+            seconds = parseTime(data)
+        except (ElementTree.ParseError, ValueError):
+            # the renderer reports broken documents on its own
+            return {'minified': False, 'bytes': len(data), 'parseSeconds': 0}
+
+        if minified is None or len(minified) >= len(data):
+            return {'minified': False, 'bytes': len(data), 'parseSeconds': seconds}
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        temp = "{0}.tmp".format(sourcefile)
+        with open(temp, 'wb') as svg:
+            svg.write(minified)
+        os.replace(temp, sourcefile)
+
+        return {'minified': True, 'bytes': len(data), 'minifiedBytes': len(minified),
+                'parseSeconds': seconds, 'minifiedParseSeconds': parseTime(minified)}
+
+    def reduction(self):
+        if not self.stats['bytes']:
+            return 0
+        return 100 * (self.stats['bytes'] - self.stats['minifiedBytes']) / self.stats['bytes']
+
+    def summary(self):
+        if not self.stats['files']:
+            return ""
+        return "SVG sources: {0} of {1} files minified, {2} -> {3} bytes ({4:.1f}% smaller), " \
+               "{5:.1f} ms of parsing saved over {6} loads".format(
+                   self.stats['minified'], self.stats['files'], self.stats['bytes'], self.stats['minifiedBytes'],
+                   self.reduction(), 1000 * (self.stats['parseSeconds'] - self.stats['minifiedParseSeconds']),
+                   self.stats['loads'])
@@ -0,0 +1,247 @@
+import concurrent.futures
+import multiprocessing
+import os
+import struct
+import sys
+import time
+import zlib
+
+from svgToolPng import pngSignature, pngChunk, decodePng
+
+
+# chunks that change how the pixels are displayed, everything else is dropped
+colorChunks = (b"gAMA", b"cHRM", b"sRGB", b"iCCP")
+
+strategies = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+ADAPTIVE = -1
+
+
+def readChunks(data):
+    chunks = []
+    offset = len(pngSignature)
+    while offset + 8 <= len(data):
+        length, tag = struct.unpack(">I4s", data[offset:offset + 8])
+        chunks.append((tag, data[offset + 8:offset + 8 + length]))
+        offset += length + 12
+    return chunks
+
+
+class Encoding(object):
+    def __init__(self, colorType, bitDepth, bytesPerPixel, rows, palette=b"", transparency=b""):
+        self.colorType = colorType
+        self.bitDepth = bitDepth
+        self.bytesPerPixel = bytesPerPixel
+        self.rows = rows
+        self.palette = palette
+        self.transparency = transparency
+
+
+def splitRows(data, stride, height):
+    return [bytes(data[y * stride:(y + 1) * stride]) for y in range(height)]
+
+
+def packIndices(indices, width, height, bitDepth):
+    if bitDepth == 8:
+        return splitRows(indices, width, height)
+
+    perByte = 8 // bitDepth
+    rows = []
+    for y in range(height):
+        row = indices[y * width:(y + 1) * width]
+        packed = bytearray((width + perByte - 1) // perByte)
+        for x, index in enumerate(row):
+            packed[x // perByte] |= index << (8 - bitDepth * (x % perByte + 1))
+        rows.append(bytes(packed))
+    return rows
+
+
+def reducedEncodings(image):
+    # every encoding returned stores exactly the same pixels, smaller ones first
+    width = image.width
+    height = image.height
+    pixels = image.pixels
+    encodings = []
+
+    colors = set(memoryview(pixels).cast("I"))
+    if len(colors) <= 256:
+        # translucent colors go first so the tRNS chunk can stop at the last one of them
+        ordered = sorted(colors, key=lambda color: color.to_bytes(4, sys.byteorder)[3])
+        palette = b"".join(color.to_bytes(4, sys.byteorder)[:3] for color in ordered)
+        alphas = bytes(color.to_bytes(4, sys.byteorder)[3] for color in ordered)
+        transparency = alphas.rstrip(b"\xff")
+        lookup = {color: index for index, color in enumerate(ordered)}
+        indices = bytes(lookup[color] for color in memoryview(pixels).cast("I"))
+
+        bitDepth = 8
+        for depth in (1, 2, 4):
+            if len(ordered) <= 1 << depth:
+                bitDepth = depth
+                break
+        encodings.append(Encoding(3, bitDepth, 1, packIndices(indices, width, height, bitDepth), palette, transparency))
+
+    isOpaque = pixels[3::4] == b"\xff" * (width * height)
+    isGray = pixels[0::4] == pixels[1::4] == pixels[2::4]
+
+    if isGray and isOpaque:
+        encodings.append(Encoding(0, 8, 1, splitRows(pixels[0::4], width, height)))
+    elif isGray:
+        gray = bytearray(width * height * 2)
+        gray[0::2] = pixels[0::4]
+        gray[1::2] = pixels[3::4]
+        encodings.append(Encoding(4, 8, 2, splitRows(gray, width * 2, height)))
+    elif isOpaque:
+        rgb = bytearray(width * height * 3)
+        rgb[0::3] = pixels[0::4]
+        rgb[1::3] = pixels[1::4]
+        rgb[2::3] = pixels[2::4]
+        encodings.append(Encoding(2, 8, 3, splitRows(rgb, width * 3, height)))
+    else:
+        encodings.append(Encoding(6, 8, 4, splitRows(pixels, width * 4, height)))
+
+    return encodings
+
+
+def paethPredictor(left, above, upperLeft):
+    estimate = left + above - upperLeft
+    distanceLeft = abs(estimate - left)
+    distanceAbove = abs(estimate - above)
+    distanceUpperLeft = abs(estimate - upperLeft)
+    if distanceLeft <= distanceAbove and distanceLeft <= distanceUpperLeft:
+        return left
+    if distanceAbove <= distanceUpperLeft:
+        return above
+    return upperLeft
+
+
+def filterRow(filterType, row, previous, bytesPerPixel):
+    if filterType == 0:
+        return row
+
+    left = bytes(bytesPerPixel) + row[:-bytesPerPixel]
+    if filterType == 1:
+        return bytes((value - before) & 0xff for value, before in zip(row, left))
+    if filterType == 2:
+        return bytes((value - above) & 0xff for value, above in zip(row, previous))
+    if filterType == 3:
+        return bytes((value - ((before + above) >> 1)) & 0xff for value, before, above in zip(row, left, previous))
+
+    upperLeft = bytes(bytesPerPixel) + previous[:-bytesPerPixel]
+    return bytes((value - paethPredictor(before, above, corner)) & 0xff
+                 for value, before, above, corner in zip(row, left, previous, upperLeft))
+
+
+def rowCost(filtered):
+    # the usual heuristic: bytes close to zero (as signed values) compress best
+    return sum(value if value < 128 else 256 - value for value in filtered)
+
+
+def filterScanlines(encoding, filterType):
+    raw = bytearray()
+    previous = bytes(len(encoding.rows[0]) if encoding.rows else 0)
+
+    for row in encoding.rows:
+        if filterType == ADAPTIVE:
+            candidates = [(rowCost(filtered), candidate, filtered) for candidate, filtered in
+                          ((candidate, filterRow(candidate, row, previous, encoding.bytesPerPixel)) for candidate in range(5))]
+            _, chosen, filtered = min(candidates, key=lambda candidate: candidate[0])
+        else:
+            chosen = filterType
+            filtered = filterRow(filterType, row, previous, encoding.bytesPerPixel)
+
+        raw.append(chosen)
+        raw.extend(filtered)
+        previous = row
+
+    return bytes(raw)
+
+
+def filterOrder(encoding):
+    # palette and low bit depth images rarely gain anything from filters
+    if encoding.colorType == 3 or encoding.bitDepth < 8:
+        return [0, ADAPTIVE]
+    return [ADAPTIVE, 0, 1, 2, 4, 3]
+
+
+def encodeCandidate(image, encoding, raw, strategy, extraChunks):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    data = compressor.compress(raw) + compressor.flush()
+
+    chunks = [pngChunk(b"IHDR", struct.pack(">IIBBBBB", image.width, image.height, encoding.bitDepth,
+                                           encoding.colorType, 0, 0, 0))]
+    chunks.extend(pngChunk(tag, chunk) for tag, chunk in extraChunks)
+    if encoding.colorType == 3:
+        chunks.append(pngChunk(b"PLTE", encoding.palette))
+        if encoding.transparency:
+            chunks.append(pngChunk(b"tRNS", encoding.transparency))
+    chunks.append(pngChunk(b"IDAT", data))
+    chunks.append(pngChunk(b"IEND", b""))
+    return pngSignature + b"".join(chunks)
+
+
+def optimizePng(data, budget=2.0):
+    # the budget is checked between candidates, the best one found so far is kept when it runs out
+    deadline = time.perf_counter() + budget
+    image = decodePng(data)
+    extraChunks = [(tag, chunk) for tag, chunk in readChunks(data) if tag in colorChunks]
+    best = data
+
+    for encoding in reducedEncodings(image):
+        for filterType in filterOrder(encoding):
+            raw = filterScanlines(encoding, filterType)
+            for strategy in strategies:
+                candidate = encodeCandidate(image, encoding, raw, strategy, extraChunks)
+                if len(candidate) < len(best):
+                    best = candidate
+                if time.perf_counter() > deadline:
+                    return best
+
+    return best
+
+
+def optimizeFile(path, budget):
+    with open(path, 'rb') as png:
+        data = png.read()
+
+    try:
+        optimized = optimizePng(data, budget)
+    except (ValueError, zlib.error):
+        # PNG flavours the decoder does not read (16 bits, interlaced) are left as they are
+        return len(data), len(data)
+
+    if len(optimized) < len(data):
+        temp = "{0}.tmp".format(path)
+        with open(temp, 'wb') as png:
+            png.write(optimized)
+        os.replace(temp, path)
+
+    return len(data), len(optimized)
+
+
+class PngOptimizer(object):
+
+    def __init__(self, workerCount, budget):
+        self.workerCount = max(1, workerCount)
+        self.budget = budget
+        self.cancelToken = False
+
+    def cancel(self):
+        self.cancelToken = True
+
+    def run(self, paths):
+        # recompression is pure Python, processes keep it off the GIL; spawn is safe with the GUI threads
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workerCount, mp_context=context) as executor:
+            futures = {executor.submit(optimizeFile, path, self.budget): path for path in paths}
+
+            for future in concurrent.futures.as_completed(futures):
+                if self.cancelToken:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+                try:
+                    before, after = future.result()
+                    yield futures[future], before, after, None
+                except Exception as error:
+                    yield futures[future], 0, 0, error
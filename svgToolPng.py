@@ -0,0 +1,242 @@
+import math
+import struct
+import zlib
+
+
+pngSignature = b"\x89PNG\r\n\x1a\n"
+
+
+class PngImage(object):
+    def __init__(self, width, height, pixels):
+        # pixels are RGBA, 8 bits per channel, row after row
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+
+
+def pngChunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+
+def encodePng(width, height, pixels, level=6):
+    stride = width * 4
+    raw = b"".join(b"\x00" + pixels[y * stride:(y + 1) * stride] for y in range(height))
+
+    return pngSignature + \
+        pngChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)) + \
+        pngChunk(b"IDAT", zlib.compress(raw, level)) + \
+        pngChunk(b"IEND", b"")
+
+
+def unfilterScanlines(raw, stride, height, bytesPerPixel):
+    rows = []
+    previous = bytearray(stride)
+    offset = 0
+
+    for _ in range(height):
+        filterType = raw[offset]
+        row = bytearray(raw[offset + 1:offset + 1 + stride])
+        offset += stride + 1
+
+        if filterType == 1:
+            for i in range(bytesPerPixel, stride):
+                row[i] = (row[i] + row[i - bytesPerPixel]) & 0xff
+        elif filterType == 2:
+            row = bytearray((value + above) & 0xff for value, above in zip(row, previous))
+        elif filterType == 3:
+            for i in range(stride):
+                left = row[i - bytesPerPixel] if i >= bytesPerPixel else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xff
+        elif filterType == 4:
+            for i in range(stride):
+                if i >= bytesPerPixel:
+                    left = row[i - bytesPerPixel]
+                    upperLeft = previous[i - bytesPerPixel]
+                else:
+                    left = upperLeft = 0
+                above = previous[i]
+                estimate = left + above - upperLeft
+                distanceLeft = abs(estimate - left)
+                distanceAbove = abs(estimate - above)
+                distanceUpperLeft = abs(estimate - upperLeft)
+                if distanceLeft <= distanceAbove and distanceLeft <= distanceUpperLeft:
+                    predictor = left
+                elif distanceAbove <= distanceUpperLeft:
+                    predictor = above
+                else:
+                    predictor = upperLeft
+                row[i] = (row[i] + predictor) & 0xff
+        elif filterType != 0:
+            raise ValueError("Unknown PNG filter type {0}".format(filterType))
+
+        rows.append(row)
+        previous = row
+
+    return rows
+
+
+def decodePng(data):
+    if not data.startswith(pngSignature):
+        raise ValueError("Not a PNG file")
+
+    header = None
+    palette = b""
+    transparency = b""
+    idat = []
+
+    offset = len(pngSignature)
+    while offset + 8 <= len(data):
+        length, tag = struct.unpack(">I4s", data[offset:offset + 8])
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += length + 12
+
+        if tag == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif tag == b"PLTE":
+            palette = chunk
+        elif tag == b"tRNS":
+            transparency = chunk
+        elif tag == b"IDAT":
+            idat.append(chunk)
+        elif tag == b"IEND":
+            break
+
+    if header is None:
+        raise ValueError("PNG file without IHDR chunk")
+
+    width, height, bitDepth, colorType, _, _, interlace = header
+    if interlace != 0 or colorType not in (0, 2, 3, 4, 6) or \
+            bitDepth not in ((1, 2, 4, 8) if colorType in (0, 3) else (8,)):
+        raise ValueError("Only 8 bit (or palette and gray below 8 bits), non-interlaced PNG files are supported")
+
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[colorType]
+    stride = (width * channels * bitDepth + 7) // 8
+    rows = unfilterScanlines(zlib.decompress(b"".join(idat)), stride, height, max(1, channels * bitDepth // 8))
+
+    if bitDepth < 8:
+        # unpack to one byte per pixel, gray levels are stretched to the full 0-255 range
+        perByte = 8 // bitDepth
+        mask = (1 << bitDepth) - 1
+        scale = 255 // mask if colorType == 0 else 1
+        rows = [bytes(((row[x // perByte] >> (8 - bitDepth * (x % perByte + 1))) & mask) * scale for x in range(width))
+                for row in rows]
+
+    pixels = bytearray(width * height * 4)
+    if colorType == 6:
+        pixels = bytearray(b"".join(rows))
+    elif colorType == 2:
+        for y, row in enumerate(rows):
+            target = y * width * 4
+            for channel in range(3):
+                pixels[target + channel:target + width * 4:4] = row[channel::3]
+            pixels[target + 3:target + width * 4:4] = b"\xff" * width
+    elif colorType == 0 or colorType == 4:
+        for y, row in enumerate(rows):
+            target = y * width * 4
+            gray = row[0::channels]
+            for channel in range(3):
+                pixels[target + channel:target + width * 4:4] = gray
+            pixels[target + 3:target + width * 4:4] = row[1::2] if colorType == 4 else b"\xff" * width
+    else:
+        alphas = transparency + b"\xff" * (256 - len(transparency))
+        colors = [palette[index * 3:index * 3 + 3] + alphas[index:index + 1] for index in range(len(palette) // 3)]
+        for y, row in enumerate(rows):
+            pixels[y * width * 4:(y + 1) * width * 4] = b"".join(colors[index] for index in row)
+
+    return PngImage(width, height, bytes(pixels))
+
+
+def readPng(path):
+    with open(path, 'rb') as png:
+        return decodePng(png.read())
+
+
+def writePng(path, image, level=6):
+    with open(path, 'wb') as png:
+        png.write(encodePng(image.width, image.height, image.pixels, level))
+
+
+def areaWeights(sourceSize, targetSize):
+    # every target pixel averages the source pixels it covers, weighted by how much of each it covers
+    ratio = sourceSize / targetSize
+    weights = []
+    for index in range(targetSize):
+        start = index * ratio
+        end = start + ratio
+        contributions = []
+        position = int(start)
+        while position < end and position < sourceSize:
+            overlap = min(end, position + 1) - max(start, position)
+            if overlap > 0:
+                contributions.append((position, overlap / ratio))
+            position += 1
+        weights.append(contributions)
+    return weights
+
+
+def downscaleImage(image, width, height):
+    if width == image.width and height == image.height:
+        return image
+    if width > image.width or height > image.height:
+        raise ValueError("Cannot downscale {0}x{1} to {2}x{3}".format(image.width, image.height, width, height))
+
+    columns = areaWeights(image.width, width)
+    rows = areaWeights(image.height, height)
+    stride = image.width * 4
+    source = image.pixels
+
+    # colors are averaged premultiplied by their alpha, so transparent pixels do not bleed into the edges
+    horizontal = []
+    for y in range(image.height):
+        row = source[y * stride:(y + 1) * stride]
+        scaled = []
+        for contributions in columns:
+            red = green = blue = alpha = 0.0
+            for x, weight in contributions:
+                pixelAlpha = row[x * 4 + 3] * weight
+                red += row[x * 4] * pixelAlpha
+                green += row[x * 4 + 1] * pixelAlpha
+                blue += row[x * 4 + 2] * pixelAlpha
+                alpha += pixelAlpha
+            scaled.extend((red, green, blue, alpha))
+        horizontal.append(scaled)
+
+    pixels = bytearray(width * height * 4)
+    for ty, contributions in enumerate(rows):
+        accumulated = [0.0] * (width * 4)
+        for y, weight in contributions:
+            accumulated = [total + value * weight for total, value in zip(accumulated, horizontal[y])]
+
+        offset = ty * width * 4
+        for tx in range(width):
+            red, green, blue, alpha = accumulated[tx * 4:tx * 4 + 4]
+            if alpha > 0:
+                pixels[offset + tx * 4] = min(255, int(red / alpha + 0.5))
+                pixels[offset + tx * 4 + 1] = min(255, int(green / alpha + 0.5))
+                pixels[offset + tx * 4 + 2] = min(255, int(blue / alpha + 0.5))
+                pixels[offset + tx * 4 + 3] = min(255, int(alpha + 0.5))
+
+    return PngImage(width, height, bytes(pixels))
+
+
+def imageDifference(first, second):
+    # compares premultiplied channels, the color of fully transparent pixels does not matter
+    if first.width != second.width or first.height != second.height:
+        raise ValueError("Images of different sizes cannot be compared")
+
+    maxError = 0
+    squaredError = 0
+    for offset in range(0, len(first.pixels), 4):
+        firstAlpha = first.pixels[offset + 3]
+        secondAlpha = second.pixels[offset + 3]
+        for channel in range(3):
+            error = abs(first.pixels[offset + channel] * firstAlpha - second.pixels[offset + channel] * secondAlpha) / 255
+            maxError = max(maxError, error)
+            squaredError += error * error
+        error = abs(firstAlpha - secondAlpha)
+        maxError = max(maxError, error)
+        squaredError += error * error
+
+    meanSquaredError = squaredError / max(1, len(first.pixels))
+    psnr = float("inf") if meanSquaredError == 0 else 10 * math.log10(255 * 255 / meanSquaredError)
+    return {'maxError': maxError, 'psnr': psnr}
@@ -0,0 +1,28 @@
+class PresetMode(object):
+    def __init__(self, id, name, baseWidth, baseHeight, isMaintainRatio, iosSizeList, androidSizeList, isMultiplier, isDownscale=False):
+        self.id = id
+        self.name = name
+        self.baseWidth = baseWidth
+        self.baseHeight = baseHeight
+        self.isMaintainRatio = isMaintainRatio
+        self.iosSizeList = iosSizeList
+        self.androidSizeList = androidSizeList
+        self.isMultiplier = isMultiplier
+        self.isDownscale = isDownscale
+
+
+modes = [
+    PresetMode(0, "Custom", "", "", True, [1, 2, 3], [1, 1.5, 2, 3], True),
+    PresetMode(1, "iOS Launcher Icon", 0, 0, True, [29, 40, 50, 57, 58, 72, 76, 80, 87, 100, 114, 120, 144, 152, 167, 180], [], False),
+    PresetMode(2, "Android Launcher Icon", 48, 48, True, [], [1, 1.5, 2, 3], True),
+    PresetMode(3, "Store Icon", 0, 0, True, [1024], [512], False),
+    PresetMode(4, "Button Icon", 16, 16, True, [1, 2, 3], [1, 1.5, 2, 3], True),
+    PresetMode(5, "Big Button Icon", 24, 24, True, [1, 2, 3], [1, 1.5, 2, 3], True)
+]
+
+
+def findMode(nameOrId):
+    for mode in modes:
+        if str(mode.id) == str(nameOrId) or mode.name.upper() == str(nameOrId).upper():
+            return mode
+    raise ValueError('Unknown preset: "{0}"'.format(nameOrId))
@@ -0,0 +1,274 @@
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree
+import zlib
+
+from svgToolPng import encodePng, decodePng, readPng, writePng, downscaleImage
+from svgToolWorkerPool import ProcessRunner, WorkerPool, findPhantomJs, workerScript
+
+
+class PngFileDocument(object):
+    # documents that can only write PNG files are resampled through the pure Python decoder
+
+    def renderSource(self, outfile, width, height):
+        self.render(outfile, width, height)
+        return readPng(outfile)
+
+    def renderScaled(self, image, outfile, width, height):
+        writePng(outfile, downscaleImage(image, int(round(width)), int(round(height))))
+
+    def renderBytes(self, width, height):
+        # svg2png can only write files, the PNG goes through a temporary one
+        descriptor, temp = tempfile.mkstemp(suffix=".png")
+        os.close(descriptor)
+        try:
+            self.render(temp, width, height)
+            with open(temp, 'rb') as png:
+                return png.read()
+        finally:
+            os.remove(temp)
+
+    def renderSourceBytes(self, width, height):
+        data = self.renderBytes(width, height)
+        return data, decodePng(data)
+
+    def renderScaledBytes(self, image, width, height):
+        scaled = downscaleImage(image, int(round(width)), int(round(height)))
+        return encodePng(scaled.width, scaled.height, scaled.pixels)
+
+
+class Svg2PngRenderer(object):
+
+    id = "svg2png"
+    name = "svg2png (external)"
+    version = 1
+    parsesOnce = False
+    requiresQt = False
+
+    class Document(PngFileDocument):
+        def __init__(self, runner, command, infile):
+            self.runner = runner
+            self.command = command
+            self.infile = infile
+
+        def render(self, outfile, width, height):
+            self.runner.run([self.command, self.infile, "-o", outfile, "-w", str(width), "-h", str(height)])
+
+        def close(self):
+            pass
+
+    runner = None
+    command = None
+
+    def start(self, workerCount, timeout=None):
+        # resolved once, which also finds the svg2png.cmd wrapper npm installs on Windows
+        self.command = shutil.which("svg2png")
+        if self.command is None:
+            raise IOError("svg2png not found, install it with npm install -g svg2png")
+        self.runner = ProcessRunner(timeout)
+
+    def stop(self):
+        self.runner = None
+
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+
+    def load(self, infile):
+        return Svg2PngRenderer.Document(self.runner, self.command, infile)
+
+
+class Svg2PngPoolRenderer(object):
+
+    id = "svg2png-pool"
+    name = "svg2png (worker pool)"
+    version = 1
+    parsesOnce = False
+    requiresQt = False
+
+    class Document(PngFileDocument):
+        def __init__(self, pool, infile):
+            self.pool = pool
+            self.infile = infile
+
+        def render(self, outfile, width, height):
+            self.pool.render(self.infile, outfile, width, height)
+
+        def close(self):
+            pass
+
+    pool = None
+
+    def start(self, workerCount, timeout=None):
+        self.pool = WorkerPool([findPhantomJs(), workerScript], workerCount, timeout)
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def cancel(self):
+        if self.pool is not None:
+            self.pool.cancel()
+
+    def load(self, infile):
+        return Svg2PngPoolRenderer.Document(self.pool, infile)
+
+
+class QtSvgRenderer(object):
+
+    id = "qtsvg"
+    name = "QtSvg (in-process)"
+    version = 1
+    parsesOnce = True
+    requiresQt = True
+
+    class Document(object):
+        def __init__(self, infile):
+            from PyQt5.QtSvg import QSvgRenderer
+
+            self.infile = infile
+            self.svgRenderer = QSvgRenderer(infile)
+            if not self.svgRenderer.isValid():
+                raise ValueError('Invalid SVG file: "{0}"'.format(infile))
+
+            self.viewBox = self.svgRenderer.viewBoxF()
+            if self.viewBox.isEmpty():
+                self.viewBox.setSize(self.svgRenderer.defaultSize())
+
+        def render(self, outfile, width, height):
+            self.saveImage(self.renderImage(width, height), outfile)
+
+        def renderSource(self, outfile, width, height):
+            image = self.renderImage(width, height)
+            self.saveImage(image, outfile)
+            return image
+
+        def renderScaled(self, image, outfile, width, height):
+            self.saveImage(self.scaleImage(image, width, height), outfile)
+
+        def renderBytes(self, width, height):
+            return self.encodeImage(self.renderImage(width, height))
+
+        def renderSourceBytes(self, width, height):
+            image = self.renderImage(width, height)
+            return self.encodeImage(image), image
+
+        def renderScaledBytes(self, image, width, height):
+            return self.encodeImage(self.scaleImage(image, width, height))
+
+        def scaleImage(self, image, width, height):
+            from PyQt5.QtCore import Qt
+
+            # smooth scaling averages every covered source pixel when reducing, on premultiplied colors
+            return image.scaled(int(round(width)), int(round(height)), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        def saveImage(self, image, outfile):
+            if not image.save(outfile, "PNG"):
+                raise IOError('Could not write "{0}"'.format(outfile))
+
+        def encodeImage(self, image):
+            from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            if not image.save(buffer, "PNG"):
+                raise IOError("Could not encode PNG")
+            buffer.close()
+            return bytes(data)
+
+        def renderImage(self, width, height):
+            from PyQt5.QtCore import QRectF, Qt
+            from PyQt5.QtGui import QImage, QPainter
+
+            width = int(round(width))
+            height = int(round(height))
+
+            image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+            image.fill(Qt.transparent)
+
+            # svg2png keeps the document aspect ratio centered in the canvas, so do the same
+            scale = min(width / self.viewBox.width(), height / self.viewBox.height())
+            targetWidth = self.viewBox.width() * scale
+            targetHeight = self.viewBox.height() * scale
+            target = QRectF((width - targetWidth) / 2, (height - targetHeight) / 2, targetWidth, targetHeight)
+
+            painter = QPainter(image)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+            self.svgRenderer.render(painter, target)
+            painter.end()
+            return image
+
+        def close(self):
+            self.svgRenderer = None
+
+    def start(self, workerCount, timeout=None):
+        # renders run inside this process and can neither be timed out nor killed, cancelling waits for them
+        pass
+
+    def stop(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def load(self, infile):
+        return QtSvgRenderer.Document(infile)
+
+
+class StubRenderer(object):
+
+    id = "stub"
+    name = "Stub (benchmarks)"
+    version = 1
+    parsesOnce = True
+    requiresQt = False
+
+    class Document(PngFileDocument):
+        def __init__(self, infile):
+            # parse the document like a real renderer would, then paint a flat color derived from it
+            try:
+                with open(infile, 'rb') as svg:
+                    data = svg.read()
+                xml.etree.ElementTree.fromstring(data)
+            except (OSError, xml.etree.ElementTree.ParseError) as error:
+                raise ValueError('Invalid SVG file: "{0}": {1}'.format(infile, error))
+
+            checksum = zlib.crc32(data)
+            self.color = bytes([checksum & 0xff, (checksum >> 8) & 0xff, (checksum >> 16) & 0xff, 0xff])
+
+        def render(self, outfile, width, height):
+            with open(outfile, 'wb') as png:
+                png.write(self.renderBytes(width, height))
+
+        def renderBytes(self, width, height):
+            width = int(round(width))
+            height = int(round(height))
+            return encodePng(width, height, self.color * (width * height))
+
+        def close(self):
+            pass
+
+    def start(self, workerCount, timeout=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def load(self, infile):
+        return StubRenderer.Document(infile)
+
+
+renderers = [QtSvgRenderer, Svg2PngPoolRenderer, Svg2PngRenderer]
+
+
+def createRenderer(id):
+    for renderer in renderers + [StubRenderer]:
+        if renderer.id == id:
+            return renderer()
+    raise ValueError('Unknown renderer: "{0}"'.format(id))
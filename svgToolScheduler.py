@@ -0,0 +1,211 @@
+import os
+import queue
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from svgToolSink import DirectorySink
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+def defaultWorkerCount():
+    return os.cpu_count() or 1
+
+
+class RenderJob(object):
+    def __init__(self, file, infile, targets, sourcefile=None):
+        self.file = file
+        self.infile = infile
+        self.targets = targets
+        # the document handed to the renderer, a minified copy of infile when there is one
+        self.sourcefile = sourcefile or infile
+
+    def split(self):
+        return [RenderJob(self.file, self.infile, [target], self.sourcefile) for target in self.targets]
+
+    def outputCount(self):
+        return sum(1 + len(target.duplicates) for target in self.targets)
+
+
+class RenderTarget(object):
+    def __init__(self, outfile, width, height, cacheKey=None):
+        self.outfile = outfile
+        self.width = width
+        self.height = height
+        self.cacheKey = cacheKey
+        self.source = None
+        self.duplicates = []
+        self.started = 0
+        self.finished = 0
+        self.seconds = 0
+
+
+class ReportedResults(object):
+    # the results queue as seen by one job, remembering the outputs it reported
+
+    def __init__(self, results):
+        self.results = results
+        self.outputs = set()
+
+    def put(self, result):
+        self.outputs.add(result[1])
+        self.results.put(result)
+
+
+class RenderScheduler(object):
+
+    def __init__(self, renderer, workerCount=None, hooks=None, isDownscale=False, sink=None, timeout=None):
+        self.renderer = renderer
+        self.workerCount = max(1, workerCount or defaultWorkerCount())
+        self.hooks = hooks or []
+        self.isDownscale = isDownscale
+        self.sink = sink or DirectorySink()
+        self.timeout = timeout
+        self.cancelToken = False
+
+    def cancel(self):
+        # renders in flight are killed, their jobs come back as cancelled
+        self.cancelToken = True
+        self.renderer.cancel()
+
+    def expand(self, jobs):
+        # renderers that parse the document once keep all sizes of a file together,
+        # the others are split so every single size can run on its own worker
+        # (unless the sizes are scaled down from the largest one)
+        if self.renderer.parsesOnce or self.isDownscale:
+            return list(jobs)
+
+        expanded = []
+        for job in jobs:
+            expanded.extend(job.split())
+        return expanded
+
+    def run(self, jobs):
+        jobs = self.expand(jobs)
+        results = queue.Queue()
+
+        self.renderer.start(self.workerCount, self.timeout)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workerCount) as executor:
+                for job in jobs:
+                    executor.submit(self.renderJob, job, results)
+
+                for _ in range(sum(job.outputCount() for job in jobs)):
+                    yield results.get()
+        finally:
+            self.renderer.stop()
+
+    def renderJob(self, job, results):
+        # run waits for every output of every job, the ones a failure left unreported are reported with it
+        reported = ReportedResults(results)
+        try:
+            self.processJob(job, reported)
+        except Exception as error:
+            for target in job.targets:
+                for output in [target] + target.duplicates:
+                    if output not in reported.outputs:
+                        reported.put((job, output, self.cancelledError(error)))
+
+    def processJob(self, job, results):
+        if self.cancelToken:
+            for target in job.targets:
+                self.putResults(results, job, target, RenderCancelled())
+            return
+
+        for hook in self.hooks:
+            hook.jobStarted(job)
+        try:
+            self.renderTargets(job, results)
+        finally:
+            for hook in self.hooks:
+                hook.jobFinished(job)
+
+    def renderTargets(self, job, results):
+        # the first target of a job also carries the time spent parsing the document
+        started = time.perf_counter()
+        startedAt = time.time()
+
+        try:
+            document = self.renderer.load(job.sourcefile)
+        except Exception as error:
+            for target in job.targets:
+                self.putResults(results, job, target, self.cancelledError(error))
+            return
+
+        targets = job.targets
+        if self.isDownscale:
+            targets = sorted(targets, key=lambda target: -target.width * target.height)
+
+        try:
+            source = None
+            for target in targets:
+                if self.cancelToken:
+                    self.putResults(results, job, target, RenderCancelled())
+                    continue
+
+                error = None
+                try:
+                    source = self.renderTarget(document, target, source)
+                except Exception as renderError:
+                    error = renderError
+
+                finished = time.perf_counter()
+                target.started = startedAt
+                target.finished = time.time()
+                target.seconds = finished - started
+                if error is None:
+                    results.put((job, target, None))
+                    self.copyDuplicates(results, job, target)
+                else:
+                    self.putResults(results, job, target, self.cancelledError(error))
+
+                started = time.perf_counter()
+                startedAt = time.time()
+        finally:
+            document.close()
+
+    def cancelledError(self, error):
+        # a render killed by a cancel fails like any other, it is reported as cancelled instead
+        if self.cancelToken:
+            return RenderCancelled()
+        return error
+
+    def renderTarget(self, document, target, source):
+        # returns the rendered target and image the following targets are scaled down from
+        if not self.isDownscale:
+            self.sink.render(document, target.outfile, target.width, target.height)
+            return None
+
+        if source is None:
+            return target, self.sink.renderSource(document, target.outfile, target.width, target.height)
+
+        sourceTarget, image = source
+        # a different aspect ratio would stretch the image, those sizes are rendered on their own
+        if abs(target.width - target.height * sourceTarget.width / sourceTarget.height) > 0.5:
+            self.sink.render(document, target.outfile, target.width, target.height)
+        else:
+            self.sink.renderScaled(document, image, target.outfile, target.width, target.height)
+        return source
+
+    def copyDuplicates(self, results, job, target):
+        for duplicate in target.duplicates:
+            started = time.perf_counter()
+            duplicate.started = time.time()
+
+            error = None
+            try:
+                self.sink.copy(target.outfile, duplicate.outfile)
+            except OSError as copyError:
+                error = copyError
+
+            duplicate.finished = time.time()
+            duplicate.seconds = time.perf_counter() - started
+            results.put((job, duplicate, error))
+
+    def putResults(self, results, job, target, error):
+        results.put((job, target, error))
+        for duplicate in target.duplicates:
+            results.put((job, duplicate, error))
@@ -0,0 +1,160 @@
+import os
+import shutil
+import threading
+import zipfile
+
+
+def copyOutput(source, destination):
+    # a hard link costs neither time nor disk space, file systems without them get a copy
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class DirectorySink(object):
+
+    isArchive = False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+    def makeDirectory(self, path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+    def remove(self, outfile):
+        if os.path.isfile(outfile):
+            os.remove(outfile)
+
+    def render(self, document, outfile, width, height):
+        document.render(outfile, width, height)
+
+    def renderSource(self, document, outfile, width, height):
+        return document.renderSource(outfile, width, height)
+
+    def renderScaled(self, document, image, outfile, width, height):
+        document.renderScaled(image, outfile, width, height)
+
+    def copy(self, source, destination):
+        copyOutput(source, destination)
+
+    def importFile(self, path, outfile):
+        copyOutput(path, outfile)
+
+    def read(self, outfile):
+        with open(outfile, 'rb') as infile:
+            return infile.read()
+
+    def writeBytes(self, outfile, data):
+        temp = "{0}.tmp".format(outfile)
+        with open(temp, 'wb') as outbytes:
+            outbytes.write(data)
+        os.replace(temp, outfile)
+
+    def writeText(self, outfile, text):
+        if os.path.isfile(outfile):
+            with open(outfile, 'r') as infile:
+                if infile.read() == text:
+                    return False
+
+        with open(outfile, 'w') as outtext:
+            outtext.write(text)
+        return True
+
+    def size(self, outfile):
+        try:
+            return os.path.getsize(outfile)
+        except OSError:
+            return 0
+
+    def describe(self):
+        return ""
+
+
+class ZipSink(object):
+
+    isArchive = True
+
+    def __init__(self, outputDir, archivePath):
+        self.outputDir = outputDir
+        self.archivePath = archivePath
+        self.archive = None
+        self.sizes = {}
+        self.lock = threading.Lock()
+
+    def open(self):
+        # the archive is built next to its destination and only replaces it once complete
+        self.archive = zipfile.ZipFile("{0}.tmp".format(self.archivePath), 'w')
+
+    def close(self):
+        self.archive.close()
+        os.replace("{0}.tmp".format(self.archivePath), self.archivePath)
+
+    def abort(self):
+        if self.archive is not None:
+            self.archive.close()
+            os.remove("{0}.tmp".format(self.archivePath))
+
+    def entryName(self, outfile):
+        return os.path.relpath(outfile, self.outputDir).replace("\\", "/")
+
+    def write(self, outfile, data, isCompressed=False):
+        # fixed timestamps keep archives of the same assets byte for byte identical
+        entry = zipfile.ZipInfo(self.entryName(outfile), date_time=(1980, 1, 1, 0, 0, 0))
+        entry.external_attr = 0o644 << 16
+        entry.compress_type = zipfile.ZIP_DEFLATED if isCompressed else zipfile.ZIP_STORED
+
+        with self.lock:
+            self.archive.writestr(entry, data)
+            self.sizes[outfile] = len(data)
+
+    def makeDirectory(self, path):
+        pass
+
+    def remove(self, outfile):
+        pass
+
+    def render(self, document, outfile, width, height):
+        self.write(outfile, document.renderBytes(width, height))
+
+    def renderSource(self, document, outfile, width, height):
+        data, image = document.renderSourceBytes(width, height)
+        self.write(outfile, data)
+        return image
+
+    def renderScaled(self, document, image, outfile, width, height):
+        self.write(outfile, document.renderScaledBytes(image, width, height))
+
+    def copy(self, source, destination):
+        with self.lock:
+            data = self.archive.read(self.entryName(source))
+        self.write(destination, data)
+
+    def importFile(self, path, outfile):
+        with open(path, 'rb') as png:
+            self.write(outfile, png.read())
+
+    def read(self, outfile):
+        with self.lock:
+            return self.archive.read(self.entryName(outfile))
+
+    def writeBytes(self, outfile, data):
+        self.write(outfile, data)
+
+    def writeText(self, outfile, text):
+        self.write(outfile, text.encode("utf-8"), True)
+        return True
+
+    def size(self, outfile):
+        with self.lock:
+            return self.sizes.get(outfile, 0)
+
+    def describe(self):
+        return 'written to "{0}"'.format(self.archivePath)
@@ -0,0 +1,48 @@
+import os
+import xml.etree.ElementTree
+
+
+msbuildNamespace = "http://schemas.microsoft.com/developer/msbuild/2003"
+
+
+class SolutionProject(object):
+
+    def __init__(self, path):
+        xml.etree.ElementTree.register_namespace("", msbuildNamespace)
+        self.path = path
+        self.tree = xml.etree.ElementTree.parse(path)
+        self.itemGroups = self.tree.getroot().findall("{{{0}}}ItemGroup".format(msbuildNamespace))
+        self.includes = set()
+        self.isChanged = False
+
+        for itemgroup in self.itemGroups:
+            for item in itemgroup:
+                if "Include" in item.attrib:
+                    self.includes.add(item.attrib["Include"])
+
+    def itemGroup(self, index):
+        try:
+            return self.itemGroups[index]
+        except IndexError:
+            return self.itemGroups[0]
+
+    def include(self, itemgroup, tag, include):
+        if include in self.includes:
+            return False
+
+        newitem = xml.etree.ElementTree.Element(tag)
+        newitem.set("Include", include)
+        itemgroup.append(newitem)
+        self.includes.add(include)
+        self.isChanged = True
+        return True
+
+    def save(self):
+        if not self.isChanged:
+            return False
+
+        temp = "{0}.tmp".format(self.path)
+        self.tree.write(temp)
+        os.replace(temp, self.path)
+        self.isChanged = False
+        return True
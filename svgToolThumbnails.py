@@ -0,0 +1,142 @@
+import os
+
+from collections import OrderedDict
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+
+from svgToolRenderer import QtSvgRenderer
+
+
+class ThumbnailCache(object):
+
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.usedBytes = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, icon, size):
+        if key in self.entries:
+            self.usedBytes -= self.entries.pop(key)[1]
+
+        self.entries[key] = (icon, size)
+        self.usedBytes += size
+
+        while self.usedBytes > self.maxBytes and len(self.entries) > 1:
+            _, (_, evictedSize) = self.entries.popitem(last=False)
+            self.usedBytes -= evictedSize
+
+    def clear(self):
+        self.entries.clear()
+        self.usedBytes = 0
+
+
+class ThumbnailSignals(QObject):
+
+    sigRendered = QtCore.pyqtSignal(int, str, str, object, bool, QImage)
+
+
+class ThumbnailTask(QRunnable):
+
+    def __init__(self, signals, request, name, path, mtime, size):
+        super(ThumbnailTask, self).__init__()
+        self.signals = signals
+        self.request = request
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+
+    def run(self):
+        # the file is checked here, off the UI thread, and only rendered again when it changed
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        image = QImage()
+        isChanged = self.mtime is None or mtime != self.mtime
+        if isChanged and mtime is not None:
+            try:
+                document = QtSvgRenderer.Document(self.path)
+                image = document.renderImage(self.size, self.size)
+                document.close()
+            except (ValueError, ZeroDivisionError):
+                image = QImage()
+        self.signals.sigRendered.emit(self.request, self.name, self.path, mtime, isChanged, image)
+
+
+class ThumbnailProvider(QObject):
+
+    sigThumbnailReady = QtCore.pyqtSignal(str)
+
+    def __init__(self, size=16, maxBytes=8 * 1024 * 1024, parent=None):
+        super(ThumbnailProvider, self).__init__(parent)
+        self.size = size
+        self.cache = ThumbnailCache(maxBytes)
+        # modification time of every cached thumbnail, and the ones checked against their file since the last reset
+        self.mtimes = {}
+        self.verified = set()
+        self.paths = {}
+        self.pending = {}
+        self.requestCount = 0
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals(self)
+        self.signals.sigRendered.connect(self.onRendered)
+
+    def icon(self, name, path):
+        # called for every painted row, so only dictionary lookups: an outdated thumbnail is shown until checked
+        icon = self.cache.get(path)
+        if icon is not None and path in self.verified:
+            return icon
+
+        if path not in self.pending:
+            self.requestCount += 1
+            self.pending[path] = self.requestCount
+            self.paths[name] = path
+            self.threadPool.start(ThumbnailTask(self.signals, self.requestCount, name, path,
+                                                None if icon is None else self.mtimes.get(path), self.size))
+        return icon
+
+    def onRendered(self, request, name, path, mtime, isChanged, image):
+        # thumbnails arrive on the UI thread, the only place where QPixmap may be created
+        if self.pending.get(path) != request:
+            return
+        del self.pending[path]
+        self.verified.add(path)
+        if not isChanged:
+            return
+
+        # a file that is gone gets an empty icon, the outdated one is replaced either way
+        icon = QIcon() if image.isNull() else QIcon(QPixmap.fromImage(image))
+        self.mtimes[path] = mtime
+        self.cache.put(path, icon, image.width() * image.height() * 4 + 64)
+        self.sigThumbnailReady.emit(name)
+
+    def cancelPending(self):
+        # thumbnails of rows that scrolled out of view are not needed anymore
+        self.threadPool.clear()
+        self.pending = {}
+
+    def invalidate(self, names):
+        # results of checks started before the change are dropped, the rows ask again once repainted
+        for name in names:
+            path = self.paths.get(name)
+            if path is not None:
+                self.verified.discard(path)
+                self.pending.pop(path, None)
+                self.sigThumbnailReady.emit(name)
+
+    def reset(self):
+        self.cancelPending()
+        self.verified = set()
+        self.paths = {}
@@ -0,0 +1,175 @@
+import cProfile
+import json
+import pstats
+import threading
+import time
+
+
+class TraceHook(object):
+    # jobStarted and jobFinished run on the render worker of the job,
+    # every other hook runs on the thread of the conversion
+
+    def conversionStarted(self, conversion):
+        pass
+
+    def jobStarted(self, job):
+        pass
+
+    def jobFinished(self, job):
+        pass
+
+    def outputFinished(self, output):
+        pass
+
+    def conversionFinished(self, conversion):
+        pass
+
+
+class Tracer(TraceHook):
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stream = None
+        self.events = []
+        self.files = {}
+        self.started = 0
+        self.seconds = 0
+        self.stageTimes = {}
+
+    def record(self, event):
+        self.events.append(event)
+        if self.stream is not None:
+            self.stream.write(json.dumps(event) + "\n")
+
+    def conversionStarted(self, conversion):
+        if self.path:
+            self.stream = open(self.path, 'w')
+
+        self.started = time.time()
+        self.record({'event': "conversionStarted", 'time': self.started, 'preset': conversion.preset,
+                     'renderer': conversion.renderer.id, 'workers': conversion.workerCount,
+                     'files': len(conversion.inputFiles)})
+
+    def outputFinished(self, output):
+        event = dict(output)
+        event['event'] = "output"
+        self.record(event)
+
+        file = self.files.setdefault(output['input'], {
+            'event': "file", 'input': output['input'], 'started': None, 'finished': None,
+            'seconds': 0, 'outputs': 0, 'bytes': 0, 'errors': []
+        })
+        file['outputs'] += 1
+        file['seconds'] += output['seconds']
+        file['bytes'] += output.get('bytes', 0)
+        if 'error' in output:
+            file['errors'].append(output['error'])
+        if 'started' in output:
+            file['started'] = min(file['started'] or output['started'], output['started'])
+            file['finished'] = max(file['finished'] or output['finished'], output['finished'])
+
+    def conversionFinished(self, conversion):
+        self.seconds = time.time() - self.started
+        self.stageTimes = dict(conversion.stageTimes)
+
+        try:
+            for file in sorted(self.files.values(), key=lambda file: -file['seconds']):
+                self.record(file)
+            for name, seconds in sorted(self.stageTimes.items(), key=lambda stage: -stage[1]):
+                self.record({'event': "stage", 'name': name, 'seconds': seconds})
+            if conversion.sourceCache is not None:
+                event = dict(conversion.sourceCache.stats)
+                event['event'] = "sources"
+                self.record(event)
+            self.record({'event': "conversionFinished", 'time': time.time(), 'status': conversion.status,
+                         'seconds': self.seconds})
+        finally:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+
+    def summary(self, top=10):
+        outputs = [event for event in self.events if event['event'] == "output"]
+        rendered = [output for output in outputs if output['status'] == "rendered"]
+        copied = [output for output in outputs if output['status'] == "copied"]
+        cached = [output for output in outputs if output['status'] == "cached"]
+        failed = [output for output in outputs if output['status'] == "failed"]
+
+        lines = ["{0} outputs in {1:.2f}s: {2} rendered, {3} copied, {4} cached, {5} failed, {6} bytes written".format(
+            len(outputs), self.seconds, len(rendered), len(copied), len(cached), len(failed),
+            sum(output.get('bytes', 0) for output in rendered + copied))]
+
+        if self.stageTimes:
+            lines.append("")
+            lines.append("Stages:")
+            for name, seconds in sorted(self.stageTimes.items(), key=lambda stage: -stage[1]):
+                lines.append("  {0:<14} {1:8.3f}s".format(name, seconds))
+
+        files = sorted(self.files.values(), key=lambda file: -file['seconds'])[:top]
+        if files and files[0]['seconds'] > 0:
+            lines.append("")
+            lines.append("Slowest files:")
+            for file in files:
+                lines.append("  {0:8.3f}s {1:3} outputs  {2}".format(file['seconds'], file['outputs'], file['input']))
+
+        if failed:
+            lines.append("")
+            lines.append("Failures:")
+            for output in failed[:top]:
+                lines.append("  {0}: {1}".format(output['output'], output['error']))
+
+        return "\n".join(lines)
+
+
+class ProfilerHook(TraceHook):
+
+    def __init__(self, path=None):
+        self.path = path
+        self.profiles = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = None
+
+    def enable(self):
+        profile = getattr(self.local, "profile", None)
+        if profile is None:
+            profile = self.local.profile = cProfile.Profile()
+            with self.lock:
+                self.profiles.append(profile)
+
+        # before Python 3.12 a profiler only sees the thread that enabled it, since 3.12 the first
+        # profiler sees every thread and enabling another one fails
+        try:
+            profile.enable()
+            self.local.enabled = True
+        except ValueError:
+            self.local.enabled = False
+
+    def disable(self):
+        if getattr(self.local, "enabled", False):
+            self.local.profile.disable()
+            self.local.enabled = False
+
+    def conversionStarted(self, conversion):
+        self.enable()
+
+    def jobStarted(self, job):
+        self.enable()
+
+    def jobFinished(self, job):
+        self.disable()
+
+    def conversionFinished(self, conversion):
+        self.disable()
+
+        for profile in self.profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+        if self.stats is not None and self.path:
+            self.stats.dump_stats(self.path)
@@ -0,0 +1,153 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from svgToolConversion import matchesPattern
+
+
+class InotifyBackend(object):
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_CLOEXEC = 0o2000000
+
+    eventHeader = struct.Struct("iIII")
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, 'inotify_add_watch failed for "{0}"'.format(path))
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        data = os.read(self.fd, 65536)
+        offset = 0
+        while offset + self.eventHeader.size <= len(data):
+            _, _, _, length = self.eventHeader.unpack_from(data, offset)
+            offset += self.eventHeader.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                changed.add(os.fsdecode(name))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend(object):
+
+    def __init__(self, path):
+        self.path = path
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(timeout)
+        try:
+            snapshot = self.scan()
+        except OSError:
+            return set()
+
+        changed = set(name for name, state in snapshot.items() if self.snapshot.get(name) != state)
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def createBackend(path):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyBackend(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingBackend(path)
+
+
+class DirectoryWatcher(object):
+
+    pollInterval = 1.0
+
+    def __init__(self, path, onChanged, filterText="", include=("*.svg",), exclude=(), debounce=0.5):
+        self.path = path
+        self.onChanged = onChanged
+        self.filterText = filterText
+        self.include = include
+        self.exclude = exclude
+        self.debounce = debounce
+        self.stopToken = False
+        self.thread = None
+        self.backend = None
+
+    def isWatched(self, file):
+        # the same files walkSvgFiles lists, only the directory itself is watched
+        return self.filterText.upper() in file.upper() and \
+            not any(matchesPattern(file, pattern) for pattern in self.exclude) and \
+            any(matchesPattern(file, pattern) for pattern in self.include)
+
+    def start(self):
+        self.backend = createBackend(self.path)
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stopToken = True
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def run(self):
+        pending = set()
+        lastChange = 0
+
+        if isinstance(self.backend, PollingBackend):
+            timeout = min(self.debounce, self.pollInterval)
+        else:
+            timeout = self.debounce / 2
+
+        try:
+            while not self.stopToken:
+                changed = set(file for file in self.backend.poll(timeout) if self.isWatched(file))
+
+                # bursts of events (editors saving through temp files, copies of many files) are
+                # coalesced until the directory has been quiet for the debounce interval
+                if changed:
+                    pending |= changed
+                    lastChange = time.time()
+                elif pending and time.time() - lastChange >= self.debounce:
+                    files = sorted(file for file in pending if os.path.isfile("{0}/{1}".format(self.path, file)))
+                    pending = set()
+                    if files:
+                        self.onChanged(files)
+        finally:
+            self.backend.close()
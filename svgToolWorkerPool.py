@@ -0,0 +1,266 @@
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+
+workerScript = os.path.join(os.path.dirname(os.path.abspath(__file__)), "svg2pngWorker.js")
+
+
+def findPhantomJs():
+    phantomjs = os.environ.get("FLANDRE_PHANTOMJS") or shutil.which("phantomjs")
+    if phantomjs:
+        return phantomjs
+
+    # svg2png ships its own PhantomJS through phantomjs-prebuilt
+    npm = shutil.which("npm")
+    if npm:
+        try:
+            npmRoot = subprocess.check_output([npm, "root", "-g"], universal_newlines=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            npmRoot = ""
+
+        for phantomjs in [
+            "{0}/svg2png/node_modules/phantomjs-prebuilt/lib/phantom/bin/phantomjs".format(npmRoot),
+            "{0}/phantomjs-prebuilt/lib/phantom/bin/phantomjs".format(npmRoot)
+        ]:
+            if os.path.isfile(phantomjs):
+                return phantomjs
+
+    raise IOError("PhantomJS not found, install svg2png or set FLANDRE_PHANTOMJS")
+
+
+class WorkerError(Exception):
+    pass
+
+
+class WorkerTimeout(WorkerError):
+    pass
+
+
+def processGroupOptions():
+    # renderers run in a group of their own, so killing one also stops the processes it spawned
+    # (svg2png is a node script that starts PhantomJS)
+    if os.name == "nt":
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def killProcess(process):
+    try:
+        if os.name == "nt":
+            subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    process.kill()
+
+
+class ProcessRunner(object):
+    # runs one renderer process per job, bounded by a timeout and killed on cancel
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or None
+        self.processes = set()
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def run(self, command):
+        with self.lock:
+            if self.cancelled:
+                raise WorkerError("Render cancelled")
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, **processGroupOptions())
+            self.processes.add(process)
+
+        try:
+            try:
+                _, errors = process.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                killProcess(process)
+                process.communicate()
+                raise WorkerTimeout("Renderer did not finish in {0}s".format(self.timeout))
+        finally:
+            with self.lock:
+                self.processes.discard(process)
+
+        if process.returncode != 0:
+            message = errors.decode("utf-8", "replace").strip()
+            raise WorkerError(message or "Renderer exited with code {0}".format(process.returncode))
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            processes = list(self.processes)
+
+        for process in processes:
+            killProcess(process)
+
+
+class RendererWorker(object):
+
+    def __init__(self, command):
+        self.command = command
+        self.process = None
+        self.lines = None
+        self.lastUsed = 0
+        self.requestId = 0
+        self.start()
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, universal_newlines=True, bufsize=1)
+        self.lines = queue.Queue()
+        reader = threading.Thread(target=self.readLines, args=(self.process, self.lines))
+        reader.daemon = True
+        reader.start()
+        self.lastUsed = time.time()
+
+    def readLines(self, process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def isAlive(self):
+        return self.process.poll() is None
+
+    def request(self, message, timeout=None):
+        self.requestId += 1
+        message["id"] = self.requestId
+
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            raise WorkerError("Renderer worker died")
+
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=None if deadline is None else max(0, deadline - time.time()))
+            except queue.Empty:
+                raise WorkerTimeout("Renderer worker did not answer in {0}s".format(timeout))
+
+            if line is None:
+                raise WorkerError("Renderer worker died")
+
+            # PhantomJS may print its own warnings on stdout, only our replies are JSON with our id
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(reply, dict) and reply.get("id") == message["id"]:
+                self.lastUsed = time.time()
+                return reply
+
+    def ping(self, timeout):
+        try:
+            return self.request({"command": "ping"}, timeout).get("ok", False)
+        except WorkerError:
+            return False
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def kill(self):
+        self.process.kill()
+
+    def stop(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool(object):
+
+    healthCheckInterval = 30
+    healthCheckTimeout = 5
+
+    def __init__(self, command, size, timeout=None):
+        self.command = command
+        self.timeout = timeout or None
+        self.cancelled = False
+        self.workers = []
+        self.idleWorkers = queue.Queue()
+        self.restarts = 0
+        self.lock = threading.Lock()
+
+        # a worker that can not start takes down the ones already running instead of leaking them
+        try:
+            for _ in range(size):
+                worker = RendererWorker(command)
+                self.workers.append(worker)
+                self.idleWorkers.put(worker)
+        except BaseException:
+            self.close()
+            raise
+
+    def acquire(self):
+        worker = self.idleWorkers.get()
+
+        if not worker.isAlive():
+            self.restart(worker)
+        elif time.time() - worker.lastUsed > self.healthCheckInterval and not worker.ping(self.healthCheckTimeout):
+            self.restart(worker)
+
+        return worker
+
+    def release(self, worker):
+        self.idleWorkers.put(worker)
+
+    def restart(self, worker):
+        worker.restart()
+        with self.lock:
+            self.restarts += 1
+
+    def render(self, infile, outfile, width, height):
+        message = {
+            "command": "render",
+            "input": os.path.abspath(infile),
+            "output": os.path.abspath(outfile),
+            "width": int(round(width)),
+            "height": int(round(height))
+        }
+
+        if self.cancelled:
+            raise WorkerError("Render cancelled")
+
+        worker = self.acquire()
+        try:
+            for attempt in range(2):
+                try:
+                    reply = worker.request(dict(message), self.timeout)
+                    break
+                except WorkerError as error:
+                    if self.cancelled:
+                        raise
+                    # a hung or crashed worker is replaced, only a crash gets a retry on the fresh process
+                    self.restart(worker)
+                    if attempt or isinstance(error, WorkerTimeout):
+                        raise
+        finally:
+            self.release(worker)
+
+        if not reply.get("ok"):
+            raise IOError(reply.get("error", 'Could not render "{0}"'.format(infile)))
+
+    def cancel(self):
+        # jobs in flight fail at once, the scheduler reports them as cancelled
+        self.cancelled = True
+        for worker in self.workers:
+            worker.kill()
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
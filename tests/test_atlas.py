@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolAtlas import atlasMap, buildAtlas, formatMap, packSprites, parseMap
+from svgToolPng import decodePng, encodePng
+
+
+def randomSprites(count, seed, maxSize=96):
+    rng = random.Random(seed)
+    return [("sprite{0}".format(index), rng.randint(1, maxSize), rng.randint(1, maxSize)) for index in range(count)]
+
+
+class PackerTest(unittest.TestCase):
+
+    def checkPages(self, sprites, pages, maxSize, padding):
+        placed = [placement[0] for page in pages for placement in page.placements]
+        self.assertEqual(sorted(placed), sorted(name for name, _, _ in sprites))
+
+        sizes = {name: (width, height) for name, width, height in sprites}
+        for page in pages:
+            for name, x, y, width, height in page.placements:
+                self.assertEqual((width, height), sizes[name])
+                self.assertTrue(x >= 0 and y >= 0 and x + width <= page.width and y + height <= page.height, name)
+                if len(page.placements) > 1:
+                    self.assertTrue(page.width <= maxSize and page.height <= maxSize)
+
+            # sprites keep their padding apart
+            for index, (_, x, y, width, height) in enumerate(page.placements):
+                for _, otherX, otherY, otherWidth, otherHeight in page.placements[index + 1:]:
+                    self.assertFalse(x < otherX + otherWidth + padding and otherX < x + width + padding and
+                                     y < otherY + otherHeight + padding and otherY < y + height + padding)
+
+    def testNoOverlapsInsideBounds(self):
+        for seed in range(5):
+            sprites = randomSprites(120, seed)
+            pages = packSprites(sprites, 512, 2)
+            self.checkPages(sprites, pages, 512, 2)
+
+    def testSpillsOverToMorePages(self):
+        sprites = randomSprites(200, "pages", 120)
+        pages = packSprites(sprites, 256, 1)
+        self.assertGreater(len(pages), 1)
+        self.checkPages(sprites, pages, 256, 1)
+
+    def testOversizedSpriteGetsItsOwnPage(self):
+        sprites = [("huge", 300, 40), ("small", 10, 10)]
+        pages = packSprites(sprites, 128, 2)
+        self.assertEqual(sorted(len(page.placements) for page in pages), [1, 1])
+        self.checkPages(sprites, pages, 128, 2)
+
+
+class AtlasTest(unittest.TestCase):
+
+    def testPagesHoldTheSprites(self):
+        rng = random.Random("atlas")
+        sprites = {}
+        for name, width, height in randomSprites(30, "atlas", 24):
+            pixels = bytes(rng.randrange(256) for _ in range(width * height * 4))
+            sprites[name] = (width, height, pixels)
+
+        pages, pngs = buildAtlas([(name, encodePng(*sprite)) for name, sprite in sprites.items()], 64, 2)
+        images = [decodePng(png) for png in pngs]
+        for pageIndex, page in enumerate(pages):
+            image = images[pageIndex]
+            self.assertEqual((image.width, image.height), (page.width, page.height))
+            for name, x, y, width, height in page.placements:
+                for row in range(height):
+                    start = ((y + row) * image.width + x) * 4
+                    self.assertEqual(image.pixels[start:start + width * 4],
+                                     sprites[name][2][row * width * 4:(row + 1) * width * 4], name)
+
+    def testMapRoundTrip(self):
+        pages = packSprites(randomSprites(10, "map"), 256, 2)
+        atlas = atlasMap(pages, ["atlas{0}.png".format(index) for index in range(len(pages))], 2)
+        for isPlist in (False, True):
+            self.assertEqual(parseMap(formatMap(atlas, isPlist), isPlist), atlas)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolBenchmark import parseArguments
+
+
+class QualityTest(unittest.TestCase):
+
+    def testStubRendererRefused(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parseArguments(["--quality", "5"])
+        self.assertEqual(parseArguments(["--quality", "5", "--renderer", "qtsvg"]).quality, 5)
+
+
+    def testSizesInRange(self):
+        self.assertEqual(parseArguments(["--sizes", "10", "10000"]).sizes, [10, 10000])
+        for size in ["9", "10001", "0"]:
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                parseArguments(["--sizes", "100", size])
+
+
+if __name__ == '__main__':
+    unittest.main()
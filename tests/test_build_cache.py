@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolBuildCache import BuildCache
+
+
+class FakeRenderer(object):
+
+    def __init__(self, id="svg2png", version="1"):
+        self.id = id
+        self.version = version
+
+
+class BuildCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.outputDir = self.tempDir.name
+        self.infile = "{0}/icon.svg".format(self.outputDir)
+        self.outfile = "{0}/icon.png".format(self.outputDir)
+        self.writeFile(self.infile, '<svg xmlns="http://www.w3.org/2000/svg"/>')
+        self.writeFile(self.outfile, "png")
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def writeFile(self, path, text):
+        with open(path, 'w') as outfile:
+            outfile.write(text)
+
+    def key(self, cache, preset="Button Icon", renderer=None, options=()):
+        return cache.key(self.infile, 32, 32, preset, renderer or FakeRenderer(), options)
+
+    def testSavedEntriesAreUpToDate(self):
+        cache = BuildCache(self.outputDir)
+        cache.update(self.outfile, self.key(cache))
+        cache.save()
+
+        cache = BuildCache(self.outputDir)
+        self.assertTrue(cache.isUpToDate(self.outfile, self.key(cache)))
+        self.assertEqual(cache.hits, 1)
+
+    def testKeyChangesWithEverySetting(self):
+        cache = BuildCache(self.outputDir)
+        key = self.key(cache)
+        cache.update(self.outfile, key)
+
+        self.assertEqual(self.key(cache), key)
+        for changed in [self.key(cache, preset="Store Icon"),
+                        self.key(cache, renderer=FakeRenderer("qtsvg")),
+                        self.key(cache, renderer=FakeRenderer(version="2")),
+                        self.key(cache, options=["optimize"]),
+                        self.key(cache, options=["downscale"]),
+                        cache.key(self.infile, 64, 64, "Button Icon", FakeRenderer())]:
+            self.assertNotEqual(changed, key)
+            self.assertFalse(cache.isUpToDate(self.outfile, changed))
+
+    def testSourceChangeInvalidates(self):
+        cache = BuildCache(self.outputDir)
+        cache.update(self.outfile, self.key(cache))
+        cache.save()
+
+        self.writeFile(self.infile, '<svg xmlns="http://www.w3.org/2000/svg" width="2"/>')
+        cache = BuildCache(self.outputDir)
+        self.assertFalse(cache.isUpToDate(self.outfile, self.key(cache)))
+
+    def testMissingOutputAndForceRebuild(self):
+        cache = BuildCache(self.outputDir)
+        key = self.key(cache)
+        cache.update(self.outfile, key)
+        cache.save()
+
+        self.assertFalse(BuildCache(self.outputDir, True).isUpToDate(self.outfile, key))
+        os.remove(self.outfile)
+        self.assertFalse(BuildCache(self.outputDir).isUpToDate(self.outfile, key))
+
+    def testInvalidateAndRestore(self):
+        cache = BuildCache(self.outputDir, True)
+        key = self.key(cache)
+        cache.update(self.outfile, key)
+        cache.invalidate(self.outfile)
+        self.assertFalse(cache.isUpToDate(self.outfile, key))
+
+        # outputs of an interrupted run are kept even when rebuilding everything
+        cache.restore({"icon.png": key})
+        self.assertTrue(cache.isUpToDate(self.outfile, key))
+
+    def testUnreadableManifestStartsEmpty(self):
+        self.writeFile("{0}/{1}".format(self.outputDir, BuildCache.manifestName), "{broken")
+        self.assertEqual(BuildCache(self.outputDir).entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+import contextlib
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+packageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, packageDir)
+
+from svgToolBenchmark import createSolution
+from svgToolCli import loadBatch, parseArguments
+from svgToolPng import decodePng, encodePng
+
+# a stand-in for svg2png that takes a while on every raster
+fakeSvg2png = '''#!{0}
+import random
+import sys
+import time
+sys.path.insert(0, {1!r})
+from svgToolPng import encodePng
+arguments = sys.argv[1:]
+outfile = arguments[arguments.index("-o") + 1]
+width = int(float(arguments[arguments.index("-w") + 1]))
+height = int(float(arguments[arguments.index("-h") + 1]))
+time.sleep({2})
+with open(outfile, "wb") as outpng:
+    outpng.write(encodePng(width, height, bytes(width * height * 4), 0))
+'''
+
+svgSource = '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="{0}" height="16"/></svg>'
+
+
+def journalLines(journal):
+    with open(journal, 'r') as injournal:
+        return injournal.read().count("\n")
+
+
+class CliTestCase(unittest.TestCase):
+
+    renderDelay = "0.1"
+    fileCount = 40
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        root = self.tempDir.name
+        self.binDir = "{0}/bin".format(root)
+        self.inputDir = "{0}/in".format(root)
+        self.outputDir = "{0}/out".format(root)
+        os.makedirs(self.binDir)
+        os.makedirs(self.inputDir)
+        os.makedirs(self.outputDir)
+
+        svg2png = "{0}/svg2png".format(self.binDir)
+        with open(svg2png, 'w') as outscript:
+            outscript.write(fakeSvg2png.format(sys.executable, packageDir, self.renderDelay))
+        os.chmod(svg2png, 0o755)
+
+        for index in range(self.fileCount):
+            with open("{0}/icon{1:02}.svg".format(self.inputDir, index), 'w') as outsvg:
+                outsvg.write(svgSource.format(index % 16 + 1))
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def startCli(self, *arguments):
+        environment = dict(os.environ)
+        environment['PATH'] = self.binDir + os.pathsep + environment.get('PATH', "")
+        environment['PYTHONPATH'] = packageDir
+        return subprocess.Popen([sys.executable, "{0}/svgToolCli.py".format(packageDir), self.inputDir, "-q"]
+                                + list(arguments), env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def interrupt(self, process, isReady):
+        deadline = time.time() + 30
+        while time.time() < deadline and process.poll() is None and not isReady():
+            time.sleep(0.05)
+        self.assertIsNone(process.poll())
+        process.send_signal(signal.SIGINT)
+        self.assertEqual(process.wait(30), 130)
+
+    def outputFiles(self, suffix):
+        return ["{0}/{1}".format(folder, name) for folder, _, names in os.walk(self.outputDir)
+                for name in names if name.endswith(suffix)]
+
+
+class InterruptTest(CliTestCase):
+
+    def testSigintCancelsAndFinalizes(self):
+        process = self.startCli("-o", self.outputDir, "-j", "2")
+
+        # interrupt once a few outputs are in the journal
+        journal = "{0}/.flandre-journal.jsonl".format(self.outputDir)
+        self.interrupt(process, lambda: os.path.isfile(journal) and journalLines(journal) > 3)
+
+        with open(journal, 'r') as injournal:
+            lines = injournal.read().splitlines()
+        with open("{0}/.flandre-cache.json".format(self.outputDir), 'r') as injson:
+            manifest = json.load(injson)
+
+        self.assertIn('fingerprint', json.loads(lines[0]))
+        entries = [json.loads(line) for line in lines[1:]]
+        self.assertTrue(entries)
+        for entry in entries:
+            self.assertTrue(os.path.isfile("{0}/{1}".format(self.outputDir, entry['output'])))
+            self.assertEqual(manifest['outputs'].get(entry['output']), entry['key'])
+
+
+class RerunTest(CliTestCase):
+
+    renderDelay = "0"
+    fileCount = 3
+
+    def convert(self, *arguments):
+        report = "{0}/report.json".format(self.tempDir.name)
+        process = self.startCli("-o", self.outputDir, "-p", "Button Icon", "--report", report, *arguments)
+        self.assertEqual(process.wait(60), 0)
+        with open(report, 'r') as injson:
+            return sorted(set(output['status'] for output in json.load(injson)['outputs']))
+
+    def testOnlyChangedSettingsRender(self):
+        self.assertEqual(self.convert(), ["copied", "rendered"])
+        self.assertEqual(self.convert(), ["cached"])
+        self.assertEqual(self.convert("--downscale"), ["copied", "rendered"])
+        self.assertEqual(self.convert("--downscale"), ["cached"])
+
+        # a changed source renders its own outputs again
+        with open("{0}/icon01.svg".format(self.inputDir), 'w') as outsvg:
+            outsvg.write(svgSource.format(7))
+        self.assertEqual(self.convert("--downscale"), ["cached", "copied", "rendered"])
+        self.assertEqual(self.convert("--force"), ["copied", "rendered"])
+
+
+class BrokenProjectTest(CliTestCase):
+
+    fileCount = 2
+
+    def testMalformedProjectFailsTheRun(self):
+        createSolution(self.outputDir)
+        with open("{0}/App.iOS/App.iOS.csproj".format(self.outputDir), 'w') as outcsproj:
+            outcsproj.write("<Project><ItemGroup>")
+
+        process = self.startCli("-o", self.outputDir, "--update-solution", "--report", "{0}/report.json".format(self.outputDir))
+        self.assertEqual(process.wait(60), 1)
+        with open("{0}/report.json".format(self.outputDir), 'r') as injson:
+            self.assertEqual(json.load(injson)['status'], "failed")
+
+
+class OptimizeInterruptTest(CliTestCase):
+
+    fileCount = 10
+
+    def testCancelledRenderingIsNotCachedAsOptimized(self):
+        process = self.startCli("-o", self.outputDir, "-p", "Button Icon", "-j", "2", "--optimize")
+        self.interrupt(process, lambda: len(self.outputFiles(".png")) > 5)
+
+        process = self.startCli("-o", self.outputDir, "-p", "Button Icon", "-j", "2", "--optimize")
+        self.assertEqual(process.wait(60), 0)
+
+        # the stand-in writes uncompressed PNGs, every optimized one is much smaller
+        outputs = self.outputFiles(".png")
+        self.assertTrue(outputs)
+        for outfile in outputs:
+            with open(outfile, 'rb') as inpng:
+                data = inpng.read()
+            image = decodePng(data)
+            self.assertLess(len(data), len(encodePng(image.width, image.height, image.pixels, 0)), outfile)
+
+
+class ResumeTest(CliTestCase):
+
+    fileCount = 10
+
+    def testRerunAfterCancelCompletes(self):
+        process = self.startCli("-o", self.outputDir, "-p", "Button Icon", "-j", "2")
+        journal = "{0}/.flandre-journal.jsonl".format(self.outputDir)
+        self.interrupt(process, lambda: os.path.isfile(journal) and journalLines(journal) > 5)
+        with open(journal, 'r') as injournal:
+            finished = set(json.loads(line)['output'] for line in injournal.read().splitlines()[1:])
+
+        report = "{0}/report.json".format(self.tempDir.name)
+        process = self.startCli("-o", self.outputDir, "-p", "Button Icon", "-j", "2", "--resume", "--force",
+                                "--report", report)
+        self.assertEqual(process.wait(60), 0)
+        with open(report, 'r') as injson:
+            outputs = json.load(injson)['outputs']
+
+        # even when rebuilding everything the resumed run keeps what the cancelled one finished
+        statuses = {os.path.relpath(output['output'], self.outputDir): output['status'] for output in outputs}
+        self.assertEqual(set(status for output, status in statuses.items() if output in finished), {"cached"})
+        self.assertTrue(set(statuses.values()) <= {"cached", "rendered", "copied"})
+        self.assertEqual(len(statuses), self.fileCount * 7)
+        self.assertFalse(os.path.exists(journal))
+
+
+class FailureTest(CliTestCase):
+
+    fileCount = 2
+
+    def testFailedRunLeavesNoJournal(self):
+        # --update-solution without a .csproj fails after the journal is opened
+        process = self.startCli("-o", self.outputDir, "--update-solution")
+        self.assertEqual(process.wait(60), 1)
+        self.assertFalse(os.path.exists("{0}/.flandre-journal.jsonl".format(self.outputDir)))
+
+
+class BatchTest(unittest.TestCase):
+
+    def loadTargets(self, batch):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = "{0}/batch.json".format(tempDir)
+            with open(path, 'w') as outjson:
+                json.dump(batch, outjson)
+            parser, arguments = parseArguments(["--batch", path])
+            with contextlib.redirect_stderr(io.StringIO()):
+                return loadBatch(parser, arguments)
+
+    def testSingleStringsBecomeLists(self):
+        target, = self.loadTargets([{"input": "in", "include": "*.svg", "exclude": "sub", "platforms": "ios"}])
+        self.assertEqual(target.include, ["*.svg"])
+        self.assertEqual(target.exclude, ["sub"])
+        self.assertEqual(target.platforms, ["ios"])
+
+    def testOtherTypesAreRefused(self):
+        for entry in [{"include": 5}, {"exclude": ["sub", 1]}, {"platforms": {"ios": True}}, {"platforms": "tizen"}]:
+            with self.assertRaises(SystemExit):
+                self.loadTargets([dict(entry, input="in")])
+
+
+class ArchiveTest(CliTestCase):
+
+    fileCount = 1
+
+    def testArchiveRefusesLooseFileOptions(self):
+        for option in ["--optimize", "--update-solution"]:
+            process = self.startCli("-o", self.outputDir, "--archive", "{0}/assets.zip".format(self.outputDir), option)
+            self.assertEqual(process.wait(60), 2)
+            self.assertFalse(os.path.exists("{0}/assets.zip".format(self.outputDir)))
+
+
+class ParallelSolutionTest(CliTestCase):
+
+    # the rasters finish in a different order on every run
+    renderDelay = "random.uniform(0, 0.03)"
+    fileCount = 12
+
+    def convert(self, outputDir, workerCount):
+        createSolution(outputDir)
+        process = self.startCli("-o", outputDir, "-p", "Button Icon", "--update-solution", "-j", str(workerCount))
+        self.assertEqual(process.wait(60), 0)
+
+        projects = []
+        for folder in ["App.iOS", "App.Droid"]:
+            with open("{0}/{1}/{1}.csproj".format(outputDir, folder), 'r') as incsproj:
+                projects.append(incsproj.read())
+        return projects
+
+    def testParallelProjectsMatchSerial(self):
+        serial = self.convert("{0}/serial".format(self.tempDir.name), 1)
+        self.assertIn("Contents.json", serial[0])
+        for run in range(2):
+            self.assertEqual(self.convert("{0}/parallel{1}".format(self.tempDir.name, run), 4), serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
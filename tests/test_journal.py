@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolJournal import CheckpointJournal, settingsFingerprint
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.outputDir = self.tempDir.name
+        self.fingerprint = settingsFingerprint({'preset': "Button Icon", 'inputFiles': ["a.svg"]})
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def interruptedJournal(self):
+        journal = CheckpointJournal(self.outputDir)
+        journal.open(self.fingerprint)
+        journal.record("{0}/Droid/a.png".format(self.outputDir), "key-a")
+        journal.record("{0}/iOS/b.png".format(self.outputDir), "key-b")
+        journal.record("{0}/iOS/c.png".format(self.outputDir), None)
+        journal.close()
+        return journal
+
+    def testResumeSameSettings(self):
+        self.interruptedJournal()
+        self.assertEqual(CheckpointJournal(self.outputDir).load(self.fingerprint),
+                         {"Droid/a.png": "key-a", "iOS/b.png": "key-b"})
+
+    def testFingerprintMismatch(self):
+        self.interruptedJournal()
+        other = settingsFingerprint({'preset': "Store Icon", 'inputFiles': ["a.svg"]})
+        self.assertNotEqual(other, self.fingerprint)
+        self.assertEqual(CheckpointJournal(self.outputDir).load(other), {})
+
+    def testFingerprintIgnoresKeyOrder(self):
+        self.assertEqual(settingsFingerprint({'inputFiles': ["a.svg"], 'preset': "Button Icon"}), self.fingerprint)
+
+    def testReopenedJournalCarriesEntries(self):
+        self.interruptedJournal()
+        journal = CheckpointJournal(self.outputDir)
+        entries = journal.load(self.fingerprint)
+        journal.open(self.fingerprint, entries)
+        journal.record("{0}/iOS/c.png".format(self.outputDir), "key-c")
+        journal.close()
+
+        self.assertEqual(CheckpointJournal(self.outputDir).load(self.fingerprint),
+                         dict(entries, **{"iOS/c.png": "key-c"}))
+
+    def testTruncatedLastLine(self):
+        self.interruptedJournal()
+        path = CheckpointJournal(self.outputDir).path
+        with open(path, 'a') as outjournal:
+            outjournal.write('{"output": "iOS/d.png", "ke')
+        self.assertEqual(len(CheckpointJournal(self.outputDir).load(self.fingerprint)), 2)
+
+    def testDiscard(self):
+        journal = self.interruptedJournal()
+        journal.discard()
+        self.assertFalse(os.path.exists(journal.path))
+        self.assertEqual(CheckpointJournal(self.outputDir).load(self.fingerprint), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolBenchmark import csprojTemplate
+from svgToolMinify import minifySvg
+from svgToolSolution import SolutionProject
+
+linkedSvg = b'''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 24 24">
+  <defs><path id="shape" d="M0 0L12.123456 24z"/></defs>
+  <use xlink:href="#shape" xml:space="preserve"/>
+</svg>'''
+
+
+class MinifyTest(unittest.TestCase):
+
+    def testNamespacesAfterSolutionProject(self):
+        # the .csproj writer registers its own default namespace in ElementTree
+        with tempfile.TemporaryDirectory() as tempDir:
+            csproj = "{0}/App.csproj".format(tempDir)
+            with open(csproj, 'w') as outcsproj:
+                outcsproj.write(csprojTemplate)
+            SolutionProject(csproj)
+
+        minified = minifySvg(linkedSvg).decode("utf-8")
+        self.assertTrue(minified.startswith('<svg xmlns="http://www.w3.org/2000/svg"'))
+        self.assertIn('xmlns:xlink="http://www.w3.org/1999/xlink"', minified)
+        self.assertIn('<use xlink:href="#shape" xml:space="preserve"', minified)
+        self.assertNotIn("ns0", minified)
+
+    def testUnqualifiedDocument(self):
+        minified = minifySvg(b'<svg width="10" height="10"><rect width="1" height="2"/></svg>').decode("utf-8")
+        self.assertEqual(minified, '<svg width="10" height="10"><rect width="1" height="2" /></svg>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolOptimizer import ADAPTIVE, encodeCandidate, filterScanlines, optimizePng, reducedEncodings
+from svgToolPng import decodePng, encodePng
+
+
+def createImage(width, height, colors, seed):
+    rng = random.Random(seed)
+    return width, height, b"".join(bytes(rng.choice(colors)) for _ in range(width * height))
+
+
+def sampleImages():
+    rng = random.Random("palette")
+    manyColors = [(rng.randrange(256), rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(300)]
+    return {
+        # odd widths leave bits over at the end of packed palette rows
+        '1-bit palette': createImage(13, 5, [(255, 0, 0, 255), (0, 0, 0, 0)], 1),
+        '2-bit palette': createImage(7, 6, [(255, 0, 0, 255), (0, 255, 0, 128), (0, 0, 255, 255), (9, 9, 9, 0)], 2),
+        '4-bit palette': createImage(9, 9, manyColors[:16], 3),
+        '8-bit palette': createImage(17, 17, manyColors[:200], 4),
+        'gray': createImage(11, 4, [(value, value, value, 255) for value in range(0, 256, 5)], 5),
+        'gray and alpha': createImage(11, 4, [(value, value, value, value) for value in range(0, 256, 5)], 6),
+        'rgb': createImage(30, 20, [color[:3] + (255,) for color in manyColors], 7),
+        'rgba': createImage(30, 20, manyColors, 8),
+        'single pixel': (1, 1, bytes((12, 34, 56, 78)))
+    }
+
+
+class PngTest(unittest.TestCase):
+
+    def testEncodeDecode(self):
+        for name, (width, height, pixels) in sampleImages().items():
+            for level in (0, 9):
+                image = decodePng(encodePng(width, height, pixels, level))
+                self.assertEqual((image.width, image.height, image.pixels), (width, height, pixels), name)
+
+    def testOptimizeKeepsPixels(self):
+        for name, (width, height, pixels) in sampleImages().items():
+            data = encodePng(width, height, pixels, 0)
+            optimized = optimizePng(data, 60)
+            self.assertLessEqual(len(optimized), len(data), name)
+            self.assertEqual(decodePng(optimized).pixels, decodePng(data).pixels, name)
+
+    def testEveryCandidateKeepsPixels(self):
+        # the budget may stop at any candidate, each one must hold the same pixels
+        for name, (width, height, pixels) in sampleImages().items():
+            image = decodePng(encodePng(width, height, pixels))
+            for encoding in reducedEncodings(image):
+                for filterType in [ADAPTIVE, 0, 1, 2, 3, 4]:
+                    candidate = encodeCandidate(image, encoding, filterScanlines(encoding, filterType), 0, [])
+                    self.assertEqual(decodePng(candidate).pixels, pixels,
+                                     "{0}, color type {1}, filter {2}".format(name, encoding.colorType, filterType))
+
+    def testReductionsAreChosen(self):
+        colorTypes = {name: [encoding.colorType for encoding in reducedEncodings(decodePng(encodePng(*image)))]
+                      for name, image in sampleImages().items()}
+        self.assertEqual(colorTypes['1-bit palette'][0], 3)
+        self.assertEqual(colorTypes['gray'][-1], 0)
+        self.assertEqual(colorTypes['gray and alpha'][-1], 4)
+        self.assertEqual(colorTypes['rgb'], [2])
+        self.assertEqual(colorTypes['rgba'], [6])
+
+    def testNotPng(self):
+        with self.assertRaises(ValueError):
+            decodePng(b"GIF89a")
+
+
+if __name__ == '__main__':
+    unittest.main()
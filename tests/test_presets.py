@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolPresets import findMode, modes
+
+# id: name, base width, base height, maintain ratio, iOS sizes, Android sizes, multiplier, downscale
+expectedModes = {
+    0: ("Custom", "", "", True, [1, 2, 3], [1, 1.5, 2, 3], True, False),
+    1: ("iOS Launcher Icon", 0, 0, True, [29, 40, 50, 57, 58, 72, 76, 80, 87, 100, 114, 120, 144, 152, 167, 180], [],
+        False, False),
+    2: ("Android Launcher Icon", 48, 48, True, [], [1, 1.5, 2, 3], True, False),
+    3: ("Store Icon", 0, 0, True, [1024], [512], False, False),
+    4: ("Button Icon", 16, 16, True, [1, 2, 3], [1, 1.5, 2, 3], True, False),
+    5: ("Big Button Icon", 24, 24, True, [1, 2, 3], [1, 1.5, 2, 3], True, False)
+}
+
+
+class PresetTest(unittest.TestCase):
+
+    def testPresets(self):
+        self.assertEqual([mode.id for mode in modes], sorted(expectedModes))
+        for mode in modes:
+            self.assertEqual((mode.name, mode.baseWidth, mode.baseHeight, mode.isMaintainRatio, mode.iosSizeList,
+                              mode.androidSizeList, mode.isMultiplier, mode.isDownscale), expectedModes[mode.id])
+
+    def testFindMode(self):
+        self.assertIs(findMode("4"), modes[4])
+        self.assertIs(findMode("button icon"), modes[4])
+        with self.assertRaises(ValueError):
+            findMode("Watch Icon")
+
+
+if __name__ == '__main__':
+    unittest.main()
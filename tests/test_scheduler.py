@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolScheduler import RenderJob, RenderScheduler, RenderTarget
+
+
+class FakeDocument(object):
+
+    def render(self, outfile, width, height):
+        if outfile.endswith("broken.png"):
+            raise ValueError("broken")
+
+    def close(self):
+        pass
+
+
+class FakeRenderer(object):
+
+    parsesOnce = False
+
+    def start(self, workerCount, timeout=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def load(self, infile):
+        return FakeDocument()
+
+
+class FailingHook(object):
+
+    def __init__(self, method):
+        self.method = method
+
+    def jobStarted(self, job):
+        if self.method == "jobStarted":
+            raise RuntimeError("jobStarted")
+
+    def jobFinished(self, job):
+        if self.method == "jobFinished":
+            raise RuntimeError("jobFinished")
+
+
+class FakeSink(object):
+
+    def render(self, document, outfile, width, height):
+        document.render(outfile, width, height)
+
+    def copy(self, source, destination):
+        pass
+
+
+class FailingSink(FakeSink):
+
+    def copy(self, source, destination):
+        raise KeyError(destination)
+
+
+def createJobs():
+    jobs = []
+    for index in range(4):
+        target = RenderTarget("out/{0}_2x.png".format(index), 32, 32)
+        target.duplicates.append(RenderTarget("out/{0}_copy.png".format(index), 32, 32))
+        jobs.append(RenderJob("{0}.svg".format(index), "in/{0}.svg".format(index),
+                              [target, RenderTarget("out/{0}.png".format(index), 16, 16)]))
+    jobs.append(RenderJob("broken.svg", "in/broken.svg", [RenderTarget("out/broken.png", 16, 16)]))
+    return jobs
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def collect(self, scheduler, jobs):
+        # a missing result would block run forever, the results are collected on a thread
+        results = []
+        thread = threading.Thread(target=lambda: results.extend(scheduler.run(jobs)), daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "the scheduler is waiting for a result that never comes")
+        return results
+
+    def testEveryOutputIsReported(self):
+        jobs = createJobs()
+        results = self.collect(RenderScheduler(FakeRenderer(), 3, sink=FakeSink()), jobs)
+        self.assertEqual(len(results), sum(job.outputCount() for job in jobs))
+        self.assertEqual([target.outfile for _, target, error in results if error is not None], ["out/broken.png"])
+
+    def testFailingHooksAndSinks(self):
+        for scheduler in [RenderScheduler(FakeRenderer(), 3, [FailingHook("jobStarted")], sink=FakeSink()),
+                          RenderScheduler(FakeRenderer(), 3, [FailingHook("jobFinished")], sink=FakeSink()),
+                          RenderScheduler(FakeRenderer(), 3, sink=FailingSink())]:
+            jobs = createJobs()
+            results = self.collect(scheduler, jobs)
+            outfiles = sorted(target.outfile for _, target, _ in results)
+            self.assertEqual(outfiles, sorted(output.outfile for job in jobs for target in job.targets
+                                              for output in [target] + target.duplicates))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolBenchmark import csprojTemplate
+from svgToolSolution import SolutionProject
+
+
+class SolutionProjectTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.path = "{0}/App.csproj".format(self.tempDir.name)
+        with open(self.path, 'w') as outcsproj:
+            outcsproj.write(csprojTemplate)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def read(self):
+        with open(self.path, 'r') as incsproj:
+            return incsproj.read()
+
+    def addIncludes(self, includes):
+        project = SolutionProject(self.path)
+        for include in includes:
+            project.include(project.itemGroup(3), "AndroidResource", include)
+        return project.save()
+
+    def testIncludesAddedOnce(self):
+        self.assertTrue(self.addIncludes(["Resources\\drawable\\a.png", "Resources\\drawable\\a.png"]))
+        self.assertFalse(self.addIncludes(["Resources\\drawable\\a.png", "Placeholder3.txt"]))
+        self.assertEqual(self.read().count('Include="Resources\\drawable\\a.png"'), 1)
+
+    def testNoRewriteWhenNothingChanges(self):
+        self.addIncludes(["Resources\\drawable\\a.png"])
+        modified = os.stat(self.path).st_mtime_ns
+        os.utime(self.path, ns=(modified - 10 ** 9, modified - 10 ** 9))
+
+        project = SolutionProject(self.path)
+        self.assertFalse(project.include(project.itemGroup(3), "AndroidResource", "Resources\\drawable\\a.png"))
+        self.assertFalse(project.save())
+        self.assertEqual(os.stat(self.path).st_mtime_ns, modified - 10 ** 9)
+
+    def testStableOrdering(self):
+        includes = ["Resources\\drawable\\{0}.png".format(name) for name in ["c", "a", "b"]]
+        self.addIncludes(includes)
+        first = self.read()
+        self.assertLess(first.index(includes[0]), first.index(includes[1]))
+        self.assertLess(first.index(includes[1]), first.index(includes[2]))
+
+        with open(self.path, 'w') as outcsproj:
+            outcsproj.write(csprojTemplate)
+        self.addIncludes(includes)
+        self.assertEqual(self.read(), first)
+
+    def testDefaultNamespaceKept(self):
+        self.addIncludes(["Resources\\drawable\\a.png"])
+        text = self.read()
+        self.assertIn('<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003"', text)
+        self.assertNotIn("ns0", text)
+        self.assertIn('<AndroidResource Include="Resources\\drawable\\a.png" />', text)
+
+    def testItemGroupFallback(self):
+        project = SolutionProject(self.path)
+        self.assertIs(project.itemGroup(99), project.itemGroups[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
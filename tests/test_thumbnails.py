@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+import svgToolThumbnails
+from svgToolThumbnails import ThumbnailProvider
+
+squareSvg = '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16"><rect width="16" height="16" fill="{0}"/></svg>'
+
+
+class ThumbnailTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.application = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.path = "{0}/square.svg".format(self.tempDir.name)
+        self.writeSvg("#ff0000", 1000000000)
+
+        self.statThreads = []
+        self.stat = os.stat
+        svgToolThumbnails.os.stat = self.recordStat
+
+    def tearDown(self):
+        svgToolThumbnails.os.stat = self.stat
+        self.tempDir.cleanup()
+
+    def recordStat(self, path, *arguments, **keywords):
+        self.statThreads.append(threading.current_thread())
+        return self.stat(path, *arguments, **keywords)
+
+    def writeSvg(self, color, mtime):
+        with open(self.path, 'w') as outsvg:
+            outsvg.write(squareSvg.format(color))
+        os.utime(self.path, ns=(mtime, mtime))
+
+    def waitForIdle(self, provider):
+        deadline = time.time() + 10
+        while provider.pending and time.time() < deadline:
+            provider.threadPool.waitForDone(50)
+            self.application.processEvents()
+
+    def pixel(self, icon):
+        return icon.pixmap(16, 16).toImage().pixel(8, 8)
+
+    def testIconIsLookupAndRefreshes(self):
+        provider = ThumbnailProvider(16)
+        self.assertIsNone(provider.icon("square.svg", self.path))
+        self.waitForIdle(provider)
+        red = provider.icon("square.svg", self.path)
+        self.assertEqual(self.pixel(red), 0xffff0000)
+
+        # the outdated thumbnail is shown until the check comes back with the new one
+        self.writeSvg("#0000ff", 2000000000)
+        provider.invalidate(["square.svg"])
+        self.assertIs(provider.icon("square.svg", self.path), red)
+        self.waitForIdle(provider)
+        self.assertEqual(self.pixel(provider.icon("square.svg", self.path)), 0xff0000ff)
+
+        self.assertTrue(self.statThreads)
+        self.assertNotIn(threading.main_thread(), self.statThreads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import queue
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgToolWatcher import DirectoryWatcher
+
+
+class WatcherTest(unittest.TestCase):
+
+    def testGlobsMatchDiscovery(self):
+        watcher = DirectoryWatcher("in", None, "arrow", ["*.svg", "*.svgz"], ["*_draft.svg"])
+        self.assertTrue(watcher.isWatched("arrow.svg"))
+        self.assertTrue(watcher.isWatched("Arrow_Left.SVGZ"))
+        self.assertFalse(watcher.isWatched("arrow_draft.svg"))
+        self.assertFalse(watcher.isWatched("arrow.png"))
+        self.assertFalse(watcher.isWatched("circle.svg"))
+
+    def testChangesAreFiltered(self):
+        with tempfile.TemporaryDirectory() as inputDir:
+            changes = queue.Queue()
+            watcher = DirectoryWatcher(inputDir, changes.put, "", ["*.svg"], ["skip*"], debounce=0.2)
+            watcher.start()
+            try:
+                for name in ["icon.svg", "skip.svg", "notes.txt"]:
+                    with open("{0}/{1}".format(inputDir, name), 'w') as outfile:
+                        outfile.write("<svg/>")
+                self.assertEqual(changes.get(timeout=10), ["icon.svg"])
+            finally:
+                watcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
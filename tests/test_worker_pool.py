@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import svgToolWorkerPool
+from svgToolWorkerPool import WorkerPool
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def testFailedStartStopsStartedWorkers(self):
+        started = []
+        realWorker = svgToolWorkerPool.RendererWorker
+
+        def startWorker(command):
+            if len(started) == 2:
+                raise OSError("no more processes")
+            worker = realWorker(command)
+            started.append(worker)
+            return worker
+
+        svgToolWorkerPool.RendererWorker = startWorker
+        try:
+            with self.assertRaises(OSError):
+                WorkerPool([sys.executable, "-c", "import sys; sys.stdin.read()"], 4)
+        finally:
+            svgToolWorkerPool.RendererWorker = realWorker
+
+        self.assertEqual(len(started), 2)
+        for worker in started:
+            self.assertIsNotNone(worker.process.poll())
+
+
+if __name__ == '__main__':
+    unittest.main()